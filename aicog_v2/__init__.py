@@ -1,17 +1,93 @@
-from aicog_v2.client import AiCogClient
-from aicog_v2.core.interfaces import AIResponse, AIProvider
-from aicog_v2.cache.redis_backend import RedisCache
-from aicog_v2.storage.sqlite_backend import SQLiteStorage
-from aicog_v2.providers.groq_provider import GroqProvider
-from aicog_v2.providers.openai_provider import OpenAIProvider
+"""
+Public names are loaded lazily: `from aicog_v2 import GroqProvider` imports
+the Groq SDK, but `import aicog_v2` alone imports none of the provider,
+Redis or SQLite backends.
+"""
+import importlib
+from typing import TYPE_CHECKING
 
 __version__ = "0.1.0"
-__all__ = [
-    "AiCogClient",
-    "AIResponse",
-    "AIProvider",
-    "RedisCache",
-    "SQLiteStorage",
-    "GroqProvider",
-    "OpenAIProvider",
-]
+
+# Public name -> defining module
+_EXPORTS = {
+    "AiCogClient": "aicog_v2.client",
+    "AIResponse": "aicog_v2.core.interfaces",
+    "AIProvider": "aicog_v2.core.interfaces",
+    "AIStream": "aicog_v2.core.interfaces",
+    "StreamChunk": "aicog_v2.core.interfaces",
+    "configure_pricing": "aicog_v2.core.interfaces",
+    "Conversation": "aicog_v2.core.conversation",
+    "TokenEstimator": "aicog_v2.core.utils",
+    "BPETokenizer": "aicog_v2.core.tokenizer",
+    "RedisCache": "aicog_v2.cache.redis_backend",
+    "MemoryCache": "aicog_v2.cache.tiered_backend",
+    "TieredCache": "aicog_v2.cache.tiered_backend",
+    "SemanticCache": "aicog_v2.cache.semantic",
+    "CacheKeyBuilder": "aicog_v2.cache.keys",
+    "CacheSerializer": "aicog_v2.cache.serialization",
+    "CachePolicy": "aicog_v2.cache.policy",
+    "MinHashLSHIndex": "aicog_v2.cache.semantic",
+    "SQLiteStorage": "aicog_v2.storage.sqlite_backend",
+    "PartitionedSQLiteStorage": "aicog_v2.storage.partitioned",
+    "GroqProvider": "aicog_v2.providers.groq_provider",
+    "OpenAIProvider": "aicog_v2.providers.openai_provider",
+    "ReplayProvider": "aicog_v2.providers.replay_provider",
+    "RecordingProvider": "aicog_v2.providers.replay_provider",
+    "ReplayMissError": "aicog_v2.providers.replay_provider",
+    "record_providers": "aicog_v2.providers.replay_provider",
+    "ModelRouter": "aicog_v2.core.routing",
+    "RoutingError": "aicog_v2.core.routing",
+    "RuleEngine": "aicog_v2.core.rules",
+    "TaskRule": "aicog_v2.core.rules",
+    "LatencyTracker": "aicog_v2.core.stats",
+    "ResiliencePolicy": "aicog_v2.core.resilience",
+    "CircuitBreaker": "aicog_v2.core.resilience",
+    "CircuitOpenError": "aicog_v2.core.resilience",
+    "RateLimiter": "aicog_v2.core.ratelimit",
+    "RateLimit": "aicog_v2.core.ratelimit",
+    "RequestCoalescer": "aicog_v2.core.coalescing",
+    "RedisRequestCoalescer": "aicog_v2.core.coalescing",
+    "GatewayMetrics": "aicog_v2.core.metrics",
+    "NullMetrics": "aicog_v2.core.metrics",
+    "HTTPPool": "aicog_v2.core.http",
+}
+
+__all__ = list(_EXPORTS)
+
+def __getattr__(name: str):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module), name)
+    # Cache on the package so later lookups skip __getattr__
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
+
+if TYPE_CHECKING:
+    from aicog_v2.client import AiCogClient
+    from aicog_v2.core.interfaces import AIResponse, AIProvider, AIStream, StreamChunk, configure_pricing
+    from aicog_v2.core.conversation import Conversation
+    from aicog_v2.core.utils import TokenEstimator
+    from aicog_v2.core.tokenizer import BPETokenizer
+    from aicog_v2.cache.redis_backend import RedisCache
+    from aicog_v2.cache.tiered_backend import MemoryCache, TieredCache
+    from aicog_v2.cache.semantic import SemanticCache, MinHashLSHIndex
+    from aicog_v2.cache.keys import CacheKeyBuilder
+    from aicog_v2.cache.serialization import CacheSerializer
+    from aicog_v2.cache.policy import CachePolicy
+    from aicog_v2.storage.sqlite_backend import SQLiteStorage
+    from aicog_v2.storage.partitioned import PartitionedSQLiteStorage
+    from aicog_v2.providers.groq_provider import GroqProvider
+    from aicog_v2.providers.openai_provider import OpenAIProvider
+    from aicog_v2.providers.replay_provider import ReplayProvider, RecordingProvider, ReplayMissError, record_providers
+    from aicog_v2.core.routing import ModelRouter, RoutingError
+    from aicog_v2.core.rules import RuleEngine, TaskRule
+    from aicog_v2.core.stats import LatencyTracker
+    from aicog_v2.core.resilience import ResiliencePolicy, CircuitBreaker, CircuitOpenError
+    from aicog_v2.core.ratelimit import RateLimiter, RateLimit
+    from aicog_v2.core.coalescing import RequestCoalescer, RedisRequestCoalescer
+    from aicog_v2.core.metrics import GatewayMetrics, NullMetrics
+    from aicog_v2.core.http import HTTPPool
@@ -0,0 +1,109 @@
+import json
+import hashlib
+from typing import Any, Dict, Iterable, Optional
+
+def _canonical(value: Any) -> Any:
+    """
+    Normalizes a kwarg value so equivalent settings serialize identically
+    (0 == 0.0, set order, pydantic models, classes used as response formats).
+    """
+    if isinstance(value, bool) or value is None or isinstance(value, str):
+        return value
+    if isinstance(value, float):
+        return int(value) if value.is_integer() else value
+    if isinstance(value, int):
+        return value
+    if isinstance(value, dict):
+        return {str(k): _canonical(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_canonical(v) for v in value]
+    if isinstance(value, (set, frozenset)):
+        return sorted((_canonical(v) for v in value), key=repr)
+    if isinstance(value, type):
+        return f"{value.__module__}.{value.__qualname__}"
+    if hasattr(value, "model_dump"):
+        return _canonical(value.model_dump())
+    return repr(value)
+
+class CacheKeyBuilder:
+    """
+    Builds cache keys as `{namespace}:v{version}:{sha256}` over the provider,
+    model, system prompt, prompt and the generation kwargs that affect the
+    answer (serialized as canonical, sorted JSON).
+
+    Kwargs are filtered by `allow` (only these, when given) and `deny`
+    (transport-only settings by default). With `bypass_nondeterministic`, a
+    call with `temperature > 0` and no `seed` is not cached unless the caller
+    forces it. Bumping `version` (or changing `namespace`) invalidates every
+    existing entry at once; old keys then simply expire.
+
+    Conversation history (`messages`) is never serialized into the key;
+    callers pass the Conversation's rolling prefix key as `history_key`.
+    """
+
+    DEFAULT_DENY = frozenset({
+        "stream", "stream_options", "timeout", "extra_headers", "extra_query",
+        "user", "metadata", "store", "service_tier",
+    })
+
+    def __init__(
+        self,
+        namespace: str = "aicog",
+        version: int = 1,
+        include_provider: bool = True,
+        allow: Optional[Iterable[str]] = None,
+        deny: Optional[Iterable[str]] = None,
+        bypass_nondeterministic: bool = True
+    ):
+        self.namespace = namespace
+        self.version = version
+        self.include_provider = include_provider
+        self.allow = frozenset(allow) if allow is not None else None
+        self.deny = frozenset(deny) if deny is not None else self.DEFAULT_DENY
+        self.bypass_nondeterministic = bypass_nondeterministic
+
+    @property
+    def prefix(self) -> str:
+        return f"{self.namespace}:v{self.version}:"
+
+    def relevant(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            name: value for name, value in params.items()
+            if name != "messages" and name not in self.deny and (self.allow is None or name in self.allow)
+        }
+
+    def fingerprint(self, params: Dict[str, Any]) -> str:
+        """
+        Stable serialization of the cache-relevant kwargs.
+        """
+        relevant = self.relevant(params)
+        if not relevant:
+            return ""
+        return json.dumps(_canonical(relevant), sort_keys=True, separators=(",", ":"))
+
+    def cacheable(self, params: Dict[str, Any], force: bool = False) -> bool:
+        if force or not self.bypass_nondeterministic:
+            return True
+        temperature = params.get("temperature")
+        return not (temperature and temperature > 0 and params.get("seed") is None)
+
+    def build(
+        self,
+        prompt: str,
+        model: str,
+        provider: str,
+        system_prompt: Optional[str] = None,
+        params: Optional[Dict[str, Any]] = None,
+        history_key: str = ""
+    ) -> str:
+        parts = [
+            provider if self.include_provider else "",
+            model,
+            system_prompt or "",
+            prompt,
+            self.fingerprint(params or {}),
+        ]
+        if history_key:
+            parts.append(history_key)
+        digest = hashlib.sha256("\x1f".join(parts).encode()).hexdigest()
+        return self.prefix + digest
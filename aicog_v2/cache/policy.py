@@ -0,0 +1,114 @@
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+class CachePolicy:
+    """
+    How long cached responses live. `ttl` is the default freshness window,
+    `task_ttls` overrides it per `ModelRouter.classify_task` category (e.g.
+    {"extraction": 86400, "general": 600}), and a caller's `cache_ttl=`
+    overrides both.
+
+    With `stale_ttl > 0`, entries are kept that much longer than their
+    freshness window (the hard TTL). A hit in that window is served
+    immediately while one background refresh replaces the entry; at most
+    `max_refreshes` refreshes run at once.
+    """
+
+    def __init__(
+        self,
+        ttl: int = 3600,
+        task_ttls: Optional[Dict[str, int]] = None,
+        stale_ttl: int = 0,
+        max_refreshes: int = 4,
+        max_pending_refreshes: int = 100
+    ):
+        self.ttl = ttl
+        self.task_ttls = dict(task_ttls or {})
+        self.stale_ttl = stale_ttl
+        self.max_refreshes = max_refreshes
+        self.max_pending_refreshes = max_pending_refreshes
+
+    @staticmethod
+    def check_ttl(ttl: Optional[int]) -> Optional[int]:
+        """
+        Validates a caller's `cache_ttl=`: None, 0 (do not cache) or a
+        positive number of seconds.
+        """
+        if ttl is not None and (isinstance(ttl, bool) or not isinstance(ttl, int) or ttl < 0):
+            raise ValueError(f"cache_ttl must be 0 or a positive number of seconds, got {ttl!r}")
+        return ttl
+
+    def ttl_for(self, task: Optional[str] = None, override: Optional[int] = None) -> int:
+        if override is not None:
+            return self.check_ttl(override)
+        return self.task_ttls.get(task, self.ttl) if task else self.ttl
+
+    def hard_ttl(self, ttl: int) -> int:
+        return ttl + self.stale_ttl
+
+class RefreshScheduler:
+    """
+    Runs background cache refreshes: at most one per key, at most
+    `max_concurrent` at once, and at most `max_pending` queued or running.
+    Requests beyond that are dropped, and the stale value keeps being served
+    until a later hit schedules the refresh again.
+    """
+
+    def __init__(self, max_concurrent: int = 4, max_pending: int = 100):
+        self.max_concurrent = max_concurrent
+        self.max_pending = max_pending
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self.scheduled = 0
+        self.deduplicated = 0
+        self.dropped = 0
+        self.failed = 0
+
+    @property
+    def pending(self) -> int:
+        return len(self._tasks)
+
+    def schedule(self, key: str, fn: Callable[[], Awaitable[Any]]) -> bool:
+        """
+        Starts `fn` in the background unless a refresh for `key` is already
+        pending or the queue is full. Returns whether it was scheduled.
+        """
+        if key in self._tasks:
+            self.deduplicated += 1
+            return False
+        if len(self._tasks) >= self.max_pending:
+            self.dropped += 1
+            return False
+        self._tasks[key] = asyncio.ensure_future(self._run(key, fn))
+        self.scheduled += 1
+        return True
+
+    async def _run(self, key: str, fn: Callable[[], Awaitable[Any]]):
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrent)
+        try:
+            async with self._semaphore:
+                await fn()
+        except Exception as e:
+            self.failed += 1
+            logger.warning(f"Background cache refresh failed: {e}")
+        finally:
+            self._tasks.pop(key, None)
+
+    async def drain(self):
+        """Waits for every pending refresh to finish."""
+        while self._tasks:
+            await asyncio.gather(*list(self._tasks.values()), return_exceptions=True)
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        return {
+            "scheduled": self.scheduled,
+            "deduplicated": self.deduplicated,
+            "dropped": self.dropped,
+            "failed": self.failed,
+            "pending": self.pending,
+        }
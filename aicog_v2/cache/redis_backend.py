@@ -1,25 +1,135 @@
 import logging
 import json
-from typing import Optional
+from typing import Dict, List, Optional, Tuple, Union
 import redis.asyncio as redis
 from aicog_v2.core.interfaces import AICache
+from aicog_v2.cache.serialization import CacheSerializer
 
 logger = logging.getLogger(__name__)
 
 class RedisCache(AICache):
-    def __init__(self, host: str = '127.0.0.1', port: int = 6379, db: int = 0, password: Optional[str] = None):
-        self.client = redis.Redis(host=host, port=port, db=db, password=password, decode_responses=True)
+    """
+    With a `serializer`, values are stored as compact (optionally
+    compressed) bytes instead of JSON text; entries written without one stay
+    readable. A `client` passed in alongside a serializer must be created
+    with `decode_responses=False`.
+    """
+
+    supports_delete_prefix = True
+
+    def __init__(
+        self,
+        host: str = '127.0.0.1',
+        port: int = 6379,
+        db: int = 0,
+        password: Optional[str] = None,
+        max_connections: Optional[int] = None,
+        socket_timeout: Optional[float] = None,
+        socket_connect_timeout: Optional[float] = None,
+        client: Optional[redis.Redis] = None,
+        serializer: Optional[CacheSerializer] = None
+    ):
+        self.serializer = serializer
+        if client is not None:
+            self.client = client
+            return
+        pool = redis.ConnectionPool(
+            host=host,
+            port=port,
+            db=db,
+            password=password,
+            max_connections=max_connections,
+            socket_timeout=socket_timeout,
+            socket_connect_timeout=socket_connect_timeout,
+            decode_responses=serializer is None
+        )
+        self.client = redis.Redis(connection_pool=pool)
 
     async def get(self, key: str) -> Optional[str]:
         try:
-            return await self.client.get(key)
+            value = await self.client.get(key)
         except Exception as e:
             logger.debug(f"Redis Cache GET failed: {e}")
             return None
+        return self._loads(value)
 
     async def set(self, key: str, value: str, ttl: int = 3600):
         try:
-            await self.client.setex(key, ttl, value)
+            await self.client.setex(key, ttl, self._dumps(value))
         except Exception as e:
             logger.debug(f"Redis Cache SET failed: {e}")
             pass
+
+    async def get_many(self, keys: List[str]) -> List[Optional[str]]:
+        if not keys:
+            return []
+        try:
+            values = await self.client.mget(keys)
+        except Exception as e:
+            logger.debug(f"Redis Cache MGET failed: {e}")
+            return [None] * len(keys)
+        return [self._loads(value) for value in values]
+
+    async def set_many(self, items: Dict[str, str], ttl: int = 3600):
+        if not items:
+            return
+        try:
+            # transaction=False: plain pipelining, one round trip without MULTI/EXEC
+            async with self.client.pipeline(transaction=False) as pipe:
+                for key, value in items.items():
+                    pipe.setex(key, ttl, self._dumps(value))
+                await pipe.execute()
+        except Exception as e:
+            logger.debug(f"Redis Cache pipelined SET failed: {e}")
+
+    async def get_with_ttl(self, key: str) -> Tuple[Optional[str], Optional[float]]:
+        return (await self.get_many_with_ttl([key]))[0]
+
+    async def get_many_with_ttl(self, keys: List[str]) -> List[Tuple[Optional[str], Optional[float]]]:
+        if not keys:
+            return []
+        try:
+            # GET and PTTL per key, pipelined into one round trip
+            async with self.client.pipeline(transaction=False) as pipe:
+                for key in keys:
+                    pipe.get(key)
+                    pipe.pttl(key)
+                replies = await pipe.execute()
+        except Exception as e:
+            logger.debug(f"Redis Cache GET with TTL failed: {e}")
+            return [(None, None)] * len(keys)
+        results = []
+        for value, pttl in zip(replies[::2], replies[1::2]):
+            # PTTL is -1 for keys without expiry and -2 for missing keys
+            results.append((self._loads(value), pttl / 1000 if pttl >= 0 else None))
+        return results
+
+    def _dumps(self, value: str) -> Union[str, bytes]:
+        return self.serializer.dumps(value) if self.serializer else value
+
+    def _loads(self, value: Union[str, bytes, None]) -> Optional[str]:
+        if self.serializer is None or value is None:
+            return value
+        try:
+            return self.serializer.loads(value)
+        except Exception as e:
+            # An undecodable entry is treated as a miss and gets overwritten
+            logger.debug(f"Redis Cache payload decode failed: {e}")
+            return None
+
+    async def delete_prefix(self, prefix: str, batch_size: int = 500) -> int:
+        # SCAN + UNLINK in batches: never blocks Redis the way KEYS/DEL would
+        deleted = 0
+        batch: List[str] = []
+        try:
+            async for key in self.client.scan_iter(match=f"{prefix}*", count=batch_size):
+                batch.append(key)
+                if len(batch) >= batch_size:
+                    deleted += await self.client.unlink(*batch)
+                    batch = []
+            if batch:
+                deleted += await self.client.unlink(*batch)
+        except Exception as e:
+            # Like get/set: a Redis outage is logged, not raised; returns what was removed so far
+            logger.debug(f"Redis Cache prefix delete failed: {e}")
+        return deleted
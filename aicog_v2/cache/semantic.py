@@ -0,0 +1,227 @@
+import re
+import zlib
+import hashlib
+import unicodedata
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Dict, List, Optional, Set, Tuple
+
+# Sentence punctuation only: operators and comparison symbols (+ * < > = ...)
+# change the meaning of a prompt and are kept. Periods and apostrophes
+# inside numbers and words ("3.5", "don't") are kept too.
+_PUNCTUATION = re.compile(r"[!?,;:\"“”‘’«»`…()\[\]{}¿¡]+|\.(?!\w)|(?<!\w)'|'(?!\w)")
+_WHITESPACE = re.compile(r"\s+")
+_NUMBERS = re.compile(r"\S*\d\S*")
+
+_MASK64 = (1 << 64) - 1
+# Odd multiplier spreading 32-bit CRCs over 64 bits
+_SPREAD = 0x9E3779B97F4A7C15
+
+def normalize_prompt(text: str) -> str:
+    """
+    Canonical form for near-duplicate matching: Unicode NFKC, casefolded,
+    sentence punctuation removed and whitespace collapsed.
+    """
+    text = unicodedata.normalize("NFKC", text).casefold()
+    text = _PUNCTUATION.sub(" ", text)
+    return _WHITESPACE.sub(" ", text).strip()
+
+class SimilarityIndex(ABC):
+    """
+    Approximate index from prompts to cache keys. `scope` partitions the
+    index (e.g. by model and system prompt) so only compatible entries match.
+    """
+
+    @abstractmethod
+    def query(self, text: str, scope: str) -> Optional[Tuple[str, float]]:
+        """Returns (cache_key, similarity) of the best match, or None."""
+
+    @abstractmethod
+    def add(self, text: str, scope: str, cache_key: str):
+        pass
+
+    def touch(self, scope: str, cache_key: str):
+        """Marks an entry as used, for indexes that evict by recency."""
+
+class MinHashLSHIndex(SimilarityIndex):
+    """
+    Offline MinHash + LSH index over character shingles of normalized prompts.
+
+    Signatures use one-permutation hashing: each shingle hash is routed to one
+    of `num_perm` bins and each bin keeps its minimum, so a signature costs a
+    single pass over the shingles instead of `num_perm` passes. Empty bins are
+    filled from the next non-empty bin (densification). The fraction of equal
+    bins estimates Jaccard similarity. Signatures are split into `bands`
+    bands so that similar prompts share at least one bucket with high
+    probability; candidates are then verified against the estimated
+    similarity. Tokens containing digits ("3", "2+3", "v1.2") must match
+    exactly, since similar-looking prompts with different numbers have
+    different answers. At most `max_entries` prompts are kept (LRU).
+
+    Shingles are hashed with CRC32, so similarity scores are the same in
+    every process (Python's string hash is salted per process).
+    """
+
+    def __init__(
+        self,
+        num_perm: int = 64,
+        bands: int = 16,
+        shingle_size: int = 4,
+        max_entries: int = 10_000
+    ):
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        self.max_entries = max_entries
+        # entry id -> (scope, signature, bucket keys, cache_key, digit tokens)
+        self._entries: "OrderedDict[int, Tuple[str, Tuple[int, ...], List[int], str, Tuple[str, ...]]]" = OrderedDict()
+        self._buckets: Dict[int, Set[int]] = {}
+        self._by_key: Dict[Tuple[str, str], int] = {}
+        self._next_id = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _shingles(self, text: str) -> Set[str]:
+        k = self.shingle_size
+        if len(text) <= k:
+            return {text}
+        return {text[i:i + k] for i in range(len(text) - k + 1)}
+
+    def signature(self, text: str, normalized: bool = False) -> Tuple[int, ...]:
+        bins = self.num_perm
+        signature: List[Optional[int]] = [None] * bins
+        for gram in self._shingles(text if normalized else normalize_prompt(text)):
+            h = (zlib.crc32(gram.encode()) * _SPREAD) & _MASK64
+            slot = h % bins
+            value = h // bins
+            current = signature[slot]
+            if current is None or value < current:
+                signature[slot] = value
+
+        # Densify: an empty bin borrows the next non-empty bin's value
+        for slot in range(bins):
+            if signature[slot] is None:
+                for step in range(1, bins):
+                    donor = signature[(slot + step) % bins]
+                    if donor is not None:
+                        signature[slot] = donor + step
+                        break
+        return tuple(signature)
+
+    def _bucket_keys(self, scope: str, signature: Tuple[int, ...]) -> List[int]:
+        rows = self.rows
+        return [hash((scope, band, signature[band * rows:(band + 1) * rows])) for band in range(self.bands)]
+
+    @staticmethod
+    def similarity(a: Tuple[int, ...], b: Tuple[int, ...]) -> float:
+        return sum(x == y for x, y in zip(a, b)) / len(a)
+
+    def query(self, text: str, scope: str) -> Optional[Tuple[str, float]]:
+        text = normalize_prompt(text)
+        signature = self.signature(text, normalized=True)
+        numbers = tuple(_NUMBERS.findall(text))
+        candidates: Set[int] = set()
+        for bucket in self._bucket_keys(scope, signature):
+            candidates.update(self._buckets.get(bucket, ()))
+
+        best: Optional[Tuple[int, float]] = None
+        for entry_id in candidates:
+            entry_scope, entry_signature, _, _, entry_numbers = self._entries[entry_id]
+            if entry_scope != scope or entry_numbers != numbers:
+                continue
+            score = self.similarity(signature, entry_signature)
+            if best is None or score > best[1]:
+                best = (entry_id, score)
+        if best is None:
+            return None
+        return self._entries[best[0]][3], best[1]
+
+    def touch(self, scope: str, cache_key: str):
+        entry_id = self._by_key.get((scope, cache_key))
+        if entry_id is not None:
+            self._entries.move_to_end(entry_id)
+
+    def add(self, text: str, scope: str, cache_key: str):
+        existing = self._by_key.get((scope, cache_key))
+        if existing is not None:
+            self._entries.move_to_end(existing)
+            return
+
+        text = normalize_prompt(text)
+        signature = self.signature(text, normalized=True)
+        buckets = self._bucket_keys(scope, signature)
+        entry_id = self._next_id
+        self._next_id += 1
+        self._entries[entry_id] = (scope, signature, buckets, cache_key, tuple(_NUMBERS.findall(text)))
+        self._by_key[(scope, cache_key)] = entry_id
+        for bucket in buckets:
+            self._buckets.setdefault(bucket, set()).add(entry_id)
+
+        while len(self._entries) > self.max_entries:
+            self._evict(next(iter(self._entries)))
+
+    def _evict(self, entry_id: int):
+        scope, _, buckets, cache_key, _ = self._entries.pop(entry_id)
+        self._by_key.pop((scope, cache_key), None)
+        for bucket in buckets:
+            members = self._buckets.get(bucket)
+            if members is not None:
+                members.discard(entry_id)
+                if not members:
+                    del self._buckets[bucket]
+        self.evictions += 1
+
+class SemanticCache:
+    """
+    Near-duplicate layer on top of the exact-match cache. After an exact miss,
+    the prompt is looked up in a SimilarityIndex and, when the best match is
+    at least the threshold for the prompt's task class (see
+    ModelRouter.classify_task), that entry's cache key is served instead.
+    Runs fully offline.
+    """
+
+    # A one-word change in a short prompt ("maximum" -> "minimum") scores
+    # about 0.9, so thresholds sit above that
+    DEFAULT_THRESHOLDS = {
+        "extraction": 0.98,
+        "reasoning": 0.97,
+        "summarization": 0.96,
+        "general": 0.95,
+    }
+
+    def __init__(
+        self,
+        index: Optional[SimilarityIndex] = None,
+        thresholds: Optional[Dict[str, float]] = None,
+        default_threshold: float = 0.96
+    ):
+        self.index = index if index is not None else MinHashLSHIndex()
+        self.thresholds = dict(self.DEFAULT_THRESHOLDS)
+        if thresholds:
+            self.thresholds.update(thresholds)
+        self.default_threshold = default_threshold
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def scope(model: str, system_prompt: Optional[str], variant: str = "") -> str:
+        # `variant` keeps prompts sent with different generation kwargs apart
+        data = (system_prompt or "") + ("\x1f" + variant if variant else "")
+        return f"{model}:{hashlib.sha256(data.encode()).hexdigest()[:16]}"
+
+    def lookup(self, prompt: str, scope: str, task: str) -> Optional[str]:
+        match = self.index.query(prompt, scope)
+        if match is None or match[1] < self.thresholds.get(task, self.default_threshold):
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.index.touch(scope, match[0])
+        return match[0]
+
+    def add(self, prompt: str, scope: str, cache_key: str):
+        self.index.add(prompt, scope, cache_key)
@@ -0,0 +1,79 @@
+import json
+from typing import Dict, Optional, Union
+
+from aicog_v2.storage.blobs import BlobCodec
+
+# Every serialized value starts with this byte; legacy entries are plain JSON
+# text, which never does, so both can live in the same Redis keyspace.
+VERSION = 1
+
+_CODECS = {"raw": 0, "zlib": 1, "zstd": 2}
+_CODEC_NAMES = {value: name for name, value in _CODECS.items()}
+_FORMATS = {"json": 0, "msgpack": 1}
+_FORMAT_NAMES = {value: name for name, value in _FORMATS.items()}
+
+def _msgpack():
+    try:
+        import msgpack
+    except ImportError:
+        raise ImportError("msgpack cache payloads require the 'msgpack' package (pip install aicog-v2[msgpack])")
+    return msgpack
+
+class CacheSerializer:
+    """
+    Binary encoding for cache values: a 3-byte header (version, codec,
+    format) followed by the payload, compressed with zstd or zlib once it
+    reaches `min_bytes`. With `format="msgpack"` the JSON payload is
+    re-packed as msgpack before compression (needs the `msgpack` package).
+
+    `loads` also accepts legacy entries (plain JSON strings written before
+    the serializer was enabled), so a deployment can switch over without
+    flushing the cache.
+    """
+
+    def __init__(
+        self,
+        compression: Optional[str] = "zstd",
+        min_bytes: int = 256,
+        level: Optional[int] = None,
+        format: str = "json"
+    ):
+        if format not in _FORMATS:
+            raise ValueError(f"Unsupported cache payload format: {format}")
+        self.codec = BlobCodec(compression, min_bytes=min_bytes, level=level)
+        self.format = format
+        self._msgpack = _msgpack() if format == "msgpack" else None
+
+        self.raw_bytes = 0
+        self.stored_bytes = 0
+
+    def dumps(self, value: str) -> bytes:
+        raw = text = value.encode("utf-8")
+        if self._msgpack is not None:
+            raw = self._msgpack.packb(json.loads(value), use_bin_type=True)
+        encoding, data = self.codec.compress(raw)
+        self.raw_bytes += len(text)
+        self.stored_bytes += len(data) + 3
+        return bytes((VERSION, _CODECS[encoding], _FORMATS[self.format])) + data
+
+    def loads(self, data: Union[bytes, str, None]) -> Optional[str]:
+        if data is None:
+            return None
+        if isinstance(data, str):
+            return data
+        if not data or data[0] != VERSION:
+            # Legacy entry: UTF-8 JSON text without a header
+            return data.decode("utf-8")
+        raw = self.codec.decompress(_CODEC_NAMES[data[1]], data[3:])
+        if _FORMAT_NAMES[data[2]] == "msgpack":
+            return json.dumps(_msgpack().unpackb(raw, raw=False))
+        return raw.decode("utf-8")
+
+    @property
+    def stats(self) -> Dict[str, float]:
+        return {
+            "raw_bytes": self.raw_bytes,
+            "stored_bytes": self.stored_bytes,
+            "bytes_saved": self.raw_bytes - self.stored_bytes,
+            "ratio": self.raw_bytes / self.stored_bytes if self.stored_bytes else 0.0,
+        }
@@ -0,0 +1,175 @@
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+from aicog_v2.core.interfaces import AICache
+
+class MemoryCache(AICache):
+    """
+    Bounded in-process cache with per-entry TTL and LRU eviction.
+    Capacity is limited both by number of entries and by total payload bytes.
+    """
+
+    supports_delete_prefix = True
+
+    def __init__(self, max_entries: int = 10_000, max_bytes: int = 64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        # key -> (value, expires_at, size)
+        self._data: "OrderedDict[str, Tuple[str, float, int]]" = OrderedDict()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    @staticmethod
+    def _sizeof(key: str, value: str) -> int:
+        return len(key) + len(value)
+
+    async def get(self, key: str) -> Optional[str]:
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        value, expires_at, _ = entry
+        if expires_at <= time.monotonic():
+            self._remove(key)
+            self.expirations += 1
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    async def get_with_ttl(self, key: str) -> Tuple[Optional[str], Optional[float]]:
+        value = await self.get(key)
+        if value is None:
+            return None, None
+        return value, self._data[key][1] - time.monotonic()
+
+    async def get_many_with_ttl(self, keys: List[str]) -> List[Tuple[Optional[str], Optional[float]]]:
+        return [await self.get_with_ttl(key) for key in keys]
+
+    async def set(self, key: str, value: str, ttl: int = 3600):
+        size = self._sizeof(key, value)
+        if size > self.max_bytes:
+            # Never let a single oversized entry flush the whole tier
+            return
+        if key in self._data:
+            self._remove(key)
+        self._data[key] = (value, time.monotonic() + ttl, size)
+        self.current_bytes += size
+        while len(self._data) > self.max_entries or self.current_bytes > self.max_bytes:
+            oldest = next(iter(self._data))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def _remove(self, key: str):
+        _, _, size = self._data.pop(key)
+        self.current_bytes -= size
+
+    def clear(self):
+        self._data.clear()
+        self.current_bytes = 0
+
+    async def delete_prefix(self, prefix: str) -> int:
+        keys = [key for key in self._data if key.startswith(prefix)]
+        for key in keys:
+            self._remove(key)
+        return len(keys)
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "entries": len(self._data),
+            "bytes": self.current_bytes,
+        }
+
+class TieredCache(AICache):
+    """
+    Two-tier cache: a local MemoryCache (L1) in front of a shared cache such
+    as RedisCache (L2). Reads try L1 first; L2 hits are promoted into L1.
+    Writes go to both tiers.
+
+    `local_ttl` caps how long an entry lives in L1 so that other gateway
+    processes' updates to L2 become visible within a bounded time. Promoted
+    entries never outlive their remaining L2 TTL.
+    """
+
+    def __init__(
+        self,
+        remote: AICache,
+        local: Optional[MemoryCache] = None,
+        local_ttl: int = 300
+    ):
+        self.remote = remote
+        self.local = local if local is not None else MemoryCache()
+        self.local_ttl = local_ttl
+        self.remote_hits = 0
+        self.remote_misses = 0
+
+    async def get(self, key: str) -> Optional[str]:
+        value = await self.local.get(key)
+        if value is not None:
+            return value
+
+        value, remaining = await self.remote.get_with_ttl(key)
+        if value is None:
+            self.remote_misses += 1
+            return None
+        self.remote_hits += 1
+        await self._promote(key, value, remaining)
+        return value
+
+    async def _promote(self, key: str, value: str, remaining: Optional[float]):
+        ttl = self.local_ttl if remaining is None else min(self.local_ttl, remaining)
+        if ttl > 0:
+            await self.local.set(key, value, ttl)
+
+    async def set(self, key: str, value: str, ttl: int = 3600):
+        await self.local.set(key, value, min(ttl, self.local_ttl))
+        await self.remote.set(key, value, ttl)
+
+    async def get_many(self, keys: List[str]) -> List[Optional[str]]:
+        values = [await self.local.get(key) for key in keys]
+        missing = [i for i, value in enumerate(values) if value is None]
+        if not missing:
+            return values
+
+        remote_values = await self.remote.get_many_with_ttl([keys[i] for i in missing])
+        for i, (value, remaining) in zip(missing, remote_values):
+            if value is None:
+                self.remote_misses += 1
+                continue
+            self.remote_hits += 1
+            values[i] = value
+            await self._promote(keys[i], value, remaining)
+        return values
+
+    async def set_many(self, items: Dict[str, str], ttl: int = 3600):
+        local_ttl = min(ttl, self.local_ttl)
+        for key, value in items.items():
+            await self.local.set(key, value, local_ttl)
+        await self.remote.set_many(items, ttl)
+
+    @property
+    def supports_delete_prefix(self) -> bool:
+        return self.remote.supports_delete_prefix
+
+    async def delete_prefix(self, prefix: str) -> int:
+        await self.local.delete_prefix(prefix)
+        return await self.remote.delete_prefix(prefix)
+
+    @property
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        return {
+            "local": self.local.stats,
+            "remote": {"hits": self.remote_hits, "misses": self.remote_misses},
+        }
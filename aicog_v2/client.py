@@ -1,31 +1,105 @@
 import time
-import hashlib
-import json
-from typing import Optional, Dict, Any, Union
+import asyncio
+import functools
+from typing import TYPE_CHECKING, Optional, Dict, Any, Union, List, Tuple, AsyncIterator, Awaitable, Callable
 
-from aicog_v2.core.interfaces import AIResponse, AIProvider
-from aicog_v2.cache.redis_backend import RedisCache
-from aicog_v2.storage.sqlite_backend import SQLiteStorage
+from aicog_v2.core.interfaces import AIResponse, AIProvider, AICache, AIStream, StreamChunk
+from aicog_v2.cache.semantic import SemanticCache
+from aicog_v2.cache.keys import CacheKeyBuilder
+from aicog_v2.cache.policy import CachePolicy, RefreshScheduler
 from aicog_v2.core.routing import ModelRouter
 from aicog_v2.core.utils import TokenEstimator
+from aicog_v2.core.conversation import Conversation
+from aicog_v2.core.fastpath import ResponseData, build_response, copy_response, json_dumps
+from aicog_v2.core.coalescing import RequestCoalescer
+from aicog_v2.core.resilience import ResiliencePolicy
+from aicog_v2.core.ratelimit import RateLimiter
+from aicog_v2.core.retry import is_rate_limited, retry_after_seconds
+from aicog_v2.core.metrics import GatewayMetrics, NullMetrics
+
+if TYPE_CHECKING:
+    # Backends are only imported by the code that constructs them
+    from aicog_v2.storage.sqlite_backend import SQLiteStorage
+    from aicog_v2.core.http import HTTPPool
 
 class AiCogClient:
     def __init__(
         self,
         providers: Dict[str, AIProvider],
-        cache: Optional[RedisCache] = None,
-        storage: Optional[SQLiteStorage] = None,
-        default_provider: str = "groq"
+        cache: Optional[AICache] = None,
+        storage: Optional["SQLiteStorage"] = None,
+        default_provider: str = "groq",
+        coalescer: Optional[RequestCoalescer] = None,
+        router: Optional[ModelRouter] = None,
+        resilience: Optional[ResiliencePolicy] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        semantic_cache: Optional[SemanticCache] = None,
+        metrics: Optional[GatewayMetrics] = None,
+        http_pool: Optional["HTTPPool"] = None,
+        key_builder: Optional[CacheKeyBuilder] = None,
+        cache_policy: Optional[CachePolicy] = None
     ):
         self.providers = providers
         self.cache = cache
         self.storage = storage
         self.default_provider = default_provider
-        self.router = ModelRouter()
+        self.router = router or ModelRouter()
+        # Identical in-flight requests share a single provider call
+        self.coalescer = coalescer or RequestCoalescer()
+        # Circuit breakers, fallback chain and hedging (disabled when None)
+        self.resilience = resilience
+        # Client-side RPM/TPM admission control (disabled when None)
+        self.rate_limiter = rate_limiter
+        # Near-duplicate prompt matching behind the exact cache (disabled when None)
+        self.semantic_cache = semantic_cache
+        # Stage timings, counters and optional tracing (no-ops when None)
+        self.metrics = metrics or NullMetrics()
+        if resilience is not None:
+            resilience.metrics = self.metrics
+        for name, provider in providers.items():
+            # Providers that retry inside a call report each retry here
+            if hasattr(provider, "on_retry"):
+                provider.on_retry = functools.partial(self.metrics.provider_retry, name)
+        # Shared provider connection pool, closed by aclose() (optional)
+        self.http_pool = http_pool
+        # Namespaced, versioned cache keys over provider, model and generation kwargs
+        self.key_builder = key_builder or CacheKeyBuilder()
+        # TTLs per task category and stale-while-revalidate (1h TTL when None)
+        self.cache_policy = cache_policy or CachePolicy()
+        self.refresher = RefreshScheduler(
+            self.cache_policy.max_refreshes, self.cache_policy.max_pending_refreshes
+        )
+        # Characters per chunk when replaying a cached response as a stream
+        self.replay_chunk_size = 64
+
+    def _generate_cache_key(
+        self,
+        prompt: str,
+        model: str,
+        system_prompt: Optional[str],
+        provider_name: str,
+        params: Dict[str, Any]
+    ) -> str:
+        history = params.get("messages")
+        return self.key_builder.build(
+            prompt, model, provider_name, system_prompt, params, history.key if history else ""
+        )
 
-    def _generate_cache_key(self, prompt: str, model: str, system_prompt: Optional[str]) -> str:
-        data = f"{system_prompt or ''}:{prompt}:{model}"
-        return hashlib.sha256(data.encode()).hexdigest()
+    async def invalidate_cache(self) -> int:
+        """
+        Deletes every cached response under the current key namespace and
+        version; returns the number of entries removed. Bumping
+        `key_builder.version` invalidates instantly without a scan, and is
+        the way to invalidate caches that cannot delete by prefix.
+        """
+        if self.cache is None:
+            return 0
+        if not self.cache.supports_delete_prefix:
+            raise NotImplementedError(
+                f"{type(self.cache).__name__} cannot delete entries by prefix; "
+                "bump key_builder.version to invalidate its entries instead"
+            )
+        return await self.cache.delete_prefix(self.key_builder.prefix)
 
     async def generate(
         self,
@@ -34,55 +108,758 @@ class AiCogClient:
         provider_name: Optional[str] = None,
         system_prompt: Optional[str] = None,
         use_cache: bool = True,
+        priority: int = 0,
+        cache_ttl: Optional[int] = None,
+        force_cache: bool = False,
+        messages: Optional[Union[Conversation, List[Dict[str, str]]]] = None,
         **kwargs
     ) -> AIResponse:
-        # 0. Auto-Routing (If model is not specified)
+        """
+        `priority` orders requests waiting on the rate limiter (higher first).
+        `cache_ttl` overrides the cache TTL for this response; 0 leaves it
+        out of the cache. Sampled calls
+        (`temperature > 0` without a `seed`) bypass the cache unless
+        `force_cache=True`.
+
+        `messages` holds the prior turns of a multi-turn call; `prompt` is the
+        new user turn. Pass a Conversation to key and count tokens of the
+        history incrementally (a plain list is re-hashed on every call).
+        """
+        metrics = self.metrics
+        # Rejected before the provider call, not when the response is stored
+        CachePolicy.check_ttl(cache_ttl)
+        use_cache = use_cache and self.key_builder.cacheable(kwargs, force_cache)
+        history = self._attach_history(kwargs, messages)
+        start_time = time.perf_counter()
+        with metrics.span("aicog.generate"):
+            # 0. Auto-Routing (If model is not specified)
+            with metrics.stage("route"):
+                provider_name, model, _ = self._resolve(prompt, model, provider_name, history)
+
+            # 1. Cache Lookup
+            cache_key = self._generate_cache_key(prompt, model, system_prompt, provider_name, kwargs)
+            if use_cache and self.cache is not None:
+                with metrics.stage("cache_get", provider_name, model):
+                    cached = await self._cache_lookup(
+                        cache_key, model, provider_name,
+                        self._revalidator(provider_name, model, prompt, system_prompt, cache_key, cache_ttl, kwargs)
+                    )
+                metrics.cache_lookup("exact", cached is not None)
+                if cached:
+                    metrics.request(provider_name, model, "cache_hit", time.perf_counter() - start_time)
+                    return cached
+                cached = await self._semantic_lookup(prompt, model, provider_name, system_prompt, kwargs, cache_ttl)
+                if cached:
+                    metrics.request(provider_name, model, "semantic_hit", time.perf_counter() - start_time)
+                    return cached
+
+            try:
+                response = await self._generate_live(
+                    provider_name, model, prompt, system_prompt, cache_key, use_cache, priority, cache_ttl, **kwargs
+                )
+            except Exception:
+                metrics.request(provider_name, model, "error", time.perf_counter() - start_time)
+                raise
+            metrics.request(
+                provider_name, model, "coalesced" if response.cached else "miss", time.perf_counter() - start_time
+            )
+            return response
+
+    async def chat(self, conversation: Conversation, prompt: str, **kwargs) -> AIResponse:
+        """
+        Sends `prompt` as the next user turn of `conversation`, then appends
+        the user turn and the reply to it. Takes the same options as `generate`.
+        """
+        response = await self.generate(prompt, messages=conversation, **kwargs)
+        conversation.append("user", prompt)
+        conversation.append("assistant", response.content)
+        return response
+
+    def _resolve(
+        self,
+        prompt: str,
+        model: Optional[str],
+        provider_name: Optional[str],
+        history: Optional[Conversation] = None,
+        token_count: Optional[int] = None
+    ) -> Tuple[str, str, AIProvider]:
         if not model:
-            token_est = TokenEstimator.estimate(prompt)
-            provider_name, model = self.router.route(prompt, token_est)
+            if token_count is None:
+                token_count = TokenEstimator.estimate(prompt)
+            token_est = token_count + (history.tokens if history else 0)
+            provider_name, model = self.router.route(prompt, token_est, available=self.providers.keys())
         else:
             provider_name = provider_name or self.default_provider
         provider = self.providers.get(provider_name)
-        
+
         if not provider:
             raise ValueError(f"Provider {provider_name} not configured.")
+        return provider_name, model, provider
 
-        # 1. Cache Lookup
-        cache_key = self._generate_cache_key(prompt, model, system_prompt)
-        if use_cache and self.cache:
-            cached_val = await self.cache.get(cache_key)
-            if cached_val:
-                data = json.loads(cached_val)
-                return AIResponse(
-                    content=data["content"],
-                    model=model,
-                    provider=provider_name,
-                    usage=data.get("usage", {"input_tokens": 0, "output_tokens": 0, "total_tokens": 0}),
-                    latency=data.get("latency", 0.0),
-                    cached=True
+    @staticmethod
+    def _attach_history(
+        kwargs: Dict[str, Any],
+        messages: Optional[Union[Conversation, List[Dict[str, str]]]]
+    ) -> Optional[Conversation]:
+        """
+        Passes prior turns to providers as `messages=`, as a Conversation so
+        its prefix key and token count are reused.
+        """
+        if messages is None:
+            return None
+        history = kwargs["messages"] = Conversation.of(messages)
+        return history
+
+    async def _generate_live(
+        self,
+        provider_name: str,
+        model: str,
+        prompt: str,
+        system_prompt: Optional[str],
+        cache_key: str,
+        use_cache: bool,
+        priority: int = 0,
+        cache_ttl: Optional[int] = None,
+        **kwargs
+    ) -> AIResponse:
+        async def _call() -> AIResponse:
+            # 2. API Call
+            response, used_provider, used_model = await self._invoke(
+                provider_name, model, prompt, system_prompt, priority, **kwargs
+            )
+            await self._record(response, used_provider, used_model, prompt, cache_key, use_cache, cache_ttl)
+            if use_cache and cache_ttl != 0:
+                self._index_similar(prompt, model, system_prompt, cache_key, kwargs)
+            return response
+
+        if not use_cache:
+            return await _call()
+
+        # Followers of an in-flight identical request reuse the leader's response
+        wait_for = None
+        if self.cache is not None:
+            wait_for = lambda: self._cache_lookup(cache_key, model, provider_name)
+        response, is_leader = await self.coalescer.run(cache_key, _call, wait_for=wait_for)
+        if not is_leader:
+            return copy_response(response, cached=True)
+        return response
+
+    async def _invoke(
+        self,
+        provider_name: str,
+        model: str,
+        prompt: str,
+        system_prompt: Optional[str],
+        priority: int = 0,
+        **kwargs
+    ) -> Tuple[AIResponse, str, str]:
+        """
+        Calls the provider, through the rate limiter and resilience policy
+        when configured. Returns (response, provider_name, model) of the
+        route that answered.
+        """
+        metrics = self.metrics
+
+        async def call(name: str, model_name: str, reserved: int) -> AIResponse:
+            with metrics.stage("provider", name, model_name):
+                response = await self.providers[name].generate(prompt, model_name, system_prompt, **kwargs)
+            self.router.record(name, model_name, response.latency)
+            if self.rate_limiter:
+                self.rate_limiter.reconcile(
+                    name, model_name, reserved, response.usage.get("total_tokens", reserved)
                 )
+            return response
+
+        return await self._attempts(provider_name, model, prompt, system_prompt, priority, kwargs, call)
+
+    async def _attempts(
+        self,
+        provider_name: str,
+        model: str,
+        prompt: str,
+        system_prompt: Optional[str],
+        priority: int,
+        kwargs: Dict[str, Any],
+        call: Callable[[str, str, int], Awaitable[Any]],
+        hedge: Optional[bool] = None
+    ) -> Tuple[Any, str, str]:
+        """
+        Runs `call(provider, model, reserved_tokens)` for the requested route:
+        admitted by the rate limiter, retried on 429s, and along the breakers
+        and fallback chain when resilience is configured. `call` settles the
+        reservation once it succeeds; failed and cancelled calls are settled
+        here. Returns (result, provider_name, model) of the route that answered.
+        """
+        metrics = self.metrics
+        attempts = 0
+
+        async def attempt(name: str, model_name: str) -> Any:
+            nonlocal attempts
+            provider = self.providers[name]
+            # Providers built with retry_rate_limits=False raise 429s at once; retrying
+            # them here sends every attempt through the rate limiter
+            budget = 1 if getattr(provider, "retry_rate_limits", True) else getattr(provider, "max_retries", 1)
+            for tries in range(1, budget + 1):
+                attempts += 1
+                if attempts > 1:
+                    metrics.retry(name, model_name)
+                with metrics.stage("rate_limit", name, model_name):
+                    reserved = await self._admit(name, model_name, prompt, system_prompt, priority, kwargs)
+                start_time = time.time()
+                try:
+                    return await call(name, model_name, reserved)
+                except asyncio.CancelledError:
+                    # e.g. the losing side of a hedge
+                    if self.rate_limiter:
+                        self.rate_limiter.reconcile(name, model_name, reserved, 0)
+                    raise
+                except Exception as e:
+                    metrics.provider_error(name, model_name, e)
+                    self.router.record(name, model_name, time.time() - start_time, error=True)
+                    retrying = tries < budget and is_rate_limited(e)
+                    delay = retry_after_seconds(e)
+                    if retrying and delay is None:
+                        # Same backoff as the providers' retry policy when no header is sent
+                        delay = min(2 ** tries, 10)
+                    paused = False
+                    if self.rate_limiter:
+                        self.rate_limiter.reconcile(name, model_name, reserved, 0)
+                        if delay:
+                            paused = self.rate_limiter.pause(name, model_name, delay)
+                    if not retrying:
+                        raise
+                    if not paused:
+                        await asyncio.sleep(delay)
+
+        if self.resilience is None:
+            return await attempt(provider_name, model), provider_name, model
+
+        def p95(name: str, model_name: str) -> Optional[float]:
+            stats = self.router.tracker.get(name, model_name)
+            return stats.p95 if stats else None
 
-        # 2. API Call
-        response = await provider.generate(prompt, model, system_prompt, **kwargs)
+        chain = self.resilience.chain(provider_name, model, self.providers)
+        return await self.resilience.execute(chain, attempt, p95, hedge)
 
-        # 3. Store in Cache
-        if use_cache and self.cache:
+    async def _admit(
+        self,
+        provider_name: str,
+        model: str,
+        prompt: str,
+        system_prompt: Optional[str],
+        priority: int,
+        kwargs: Dict[str, Any]
+    ) -> int:
+        """
+        Waits for rate-limiter admission; returns the number of tokens reserved.
+        """
+        if not self.rate_limiter:
+            return 0
+        reserved = TokenEstimator.estimate(f"{system_prompt or ''} {prompt}")
+        history = kwargs.get("messages")
+        if history:
+            reserved += history.tokens
+        reserved += kwargs.get("max_tokens") or self.rate_limiter.expected_output_tokens
+        await self.rate_limiter.acquire(provider_name, model, reserved, priority)
+        return reserved
+
+    async def _record(
+        self,
+        response: AIResponse,
+        provider_name: str,
+        model: str,
+        prompt: str,
+        cache_key: str,
+        use_cache: bool,
+        cache_ttl: Optional[int] = None
+    ):
+        metrics = self.metrics
+        metrics.usage(provider_name, model, response.usage)
+
+        # 3. Store in Cache (cache_ttl=0: served from the cache but never stored)
+        if use_cache and self.cache is not None and cache_ttl != 0:
+            policy = self.cache_policy
+            ttl = policy.ttl_for(self.router.classify_task(prompt) if policy.task_ttls else None, cache_ttl)
             cache_data = {
                 "content": response.content,
+                # The route that answered, which is not the keyed route after a fallback
+                "provider": provider_name,
+                "model": model,
                 "usage": response.usage,
                 "latency": response.latency
             }
-            await self.cache.set(cache_key, json.dumps(cache_data))
+            if policy.stale_ttl:
+                cache_data["fresh_until"] = time.time() + ttl
+            with metrics.stage("cache_set", provider_name, model):
+                await self.cache.set(cache_key, json_dumps(cache_data), policy.hard_ttl(ttl))
 
         # 4. Persistence Logging
         if self.storage:
-            await self.storage.log_request(
-                provider=provider_name,
-                model=model,
-                prompt=prompt,
-                response=response.content,
-                latency=response.latency,
-                usage=response.usage
+            with metrics.stage("storage", provider_name, model):
+                await self.storage.log_request(
+                    provider=provider_name,
+                    model=model,
+                    prompt=prompt,
+                    response=response.content,
+                    latency=response.latency,
+                    usage=response.usage,
+                    first_token_latency=response.first_token_latency
+                )
+
+    def stream(
+        self,
+        prompt: str,
+        model: Optional[str] = None,
+        provider_name: Optional[str] = None,
+        system_prompt: Optional[str] = None,
+        use_cache: bool = True,
+        priority: int = 0,
+        cache_ttl: Optional[int] = None,
+        force_cache: bool = False,
+        messages: Optional[Union[Conversation, List[Dict[str, str]]]] = None,
+        **kwargs
+    ) -> AIStream:
+        """
+        Streams the response as StreamChunks:
+
+            stream = sdk.stream("...")
+            async for chunk in stream:
+                print(chunk.content, end="")
+            stream.response.display()
+
+        The stream is teed: once it completes, the assembled response is
+        cached and logged like a regular `generate` call. Cache hits are
+        replayed as a stream.
+        """
+        CachePolicy.check_ttl(cache_ttl)
+        use_cache = use_cache and self.key_builder.cacheable(kwargs, force_cache)
+        self._attach_history(kwargs, messages)
+        return AIStream(
+            self._stream(prompt, model, provider_name, system_prompt, use_cache, priority, cache_ttl, **kwargs)
+        )
+
+    async def _stream(
+        self,
+        prompt: str,
+        model: Optional[str],
+        provider_name: Optional[str],
+        system_prompt: Optional[str],
+        use_cache: bool,
+        priority: int = 0,
+        cache_ttl: Optional[int] = None,
+        **kwargs
+    ) -> AsyncIterator[Union[StreamChunk, AIResponse]]:
+        # 0. Auto-Routing (If model is not specified)
+        history = kwargs.get("messages")
+        provider_name, model, _ = self._resolve(prompt, model, provider_name, history)
+
+        # 1. Cache Lookup -> replay
+        metrics = self.metrics
+        request_start = time.perf_counter()
+        cache_key = self._generate_cache_key(prompt, model, system_prompt, provider_name, kwargs)
+        if use_cache and self.cache is not None:
+            with metrics.stage("cache_get", provider_name, model):
+                cached = await self._cache_lookup(
+                    cache_key, model, provider_name,
+                    self._revalidator(provider_name, model, prompt, system_prompt, cache_key, cache_ttl, kwargs)
+                )
+            metrics.cache_lookup("exact", cached is not None)
+            outcome = "cache_hit"
+            if not cached:
+                outcome = "semantic_hit"
+                cached = await self._semantic_lookup(prompt, model, provider_name, system_prompt, kwargs, cache_ttl)
+            if cached:
+                metrics.request(provider_name, model, outcome, time.perf_counter() - request_start)
+                for start in range(0, len(cached.content), self.replay_chunk_size):
+                    yield StreamChunk(content=cached.content[start:start + self.replay_chunk_size])
+                yield StreamChunk(usage=cached.usage, finish_reason="stop")
+                yield copy_response(cached, first_token_latency=0.0)
+                return
+
+        # 2. Streaming API Call: the stream is opened like a generate call (retries,
+        # breakers, fallbacks) and committed to once its first chunk arrives
+        async def open_stream(name: str, model_name: str, reserved: int):
+            start_time = time.time()
+            chunks = self.providers[name].stream(prompt, model_name, system_prompt, **kwargs)
+            try:
+                first = await self._next_chunk(chunks)
+            except BaseException:
+                await self._close_chunks(chunks)
+                raise
+            return chunks, first, reserved, start_time
+
+        try:
+            # Hedging would open a second billed stream for every slow first token
+            opened, provider_name, model = await self._attempts(
+                provider_name, model, prompt, system_prompt, priority, kwargs, open_stream, hedge=False
             )
+        except Exception:
+            metrics.request(provider_name, model, "error", time.perf_counter() - request_start)
+            raise
+        chunks, chunk, reserved, start_time = opened
+        first_token_latency = None
+        parts: List[str] = []
+        usage = None
+        completed = failed = False
+        try:
+            while chunk is not None:
+                if chunk.content:
+                    if first_token_latency is None:
+                        first_token_latency = time.time() - start_time
+                    parts.append(chunk.content)
+                if chunk.usage:
+                    usage = chunk.usage
+                yield chunk
+                chunk = await self._next_chunk(chunks)
+            completed = True
+        except Exception as e:
+            failed = True
+            metrics.provider_error(provider_name, model, e)
+            self.router.record(provider_name, model, time.time() - start_time, error=True)
+            if self.resilience is not None:
+                self.resilience.breaker(provider_name).record_error(e)
+            raise
+        finally:
+            if not completed:
+                # Failed, or abandoned by the consumer (GeneratorExit or cancellation):
+                # close the provider stream and settle what was generated so far
+                await self._close_chunks(chunks)
+                if failed:
+                    if self.rate_limiter:
+                        self.rate_limiter.reconcile(provider_name, model, reserved, 0)
+                    metrics.request(provider_name, model, "error", time.perf_counter() - request_start)
+                else:
+                    partial = self._streamed_response(
+                        parts, usage, model, provider_name, prompt, system_prompt, history,
+                        time.time() - start_time, first_token_latency
+                    )
+                    if self.rate_limiter:
+                        self.rate_limiter.reconcile(provider_name, model, reserved, partial.usage["total_tokens"])
+                    metrics.request(provider_name, model, "abandoned", time.perf_counter() - request_start)
+                    # Logged for the audit trail, never cached
+                    await self._record(partial, provider_name, model, prompt, cache_key, False)
 
-        return response
+        response = self._streamed_response(
+            parts, usage, model, provider_name, prompt, system_prompt, history,
+            time.time() - start_time, first_token_latency
+        )
+        metrics.observe_stage("provider", response.latency, provider_name, model)
+        self.router.record(provider_name, model, response.latency)
+        if self.rate_limiter:
+            self.rate_limiter.reconcile(
+                provider_name, model, reserved, response.usage.get("total_tokens", reserved)
+            )
+        await self._record(response, provider_name, model, prompt, cache_key, use_cache, cache_ttl)
+        if use_cache and cache_ttl != 0:
+            self._index_similar(prompt, model, system_prompt, cache_key, kwargs)
+        metrics.request(provider_name, model, "miss", time.perf_counter() - request_start)
+        yield response
+
+    @staticmethod
+    def _streamed_response(
+        parts: List[str],
+        usage: Optional[Dict[str, int]],
+        model: str,
+        provider_name: str,
+        prompt: str,
+        system_prompt: Optional[str],
+        history: Optional[Conversation],
+        latency: float,
+        first_token_latency: Optional[float]
+    ) -> AIResponse:
+        content = "".join(parts)
+        if usage is None:
+            # Provider did not report usage for the stream; fall back to estimates
+            input_tokens = TokenEstimator.estimate(f"{system_prompt or ''} {prompt}")
+            input_tokens += history.tokens if history else 0
+            output_tokens = TokenEstimator.estimate(content)
+            usage = {
+                "input_tokens": input_tokens,
+                "output_tokens": output_tokens,
+                "total_tokens": input_tokens + output_tokens
+            }
+        return build_response(content, model, provider_name, usage, latency, first_token_latency=first_token_latency)
+
+    @staticmethod
+    async def _next_chunk(chunks: AsyncIterator[StreamChunk]) -> Optional[StreamChunk]:
+        try:
+            return await chunks.__anext__()
+        except StopAsyncIteration:
+            return None
+
+    @staticmethod
+    async def _close_chunks(chunks: AsyncIterator[StreamChunk]):
+        aclose = getattr(chunks, "aclose", None)
+        if aclose is not None:
+            await aclose()
+
+    async def generate_many(
+        self,
+        prompts: List[str],
+        model: Optional[str] = None,
+        provider_name: Optional[str] = None,
+        system_prompt: Optional[str] = None,
+        use_cache: bool = True,
+        max_concurrency: int = 8,
+        concurrency_limits: Optional[Dict[str, int]] = None,
+        priority: int = 0,
+        cache_ttl: Optional[int] = None,
+        force_cache: bool = False,
+        messages: Optional[Union[Conversation, List[Dict[str, str]]]] = None,
+        **kwargs
+    ) -> List[Union[AIResponse, Exception]]:
+        """
+        Generates responses for many prompts. Returns results in input order;
+        a failed item holds its exception instead of failing the whole batch.
+        """
+        results: List[Union[AIResponse, Exception]] = [None] * len(prompts)
+        async for index, result in self.iter_generate_many(
+            prompts,
+            model=model,
+            provider_name=provider_name,
+            system_prompt=system_prompt,
+            use_cache=use_cache,
+            max_concurrency=max_concurrency,
+            concurrency_limits=concurrency_limits,
+            priority=priority,
+            cache_ttl=cache_ttl,
+            force_cache=force_cache,
+            messages=messages,
+            **kwargs
+        ):
+            results[index] = result
+        return results
+
+    async def iter_generate_many(
+        self,
+        prompts: List[str],
+        model: Optional[str] = None,
+        provider_name: Optional[str] = None,
+        system_prompt: Optional[str] = None,
+        use_cache: bool = True,
+        max_concurrency: int = 8,
+        concurrency_limits: Optional[Dict[str, int]] = None,
+        ordered: bool = False,
+        priority: int = 0,
+        cache_ttl: Optional[int] = None,
+        force_cache: bool = False,
+        messages: Optional[Union[Conversation, List[Dict[str, str]]]] = None,
+        **kwargs
+    ) -> AsyncIterator[Tuple[int, Union[AIResponse, Exception]]]:
+        """
+        Streams (index, result) pairs as items complete, or in input order
+        when `ordered=True`.
+
+        Each prompt is routed on its own when `model` is not given. Cache hits
+        are looked up in bulk first and only the misses are sent to providers.
+        At most `max_concurrency` calls run at once per provider, across all
+        of its models; `concurrency_limits` overrides that per provider name.
+        `messages` is a history shared by every prompt.
+        """
+        CachePolicy.check_ttl(cache_ttl)
+        use_cache = use_cache and self.key_builder.cacheable(kwargs, force_cache)
+        history = self._attach_history(kwargs, messages)
+        concurrency_limits = concurrency_limits or {}
+        pending: Dict[int, Union[AIResponse, Exception]] = {}
+        next_index = 0
+
+        def emit(index: int, result: Union[AIResponse, Exception]):
+            nonlocal next_index
+            if not ordered:
+                yield index, result
+                return
+            pending[index] = result
+            while next_index in pending:
+                yield next_index, pending.pop(next_index)
+                next_index += 1
+
+        # 0. Auto-Routing per item
+        routed: Dict[int, Tuple[str, str, AIProvider, str]] = {}
+        token_counts = TokenEstimator.estimate_many(prompts) if not model else [None] * len(prompts)
+        for index, prompt in enumerate(prompts):
+            try:
+                item_provider, item_model, provider = self._resolve(
+                    prompt, model, provider_name, history, token_counts[index]
+                )
+            except Exception as e:
+                for item in emit(index, e):
+                    yield item
+                continue
+            cache_key = self._generate_cache_key(prompt, item_model, system_prompt, item_provider, kwargs)
+            routed[index] = (item_provider, item_model, provider, cache_key)
+
+        # 1. Bulk Cache Lookup
+        if use_cache and self.cache is not None and routed:
+            indexes = list(routed)
+            hits = await self._cache_lookup_many([routed[i][3] for i in indexes])
+            for index, cached_val in zip(indexes, hits):
+                self.metrics.cache_lookup("exact", bool(cached_val))
+                if not cached_val:
+                    continue
+                item_provider, item_model, _, cache_key = routed.pop(index)
+                refresh = self._revalidator(
+                    item_provider, item_model, prompts[index], system_prompt, cache_key, cache_ttl, kwargs
+                )
+                cached = self._cached_response(cached_val, item_model, item_provider, cache_key, refresh)
+                for item in emit(index, cached):
+                    yield item
+
+        # 2. Bounded concurrent provider calls for the misses
+        semaphores: Dict[str, asyncio.Semaphore] = {}
+
+        async def run_one(index: int) -> Tuple[int, Union[AIResponse, Exception]]:
+            item_provider, item_model, _, cache_key = routed[index]
+            if item_provider not in semaphores:
+                semaphores[item_provider] = asyncio.Semaphore(
+                    concurrency_limits.get(item_provider, max_concurrency)
+                )
+            try:
+                if use_cache and self.cache is not None:
+                    similar = await self._semantic_lookup(
+                        prompts[index], item_model, item_provider, system_prompt, kwargs, cache_ttl
+                    )
+                    if similar:
+                        return index, similar
+                async with semaphores[item_provider]:
+                    result = await self._generate_live(
+                        item_provider, item_model, prompts[index],
+                        system_prompt, cache_key, use_cache, priority, cache_ttl, **kwargs
+                    )
+            except Exception as e:
+                result = e
+            return index, result
+
+        tasks = [asyncio.ensure_future(run_one(index)) for index in routed]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                index, result = await next_done
+                for item in emit(index, result):
+                    yield item
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _cache_lookup(
+        self,
+        cache_key: str,
+        model: str,
+        provider_name: str,
+        refresh: Optional[Callable[[], Awaitable[None]]] = None
+    ) -> Optional[AIResponse]:
+        cached_val = await self.cache.get(cache_key)
+        if not cached_val:
+            return None
+        return self._cached_response(cached_val, model, provider_name, cache_key, refresh)
+
+    def _revalidator(
+        self,
+        provider_name: str,
+        model: str,
+        prompt: str,
+        system_prompt: Optional[str],
+        cache_key: str,
+        cache_ttl: Optional[int],
+        kwargs: Dict[str, Any]
+    ) -> Optional[Callable[[], Awaitable[None]]]:
+        """
+        Returns the background refresh for a stale hit on `cache_key`, or
+        None when stale-while-revalidate is off.
+        """
+        if not self.cache_policy.stale_ttl:
+            return None
+
+        async def refresh():
+            # Background refreshes queue behind live traffic on the rate limiter
+            response, used_provider, used_model = await self._invoke(
+                provider_name, model, prompt, system_prompt, -1, **kwargs
+            )
+            await self._record(response, used_provider, used_model, prompt, cache_key, True, cache_ttl)
+
+        return refresh
+
+    async def _semantic_lookup(
+        self,
+        prompt: str,
+        model: str,
+        provider_name: str,
+        system_prompt: Optional[str],
+        params: Dict[str, Any],
+        cache_ttl: Optional[int] = None
+    ) -> Optional[AIResponse]:
+        if not self.semantic_cache:
+            return None
+        with self.metrics.stage("semantic_lookup", provider_name, model):
+            similar_key = self.semantic_cache.lookup(
+                prompt,
+                self._semantic_scope(model, system_prompt, params),
+                self.router.classify_task(prompt)
+            )
+            cached = None
+            if similar_key:
+                # A stale near-duplicate is refreshed with this prompt, which the index deems equivalent
+                cached = await self._cache_lookup(
+                    similar_key, model, provider_name,
+                    self._revalidator(provider_name, model, prompt, system_prompt, similar_key, cache_ttl, params)
+                )
+        self.metrics.cache_lookup("semantic", cached is not None)
+        return cached
+
+    def _index_similar(
+        self,
+        prompt: str,
+        model: str,
+        system_prompt: Optional[str],
+        cache_key: str,
+        params: Dict[str, Any]
+    ):
+        if self.semantic_cache and self.cache is not None:
+            self.semantic_cache.add(prompt, self._semantic_scope(model, system_prompt, params), cache_key)
+
+    def _semantic_scope(self, model: str, system_prompt: Optional[str], params: Dict[str, Any]) -> str:
+        # Near-duplicates only match within the same kwargs and conversation prefix
+        variant = self.key_builder.fingerprint(params)
+        history = params.get("messages")
+        if history:
+            variant = f"{history.key}:{variant}"
+        return SemanticCache.scope(model, system_prompt, variant)
+
+    async def _cache_lookup_many(self, cache_keys: List[str], chunk_size: int = 1000) -> List[Optional[str]]:
+        values: List[Optional[str]] = []
+        for start in range(0, len(cache_keys), chunk_size):
+            values.extend(await self.cache.get_many(cache_keys[start:start + chunk_size]))
+        return values
+
+    def _cached_response(
+        self,
+        cached_val: str,
+        model: str,
+        provider_name: str,
+        cache_key: Optional[str] = None,
+        refresh: Optional[Callable[[], Awaitable[None]]] = None
+    ) -> AIResponse:
+        entry = ResponseData.from_cache(cached_val, model, provider_name)
+        fresh_until = entry.fresh_until
+        if refresh is not None and fresh_until is not None and time.time() >= fresh_until:
+            # Stale: serve it now, replace it in the background
+            self.refresher.schedule(cache_key, refresh)
+        return entry.to_response()
+
+    async def prewarm(self, connections: int = 1):
+        """
+        Opens pooled connections to every provider's API ahead of traffic.
+        Needs `http_pool`; providers without a `base_url` are skipped.
+        """
+        if self.http_pool is None:
+            return
+        urls = [provider.base_url for provider in self.providers.values() if getattr(provider, "base_url", None)]
+        await self.http_pool.prewarm(urls, connections)
+
+    async def aclose(self):
+        """
+        Drains buffered audit writes and releases backend resources.
+        """
+        await self.refresher.drain()
+        if self.storage:
+            await self.storage.close()
+        if self.http_pool is not None:
+            await self.http_pool.aclose()
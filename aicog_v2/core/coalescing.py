@@ -0,0 +1,166 @@
+import asyncio
+import logging
+import uuid
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+class _Flight:
+    """The shared work for one key and how many callers still wait on it."""
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 1
+
+class RequestCoalescer:
+    """
+    Single-flight layer: concurrent calls sharing a key run the work once.
+    The first caller (leader) starts it in a task of its own and every
+    caller, leader included, awaits that task. Errors are propagated to
+    every waiter. A cancelled caller, leader or not, only stops waiting;
+    the work is cancelled once nobody waits for it anymore.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[str, _Flight] = {}
+        self.leaders = 0
+        self.coalesced = 0
+
+    @property
+    def inflight(self) -> int:
+        return len(self._inflight)
+
+    async def run(
+        self,
+        key: str,
+        fn: Callable[[], Awaitable[Any]],
+        wait_for: Optional[Callable[[], Awaitable[Any]]] = None
+    ) -> Tuple[Any, bool]:
+        """
+        Returns (result, is_leader). `wait_for` is only used by distributed
+        coalescers to poll for a result published by another process.
+        """
+        flight = self._inflight.get(key)
+        if flight is not None:
+            self.coalesced += 1
+            flight.waiters += 1
+            return await self._wait(flight), False
+
+        task = asyncio.get_running_loop().create_task(self._lead(key, fn, wait_for))
+        flight = self._inflight[key] = _Flight(task)
+        task.add_done_callback(lambda done: self._finish(key, flight))
+        self.leaders += 1
+        return await self._wait(flight), True
+
+    async def _wait(self, flight: _Flight) -> Any:
+        try:
+            # shield: a cancelled caller must not cancel work others still wait for
+            return await asyncio.shield(flight.task)
+        finally:
+            flight.waiters -= 1
+            if flight.waiters == 0 and not flight.task.done():
+                flight.task.cancel()
+
+    def _finish(self, key: str, flight: _Flight):
+        if self._inflight.get(key) is flight:
+            del self._inflight[key]
+        if not flight.task.cancelled():
+            # Mark retrieved so an error nobody awaited is not logged at GC time
+            flight.task.exception()
+
+    async def _lead(
+        self,
+        key: str,
+        fn: Callable[[], Awaitable[Any]],
+        wait_for: Optional[Callable[[], Awaitable[Any]]]
+    ) -> Any:
+        return await fn()
+
+class RedisRequestCoalescer(RequestCoalescer):
+    """
+    Extends in-process coalescing across gateway processes with a Redis lock.
+    The local leader takes `SET NX PX` on a lock key. If another process already
+    holds it, we poll `wait_for` (typically a cache read) until the other
+    process publishes its result, the lock is released, or `wait_timeout` expires.
+    In the latter two cases we fall back to doing the work ourselves.
+    """
+
+    _RELEASE_SCRIPT = """
+    if redis.call('get', KEYS[1]) == ARGV[1] then
+        return redis.call('del', KEYS[1])
+    end
+    return 0
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        lock_ttl: float = 30.0,
+        poll_interval: float = 0.05,
+        wait_timeout: float = 30.0,
+        prefix: str = "aicog:lock:"
+    ):
+        super().__init__()
+        self.client = client
+        self.lock_ttl = lock_ttl
+        self.poll_interval = poll_interval
+        self.wait_timeout = wait_timeout
+        self.prefix = prefix
+        self.remote_coalesced = 0
+
+    async def _lead(
+        self,
+        key: str,
+        fn: Callable[[], Awaitable[Any]],
+        wait_for: Optional[Callable[[], Awaitable[Any]]]
+    ) -> Any:
+        lock_key = f"{self.prefix}{key}"
+        token = uuid.uuid4().hex
+        try:
+            acquired = await self.client.set(lock_key, token, nx=True, px=int(self.lock_ttl * 1000))
+        except Exception as e:
+            logger.debug(f"Redis lock acquire failed: {e}")
+            return await fn()
+
+        if acquired:
+            try:
+                return await fn()
+            finally:
+                await self._release(lock_key, token)
+
+        if wait_for is not None:
+            result = await self._wait_remote(lock_key, wait_for)
+            if result is not None:
+                self.remote_coalesced += 1
+                return result
+        return await fn()
+
+    async def _release(self, lock_key: str, token: str):
+        try:
+            await self.client.eval(self._RELEASE_SCRIPT, 1, lock_key, token)
+            return
+        except Exception as e:
+            logger.debug(f"Redis lock release script failed, falling back to GET/DEL: {e}")
+        try:
+            holder = await self.client.get(lock_key)
+            if holder is not None and (holder == token or holder == token.encode()):
+                await self.client.delete(lock_key)
+        except Exception as e:
+            logger.debug(f"Redis lock release failed: {e}")
+
+    async def _wait_remote(self, lock_key: str, wait_for: Callable[[], Awaitable[Any]]) -> Any:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.wait_timeout
+        while loop.time() < deadline:
+            await asyncio.sleep(self.poll_interval)
+            result = await wait_for()
+            if result is not None:
+                return result
+            try:
+                if not await self.client.exists(lock_key):
+                    # Holder finished (or died) without publishing; one last read.
+                    return await wait_for()
+            except Exception as e:
+                logger.debug(f"Redis lock poll failed: {e}")
+                return None
+        return None
@@ -0,0 +1,76 @@
+import json
+import hashlib
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Union
+
+from aicog_v2.core.utils import TokenEstimator
+
+# Approximate per-message token overhead of chat formats (role, separators)
+MESSAGE_OVERHEAD_TOKENS = 4
+
+class Conversation:
+    """
+    Message history with a rolling hash and token count per prefix.
+
+    Each appended message extends the previous prefix key:
+    key(k) = sha256(key(k-1) | canonical JSON of message k), so the key of
+    turn k+1 costs one message's worth of hashing rather than the whole
+    history. Messages are kept as given (`name`, `tool_calls`,
+    `tool_call_id`, ...) and keys depend only on their content, so
+    identical conversation prefixes in different sessions share cache
+    entries.
+
+        history = Conversation()
+        reply = await sdk.chat(history, "What is Redis?")
+        reply = await sdk.chat(history, "And how does it persist data?")
+    """
+
+    def __init__(self, messages: Optional[Iterable[Dict[str, Any]]] = None):
+        self.messages: List[Dict[str, Any]] = []
+        # prefix_keys[i] / prefix_tokens[i]: key and token estimate of messages[:i + 1]
+        self.prefix_keys: List[str] = []
+        self.prefix_tokens: List[int] = []
+        for message in messages or ():
+            self.add(message)
+
+    @classmethod
+    def of(cls, messages: Union["Conversation", Iterable[Dict[str, Any]]]) -> "Conversation":
+        return messages if isinstance(messages, Conversation) else cls(messages)
+
+    def append(self, role: str, content: Optional[str], **fields) -> str:
+        """
+        Adds a message built from `role`, `content` and any extra fields
+        (e.g. `tool_calls`); returns the key of the new prefix.
+        """
+        return self.add({"role": role, "content": content, **fields})
+
+    def add(self, message: Dict[str, Any]) -> str:
+        """
+        Adds a copy of a chat message dict; returns the key of the new prefix.
+        """
+        message = dict(message)
+        canonical = json.dumps(message, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+        digest = hashlib.sha256(f"{self.key}\x1e{canonical}".encode()).hexdigest()
+        self.messages.append(message)
+        self.prefix_keys.append(digest)
+        # Tool-call turns carry content=None
+        tokens = TokenEstimator.estimate(message.get("content") or "") + MESSAGE_OVERHEAD_TOKENS
+        self.prefix_tokens.append(self.tokens + tokens)
+        return digest
+
+    @property
+    def key(self) -> str:
+        return self.prefix_keys[-1] if self.prefix_keys else ""
+
+    @property
+    def tokens(self) -> int:
+        return self.prefix_tokens[-1] if self.prefix_tokens else 0
+
+    def key_at(self, length: int) -> str:
+        """Key of the first `length` messages."""
+        return self.prefix_keys[length - 1] if length else ""
+
+    def __len__(self) -> int:
+        return len(self.messages)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return iter(self.messages)
@@ -0,0 +1,102 @@
+import asyncio
+import logging
+from typing import Any, Dict, Iterable, Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+class HTTPPool:
+    """
+    One tunable `httpx.AsyncClient` shared by every provider SDK, so all
+    providers (including several OpenAI-compatible `base_url`s) draw from a
+    single keep-alive pool:
+
+        pool = HTTPPool(max_connections=200, http2=True, read_timeout=30)
+        groq = GroqProvider(api_key=..., http_client=pool.client)
+        openai = OpenAIProvider(api_key=..., http_client=pool.client)
+
+    Every request is traced, so `stats` reports how many requests reused a
+    pooled connection versus opening a new one. `http2=True` needs the
+    `h2` package (pip install aicog-v2[http2]).
+    """
+
+    def __init__(
+        self,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        keepalive_expiry: float = 30.0,
+        http2: bool = False,
+        connect_timeout: float = 5.0,
+        read_timeout: float = 60.0,
+        write_timeout: float = 30.0,
+        pool_timeout: float = 10.0
+    ):
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry
+        )
+        self.timeout = httpx.Timeout(
+            connect=connect_timeout, read=read_timeout, write=write_timeout, pool=pool_timeout
+        )
+        self.http2 = http2
+        self._client: Optional[httpx.AsyncClient] = None
+
+        self.requests = 0
+        self.new_connections = 0
+        self.tls_handshakes = 0
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                limits=self.limits,
+                timeout=self.timeout,
+                http2=self.http2,
+                event_hooks={"request": [self._attach_trace]}
+            )
+        return self._client
+
+    async def _attach_trace(self, request: httpx.Request):
+        request.extensions["trace"] = self._trace
+
+    async def _trace(self, event: str, info: Dict[str, Any]):
+        if event.endswith("send_request_headers.started"):
+            self.requests += 1
+        elif event in ("connection.connect_tcp.complete", "connection.connect_unix_socket.complete"):
+            self.new_connections += 1
+        elif event == "connection.start_tls.complete":
+            self.tls_handshakes += 1
+
+    async def prewarm(self, urls: Iterable[str], connections: int = 1):
+        """
+        Opens `connections` keep-alive connections to each URL's origin ahead
+        of the first real request, so it does not pay for TCP and TLS setup.
+        Errors, including HTTP error statuses, are ignored.
+        """
+        origins = {str(httpx.URL(url).copy_with(path="/", query=None, fragment=None)) for url in urls}
+
+        async def warm(origin: str):
+            try:
+                await self.client.head(origin)
+            except httpx.HTTPError as e:
+                logger.debug(f"Pre-warming {origin} failed: {e}")
+
+        await asyncio.gather(*[warm(origin) for origin in origins for _ in range(connections)])
+
+    @property
+    def stats(self) -> Dict[str, float]:
+        reused = max(self.requests - self.new_connections, 0)
+        return {
+            "requests": self.requests,
+            "new_connections": self.new_connections,
+            "reused_connections": reused,
+            "reuse_ratio": reused / self.requests if self.requests else 0.0,
+            "tls_handshakes": self.tls_handshakes,
+        }
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
@@ -1,7 +1,56 @@
 from abc import ABC, abstractmethod
-from typing import Any, Dict, Optional
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Tuple, Union
 from pydantic import BaseModel
 
+# Heuristic rates per 1M tokens: model -> (input $, output $)
+MODEL_RATES = {
+    "llama-3.3-70b-versatile": (0.59, 0.79),
+    "llama-3.1-8b-instant": (0.05, 0.08),
+    "gpt-4o": (5.0, 15.0),
+    "gpt-4o-mini": (0.15, 0.60),
+}
+DEFAULT_RATE = (0.10, 0.40) # Default average rate
+
+def estimate_cost(model: str, input_tokens: int, output_tokens: int) -> float:
+    """
+    Heuristic USD cost of a call, based on MODEL_RATES.
+    """
+    rate = MODEL_RATES.get(model, DEFAULT_RATE)
+    return (input_tokens / 1_000_000 * rate[0]) + (output_tokens / 1_000_000 * rate[1])
+
+def configure_pricing(
+    rates: Optional[Dict[str, Tuple[float, float]]] = None,
+    default: Optional[Tuple[float, float]] = None,
+    replace: bool = False
+):
+    """
+    Updates the shared price table used by `estimated_cost`, cost rollups,
+    metrics and cost-aware routing. `replace=True` drops the built-in rates.
+    """
+    global DEFAULT_RATE
+    if replace:
+        MODEL_RATES.clear()
+    if rates:
+        MODEL_RATES.update({model: tuple(rate) for model, rate in rates.items()})
+    if default is not None:
+        DEFAULT_RATE = tuple(default)
+
+def build_messages(
+    prompt: str,
+    system_prompt: Optional[str] = None,
+    history: Optional[Iterable[Dict[str, str]]] = None
+) -> List[Dict[str, str]]:
+    """
+    Chat message list: system prompt, prior turns, then `prompt` as the new
+    user turn (omitted when empty).
+    """
+    messages = [{"role": "system", "content": system_prompt}] if system_prompt else []
+    if history:
+        messages.extend(history)
+    if prompt:
+        messages.append({"role": "user", "content": prompt})
+    return messages
+
 class AIResponse(BaseModel):
     content: str
     model: str
@@ -9,6 +58,7 @@ class AIResponse(BaseModel):
     usage: Dict[str, int]
     latency: float
     cached: bool = False
+    first_token_latency: Optional[float] = None
 
     @property
     def estimated_cost(self) -> float:
@@ -21,18 +71,7 @@ class AIResponse(BaseModel):
 
         input_tokens = self.usage.get("input_tokens", 0)
         output_tokens = self.usage.get("output_tokens", 0)
-        
-        # Heuristic rates per 1M tokens
-        rates = {
-            "llama-3.3-70b-versatile": (0.59, 0.79),
-            "llama-3.1-8b-instant": (0.05, 0.08),
-            "gpt-4o": (5.0, 15.0),
-            "gpt-4o-mini": (0.15, 0.60),
-        }
-        
-        rate = rates.get(self.model, (0.10, 0.40)) # Default average rate
-        cost = (input_tokens / 1_000_000 * rate[0]) + (output_tokens / 1_000_000 * rate[1])
-        return cost
+        return estimate_cost(self.model, input_tokens, output_tokens)
 
     def display(self):
         """
@@ -46,13 +85,59 @@ class AIResponse(BaseModel):
         print("-" * 50)
         print(f"📄 Model   : {self.model}")
         print(f"⏱️ Latency : {self.latency:.3f}s")
+        if self.first_token_latency is not None:
+            print(f"⚡ 1st Token: {self.first_token_latency:.3f}s")
         print(f"🎫 Tokens  : {tokens_display}")
         print(f"💰 Cost    : ${self.estimated_cost:.6f}")
         print("-" * 50)
         print(f"{self.content}")
         print("="*50 + "\n")
 
+class StreamChunk(BaseModel):
+    content: str = ""
+    usage: Optional[Dict[str, int]] = None
+    finish_reason: Optional[str] = None
+
+class AIStream:
+    """
+    Async iterator over the StreamChunks of a streamed generation.
+    Once exhausted, `response` holds the assembled AIResponse.
+    """
+
+    def __init__(self, source: AsyncIterator[Union[StreamChunk, AIResponse]]):
+        self._source = source
+        self.response: Optional[AIResponse] = None
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> StreamChunk:
+        item = await self._source.__anext__()
+        # The source ends with the assembled response rather than a chunk
+        if isinstance(item, AIResponse):
+            self.response = item
+            raise StopAsyncIteration
+        return item
+
+    async def collect(self) -> AIResponse:
+        """
+        Consumes the remaining chunks and returns the assembled response.
+        """
+        async for _ in self:
+            pass
+        return self.response
+
+    async def aclose(self):
+        await self._source.aclose()
+
 class AIProvider(ABC):
+    """
+    Multi-turn calls pass the prior turns as `messages=` (a list of
+    {"role", "content"} dicts or a Conversation); `prompt` is the new user
+    turn. Providers that call a chat API build the request with
+    `build_messages`.
+    """
+
     @abstractmethod
     async def generate(
         self, 
@@ -63,7 +148,29 @@ class AIProvider(ABC):
     ) -> AIResponse:
         pass
 
+    async def stream(
+        self,
+        prompt: str,
+        model: str,
+        system_prompt: Optional[str] = None,
+        **kwargs
+    ) -> AsyncIterator[StreamChunk]:
+        """
+        Yields the response incrementally. Providers without native streaming
+        fall back to a single chunk carrying the full response.
+        """
+        response = await self.generate(prompt, model, system_prompt, **kwargs)
+        yield StreamChunk(content=response.content, usage=response.usage, finish_reason="stop")
+
 class AICache(ABC):
+    """
+    Optional capability: caches that can delete entries by key prefix set
+    `supports_delete_prefix = True` and implement
+    `async delete_prefix(prefix) -> int` (entries removed).
+    """
+
+    supports_delete_prefix = False
+
     @abstractmethod
     async def get(self, key: str) -> Optional[str]:
         pass
@@ -72,6 +179,26 @@ class AICache(ABC):
     async def set(self, key: str, value: str, ttl: int = 3600):
         pass
 
+    async def get_many(self, keys: List[str]) -> List[Optional[str]]:
+        """
+        Bulk lookup, in key order. Backends should override this with a single round trip.
+        """
+        return [await self.get(key) for key in keys]
+
+    async def set_many(self, items: Dict[str, str], ttl: int = 3600):
+        for key, value in items.items():
+            await self.set(key, value, ttl)
+
+    async def get_with_ttl(self, key: str) -> Tuple[Optional[str], Optional[float]]:
+        """
+        The value and its remaining TTL in seconds (None when unknown or the
+        entry never expires). Backends that track expiry should override this.
+        """
+        return await self.get(key), None
+
+    async def get_many_with_ttl(self, keys: List[str]) -> List[Tuple[Optional[str], Optional[float]]]:
+        return [(value, None) for value in await self.get_many(keys)]
+
 class AIStorage(ABC):
     @abstractmethod
     async def log_request(
@@ -81,6 +208,15 @@ class AIStorage(ABC):
         prompt: str, 
         response: str, 
         latency: float, 
-        usage: Dict[str, int]
+        usage: Dict[str, int],
+        first_token_latency: Optional[float] = None
     ):
         pass
+
+    async def flush(self):
+        """Waits until all buffered writes are persisted. No-op for synchronous backends."""
+        pass
+
+    async def close(self):
+        """Flushes pending writes and releases resources."""
+        await self.flush()
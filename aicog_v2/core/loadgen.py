@@ -0,0 +1,206 @@
+"""
+Offline load generator: replays a captured trace against AiCogClient with
+ReplayProvider standing in for the real providers, so capacity can be
+planned without paying for live calls.
+
+    aicog-replay aicog_monitoring.db --speed 10 --cache memory
+
+The trace is the audit log (or a RecordingProvider corpus): each row is
+re-issued at its recorded offset divided by `speed`, with its recorded
+provider and model unless `auto_route` is set. Rows are provider calls, so
+a trace recorded behind a cache holds only that run's cache misses.
+"""
+import sys
+import json
+import time
+import asyncio
+import argparse
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Union
+
+from aicog_v2.core.interfaces import AIStorage
+
+if TYPE_CHECKING:
+    from aicog_v2.client import AiCogClient
+
+class TraceRequest:
+    __slots__ = ("timestamp", "provider", "model", "prompt")
+
+    def __init__(self, timestamp: float, provider: str, model: str, prompt: str):
+        self.timestamp = timestamp
+        self.provider = provider
+        self.model = model
+        self.prompt = prompt
+
+async def load_trace(
+    storage: Union[AIStorage, str],
+    since: Optional[float] = None,
+    until: Optional[float] = None,
+    limit: Optional[int] = None
+) -> List[TraceRequest]:
+    """
+    Reads the request arrivals of an audit log, oldest first.
+    """
+    if isinstance(storage, str):
+        from aicog_v2.storage.sqlite_backend import SQLiteStorage
+        storage = SQLiteStorage(storage)
+    trace: List[TraceRequest] = []
+    async for row in storage.iter_requests(since, until):
+        if row["prompt"] is None:
+            continue
+        trace.append(TraceRequest(row["timestamp"], row["provider"], row["model"], row["prompt"]))
+        if limit is not None and len(trace) >= limit:
+            break
+    trace.sort(key=lambda request: request.timestamp)
+    return trace
+
+def _percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+async def replay_trace(
+    client: "AiCogClient",
+    trace: List[TraceRequest],
+    speed: float = 1.0,
+    auto_route: bool = False,
+    max_in_flight: Optional[int] = None,
+    **generate_kwargs
+) -> Dict[str, Any]:
+    """
+    Issues every trace request through `client.generate` on the trace's
+    schedule compressed `speed` times; `max_in_flight` caps concurrency
+    (later requests then start late). Returns throughput, latency, schedule
+    lag (start time behind schedule), errors, cache hits and cost.
+    """
+    if not trace:
+        return {"requests": 0}
+    loop = asyncio.get_running_loop()
+    origin = trace[0].timestamp
+    gate = asyncio.Semaphore(max_in_flight) if max_in_flight else None
+    latencies: List[float] = []
+    lags: List[float] = []
+    errors: Dict[str, int] = {}
+    totals = {"cached": 0, "estimated_cost": 0.0}
+
+    async def issue(request: TraceRequest, due: float):
+        if gate is not None:
+            await gate.acquire()
+        try:
+            start = loop.time()
+            lags.append(max(start - due, 0.0))
+            if auto_route:
+                response = await client.generate(request.prompt, **generate_kwargs)
+            else:
+                response = await client.generate(
+                    request.prompt, model=request.model, provider_name=request.provider, **generate_kwargs
+                )
+            latencies.append(loop.time() - start)
+            totals["cached"] += response.cached
+            totals["estimated_cost"] += response.estimated_cost
+        except Exception as e:
+            errors[type(e).__name__] = errors.get(type(e).__name__, 0) + 1
+        finally:
+            if gate is not None:
+                gate.release()
+
+    cpu_start = time.process_time()
+    wall_start = loop.time()
+    tasks = []
+    for request in trace:
+        due = wall_start + (request.timestamp - origin) / speed
+        delay = due - loop.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(loop.create_task(issue(request, due)))
+    await asyncio.gather(*tasks)
+    wall = loop.time() - wall_start
+    cpu = time.process_time() - cpu_start
+
+    n = len(trace)
+    span = (trace[-1].timestamp - origin) / speed
+    return {
+        "requests": n,
+        "speed": speed,
+        "offered_rps": n / span if span > 0 else None,
+        "achieved_rps": n / wall if wall > 0 else None,
+        "errors": errors,
+        "cached": totals["cached"],
+        "estimated_cost": totals["estimated_cost"],
+        "p50_ms": _percentile(latencies, 0.50) * 1000,
+        "p95_ms": _percentile(latencies, 0.95) * 1000,
+        "p99_ms": _percentile(latencies, 0.99) * 1000,
+        "lag_p99_ms": _percentile(lags, 0.99) * 1000,
+        "lag_max_ms": max(lags) * 1000 if lags else 0.0,
+        "cpu_us_per_request": cpu / n * 1_000_000,
+    }
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    from aicog_v2.client import AiCogClient
+    from aicog_v2.core.routing import CAPABILITY_TIERS
+    from aicog_v2.providers.replay_provider import ReplayProvider
+
+    trace = await load_trace(args.trace or args.corpus, args.since, args.until, args.limit)
+    replay = await ReplayProvider.from_storage(args.corpus, latency_scale=args.latency_scale)
+    names = {request.provider for request in trace}
+    names.update(provider for candidates in CAPABILITY_TIERS.values() for provider, _ in candidates)
+
+    cache = None
+    if args.cache == "redis":
+        from aicog_v2.cache.redis_backend import RedisCache
+        cache = RedisCache(host=args.redis_host, port=args.redis_port)
+    elif args.cache == "memory":
+        from aicog_v2.cache.tiered_backend import MemoryCache
+        cache = MemoryCache()
+    storage = None
+    if args.audit_db:
+        from aicog_v2.storage.sqlite_backend import SQLiteStorage
+        storage = SQLiteStorage(args.audit_db, write_behind=True)
+        await storage.init_db()
+
+    client = AiCogClient(
+        providers={name: replay for name in sorted(names)},
+        cache=cache,
+        storage=storage,
+        default_provider=trace[0].provider if trace else "groq"
+    )
+    try:
+        report = await replay_trace(
+            client, trace, speed=args.speed, auto_route=args.auto_route,
+            max_in_flight=args.max_in_flight, use_cache=cache is not None
+        )
+    finally:
+        await client.aclose()
+    report["replay"] = replay.stats
+    return report
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(
+        prog="aicog-replay",
+        description="Replay a captured trace against AiCogClient with recorded provider responses."
+    )
+    parser.add_argument("corpus", help="SQLite audit log or recorded corpus serving the responses")
+    parser.add_argument("--trace", help="SQLite audit log holding the arrivals (defaults to the corpus)")
+    parser.add_argument("--speed", type=float, default=1.0, help="replay N times faster than recorded")
+    parser.add_argument("--latency-scale", type=float, default=1.0, help="multiplier on recorded provider latency")
+    parser.add_argument("--since", type=float, help="epoch seconds")
+    parser.add_argument("--until", type=float, help="epoch seconds")
+    parser.add_argument("--limit", type=int, help="replay at most this many requests")
+    parser.add_argument("--auto-route", action="store_true", help="let the router pick provider and model")
+    parser.add_argument("--max-in-flight", type=int, help="cap on concurrent requests")
+    parser.add_argument("--cache", choices=["memory", "redis", "none"], default="none")
+    parser.add_argument("--redis-host", default="127.0.0.1")
+    parser.add_argument("--redis-port", type=int, default=6379)
+    parser.add_argument("--audit-db", help="write-behind audit log for the replayed traffic")
+    parser.add_argument("--output", help="write the JSON report to this file")
+    args = parser.parse_args(argv)
+
+    report = asyncio.run(run(args))
+    json.dump(report, sys.stdout, indent=2)
+    print()
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+if __name__ == "__main__":
+    main()
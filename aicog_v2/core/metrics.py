@@ -0,0 +1,356 @@
+import time
+import asyncio
+import logging
+from bisect import bisect_left
+from contextlib import nullcontext
+from typing import Any, Dict, List, Optional, Tuple
+
+from aicog_v2.core.interfaces import estimate_cost
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0
+)
+
+_NULL_CONTEXT = nullcontext()
+
+# Values of the breaker state gauge
+_BREAKER_STATES = {"closed": 0, "half_open": 1, "open": 2}
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+class Counter:
+    """
+    Monotonic counter with a fixed set of label names.
+    """
+
+    def __init__(self, name: str, help_text: str, labels: Tuple[str, ...] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *label_values: str, amount: float = 1.0):
+        self._values[label_values] = self._values.get(label_values, 0.0) + amount
+
+    def get(self, *label_values: str) -> float:
+        return self._values.get(label_values, 0.0)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        for values, total in self._values.items():
+            lines.append(f"{self.name}{_format_labels(self.labels, values)} {_format_value(total)}")
+        return lines
+
+class Gauge:
+    """
+    Settable value with a fixed set of label names.
+    """
+
+    def __init__(self, name: str, help_text: str, labels: Tuple[str, ...] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def set(self, value: float, *label_values: str):
+        self._values[label_values] = value
+
+    def get(self, *label_values: str) -> Optional[float]:
+        return self._values.get(label_values)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} gauge"]
+        for values, value in self._values.items():
+            lines.append(f"{self.name}{_format_labels(self.labels, values)} {_format_value(value)}")
+        return lines
+
+class Histogram:
+    """
+    Fixed-bucket histogram with a fixed set of label names.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        labels: Tuple[str, ...] = (),
+        buckets: Tuple[float, ...] = DEFAULT_BUCKETS
+    ):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [per-bucket counts (last is +Inf), sum]
+        self._series: Dict[Tuple[str, ...], List[Any]] = {}
+
+    def observe(self, value: float, *label_values: str):
+        series = self._series.get(label_values)
+        if series is None:
+            series = self._series[label_values] = [[0] * (len(self.buckets) + 1), 0.0]
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+
+    def count(self, *label_values: str) -> int:
+        series = self._series.get(label_values)
+        return sum(series[0]) if series else 0
+
+    def sum(self, *label_values: str) -> float:
+        series = self._series.get(label_values)
+        return series[1] if series else 0.0
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        for values, (counts, total) in self._series.items():
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labels, values, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labels, values)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labels, values)} {cumulative}")
+        return lines
+
+class _StageTimer:
+    """
+    Context manager that observes a stage duration and, with a tracer, wraps
+    it in an OpenTelemetry span.
+    """
+
+    __slots__ = ("metrics", "stage", "provider", "model", "start", "span")
+
+    def __init__(self, metrics: "GatewayMetrics", stage: str, provider: str, model: str):
+        self.metrics = metrics
+        self.stage = stage
+        self.provider = provider
+        self.model = model
+        self.span = None
+
+    def __enter__(self):
+        if self.metrics.tracer is not None:
+            self.span = self.metrics.span(f"aicog.{self.stage}", self.provider, self.model)
+            self.span.__enter__()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.metrics.observe_stage(self.stage, time.perf_counter() - self.start, self.provider, self.model)
+        if self.span is not None:
+            self.span.__exit__(exc_type, exc, tb)
+        return False
+
+class GatewayMetrics:
+    """
+    Hot-path instrumentation for AiCogClient: per-stage latency histograms,
+    request outcomes, cache hits/misses, retries, provider errors, tokens
+    and estimated cost by provider/model, plus circuit breaker and hedging
+    activity.
+
+    `render()` returns the Prometheus text exposition format and `serve()`
+    exposes it over HTTP. With `tracing=True` (or an explicit `tracer`),
+    every stage is also an OpenTelemetry span; `opentelemetry-api` is only
+    needed in that case.
+    """
+
+    enabled = True
+
+    def __init__(
+        self,
+        namespace: str = "aicog",
+        buckets: Tuple[float, ...] = DEFAULT_BUCKETS,
+        tracing: bool = False,
+        tracer: Any = None
+    ):
+        if tracer is None and tracing:
+            try:
+                from opentelemetry import trace
+                tracer = trace.get_tracer("aicog_v2")
+            except ImportError:
+                logger.warning("opentelemetry-api is not installed; tracing disabled")
+        self.tracer = tracer
+
+        ns = namespace
+        self.stage_seconds = Histogram(
+            f"{ns}_stage_seconds", "Time spent in each gateway stage.", ("stage", "provider", "model"), buckets
+        )
+        self.request_seconds = Histogram(
+            f"{ns}_request_seconds", "End-to-end gateway request latency.", ("provider", "model", "outcome"), buckets
+        )
+        self.cache_lookups = Counter(
+            f"{ns}_cache_lookups_total", "Cache lookups by layer and result.", ("layer", "result")
+        )
+        self.retries = Counter(
+            f"{ns}_retries_total",
+            "Gateway-level provider attempts beyond the first for a request (429 retries and fallbacks).",
+            ("provider", "model")
+        )
+        self.provider_retries = Counter(
+            f"{ns}_provider_retries_total", "Retries inside a single provider call.", ("provider", "model")
+        )
+        self.provider_errors = Counter(
+            f"{ns}_provider_errors_total", "Failed provider attempts.", ("provider", "model", "error")
+        )
+        self.tokens = Counter(
+            f"{ns}_tokens_total", "Tokens billed by providers.", ("provider", "model", "direction")
+        )
+        self.cost = Counter(
+            f"{ns}_estimated_cost_usd_total", "Estimated provider spend in USD.", ("provider", "model")
+        )
+        self.breaker_transitions = Counter(
+            f"{ns}_breaker_transitions_total", "Circuit breaker state changes.", ("provider", "from_state", "to_state")
+        )
+        self.breaker_state = Gauge(
+            f"{ns}_breaker_state", "Circuit breaker state (0 closed, 1 half-open, 2 open).", ("provider",)
+        )
+        self.hedges = Counter(
+            f"{ns}_hedges_total", "Hedge requests fired and won, by backup route.", ("provider", "model", "outcome")
+        )
+
+    @property
+    def collectors(self) -> List[Any]:
+        return [
+            self.stage_seconds, self.request_seconds, self.cache_lookups,
+            self.retries, self.provider_retries, self.provider_errors, self.tokens, self.cost,
+            self.breaker_transitions, self.breaker_state, self.hedges
+        ]
+
+    def stage(self, stage: str, provider: str = "", model: str = ""):
+        return _StageTimer(self, stage, provider, model)
+
+    def span(self, name: str, provider: str = "", model: str = ""):
+        if self.tracer is None:
+            return _NULL_CONTEXT
+        return self.tracer.start_as_current_span(
+            name, attributes={"aicog.provider": provider, "aicog.model": model}
+        )
+
+    def observe_stage(self, stage: str, seconds: float, provider: str = "", model: str = ""):
+        self.stage_seconds.observe(seconds, stage, provider, model)
+
+    def request(self, provider: str, model: str, outcome: str, seconds: float):
+        self.request_seconds.observe(seconds, provider, model, outcome)
+
+    def cache_lookup(self, layer: str, hit: bool):
+        self.cache_lookups.inc(layer, "hit" if hit else "miss")
+
+    def retry(self, provider: str, model: str):
+        self.retries.inc(provider, model)
+
+    def provider_retry(self, provider: str, model: str):
+        self.provider_retries.inc(provider, model)
+
+    def breaker_transition(self, provider: str, from_state: str, to_state: str):
+        self.breaker_transitions.inc(provider, from_state, to_state)
+        self.observe_breaker(provider, to_state)
+
+    def observe_breaker(self, provider: str, state: str):
+        self.breaker_state.set(_BREAKER_STATES[state], provider)
+
+    def hedge(self, provider: str, model: str, outcome: str):
+        self.hedges.inc(provider, model, outcome)
+
+    def provider_error(self, provider: str, model: str, error: BaseException):
+        self.provider_errors.inc(provider, model, type(error).__name__)
+
+    def usage(self, provider: str, model: str, usage: Dict[str, int]):
+        input_tokens = usage.get("input_tokens", 0)
+        output_tokens = usage.get("output_tokens", 0)
+        self.tokens.inc(provider, model, "input", amount=input_tokens)
+        self.tokens.inc(provider, model, "output", amount=output_tokens)
+        self.cost.inc(provider, model, amount=estimate_cost(model, input_tokens, output_tokens))
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for collector in self.collectors:
+            lines.extend(collector.render())
+        return "\n".join(lines) + "\n"
+
+    async def serve(self, host: str = "0.0.0.0", port: int = 9464) -> asyncio.AbstractServer:
+        """
+        Starts a minimal HTTP endpoint serving `render()` for Prometheus to scrape.
+        """
+        async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+            try:
+                request_line = await reader.readline()
+                while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    pass
+                parts = request_line.decode("latin-1").split()
+                if len(parts) >= 2 and parts[0] == "GET" and parts[1].split("?")[0] in ("/metrics", "/"):
+                    status, body = "200 OK", self.render().encode()
+                else:
+                    status, body = "404 Not Found", b"not found\n"
+                writer.write(
+                    f"HTTP/1.1 {status}\r\n"
+                    "Content-Type: text/plain; version=0.0.4; charset=utf-8\r\n"
+                    f"Content-Length: {len(body)}\r\n"
+                    "Connection: close\r\n\r\n".encode() + body
+                )
+                await writer.drain()
+            finally:
+                writer.close()
+
+        return await asyncio.start_server(handle, host, port)
+
+class NullMetrics(GatewayMetrics):
+    """
+    Disabled instrumentation: every hook is a no-op so the hot path pays
+    only for a method call.
+    """
+
+    enabled = False
+
+    def __init__(self):
+        self.tracer = None
+
+    @property
+    def collectors(self) -> List[Any]:
+        return []
+
+    def stage(self, stage: str, provider: str = "", model: str = ""):
+        return _NULL_CONTEXT
+
+    def span(self, name: str, provider: str = "", model: str = ""):
+        return _NULL_CONTEXT
+
+    def observe_stage(self, stage: str, seconds: float, provider: str = "", model: str = ""):
+        pass
+
+    def request(self, provider: str, model: str, outcome: str, seconds: float):
+        pass
+
+    def cache_lookup(self, layer: str, hit: bool):
+        pass
+
+    def retry(self, provider: str, model: str):
+        pass
+
+    def provider_retry(self, provider: str, model: str):
+        pass
+
+    def breaker_transition(self, provider: str, from_state: str, to_state: str):
+        pass
+
+    def observe_breaker(self, provider: str, state: str):
+        pass
+
+    def hedge(self, provider: str, model: str, outcome: str):
+        pass
+
+    def provider_error(self, provider: str, model: str, error: BaseException):
+        pass
+
+    def usage(self, provider: str, model: str, usage: Dict[str, int]):
+        pass
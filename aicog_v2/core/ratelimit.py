@@ -0,0 +1,173 @@
+import time
+import heapq
+import asyncio
+import itertools
+from typing import Dict, List, Optional, Tuple
+
+class RateLimit:
+    """
+    Quota for one provider or provider/model: requests and tokens per minute.
+    """
+
+    def __init__(self, rpm: Optional[float] = None, tpm: Optional[float] = None):
+        self.rpm = rpm
+        self.tpm = tpm
+
+class TokenBucket:
+    """
+    Classic token bucket refilled continuously at `rate` per second up to
+    `capacity`. The level may go negative when actual usage exceeds what was
+    reserved; that debt delays later admissions.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.level = capacity
+        self._updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def time_until(self, amount: float) -> float:
+        self._refill()
+        amount = min(amount, self.capacity)
+        if self.level >= amount:
+            return 0.0
+        return (amount - self.level) / self.rate
+
+    def consume(self, amount: float):
+        self._refill()
+        self.level -= min(amount, self.capacity)
+
+    def adjust(self, delta: float):
+        """
+        Positive delta charges extra tokens, negative refunds them.
+        """
+        self._refill()
+        self.level = min(self.capacity, self.level - delta)
+
+    def drain(self, seconds: float):
+        """
+        Empties the bucket so nothing is admitted for about `seconds`.
+        """
+        self._refill()
+        self.level = min(self.level, -seconds * self.rate)
+
+class _Lane:
+    """
+    Buckets and the priority wait queue for one quota key.
+    """
+
+    def __init__(self, limit: RateLimit):
+        self.requests = TokenBucket(limit.rpm / 60, limit.rpm) if limit.rpm else None
+        self.tokens = TokenBucket(limit.tpm / 60, limit.tpm) if limit.tpm else None
+        # (-priority, sequence, tokens, future)
+        self.waiters: List[Tuple[int, int, int, asyncio.Future]] = []
+        self.dispatcher: Optional[asyncio.Task] = None
+        self.admitted = 0
+        self.waited = 0
+
+    def delay(self, tokens: int) -> float:
+        delay = 0.0
+        if self.requests:
+            delay = max(delay, self.requests.time_until(1))
+        if self.tokens:
+            delay = max(delay, self.tokens.time_until(tokens))
+        return delay
+
+    def consume(self, tokens: int):
+        if self.requests:
+            self.requests.consume(1)
+        if self.tokens:
+            self.tokens.consume(tokens)
+        self.admitted += 1
+
+class RateLimiter:
+    """
+    Client-side limiter for provider RPM/TPM quotas.
+
+    `limits` is keyed by "provider/model" or just "provider"; the most
+    specific key wins. Requests wait in a priority queue per key (higher
+    `priority` first, FIFO within a priority), so a burst is smoothed out
+    instead of turning into a wave of 429s.
+    """
+
+    def __init__(self, limits: Dict[str, RateLimit], expected_output_tokens: int = 256):
+        self.limits = limits
+        # Output tokens reserved up front when the call does not set max_tokens
+        self.expected_output_tokens = expected_output_tokens
+        self._lanes: Dict[str, _Lane] = {}
+        self._sequence = itertools.count()
+
+    def _lane(self, provider: str, model: str) -> Optional[_Lane]:
+        for key in (f"{provider}/{model}", provider):
+            if key in self.limits:
+                lane = self._lanes.get(key)
+                if lane is None:
+                    lane = self._lanes[key] = _Lane(self.limits[key])
+                return lane
+        return None
+
+    async def acquire(self, provider: str, model: str, tokens: int, priority: int = 0):
+        """
+        Waits until one request and `tokens` tokens are available.
+        """
+        lane = self._lane(provider, model)
+        if lane is None:
+            return
+        if not lane.waiters and lane.delay(tokens) == 0:
+            lane.consume(tokens)
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(lane.waiters, (-priority, next(self._sequence), tokens, future))
+        lane.waited += 1
+        if lane.dispatcher is None or lane.dispatcher.done():
+            lane.dispatcher = asyncio.ensure_future(self._dispatch(lane))
+        await future
+
+    async def _dispatch(self, lane: _Lane):
+        while lane.waiters:
+            _, _, tokens, future = lane.waiters[0]
+            if future.done():
+                # Caller was cancelled while queued
+                heapq.heappop(lane.waiters)
+                continue
+            delay = lane.delay(tokens)
+            if delay > 0:
+                await asyncio.sleep(delay)
+                continue
+            heapq.heappop(lane.waiters)
+            lane.consume(tokens)
+            future.set_result(None)
+
+    def reconcile(self, provider: str, model: str, reserved: int, actual: int):
+        """
+        Corrects the token bucket once real usage is known.
+        """
+        lane = self._lane(provider, model)
+        if lane is not None and lane.tokens is not None:
+            lane.tokens.adjust(actual - reserved)
+
+    def pause(self, provider: str, model: str, seconds: float) -> bool:
+        """
+        Stops admitting requests for about `seconds`, e.g. after a 429 with
+        Retry-After. Returns False when no limit applies to the route.
+        """
+        lane = self._lane(provider, model)
+        if lane is None:
+            return False
+        for bucket in (lane.requests, lane.tokens):
+            if bucket is not None:
+                bucket.drain(seconds)
+        return True
+
+    @property
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        return {
+            key: {"admitted": lane.admitted, "waited": lane.waited, "queued": len(lane.waiters)}
+            for key, lane in self._lanes.items()
+        }
@@ -0,0 +1,293 @@
+import time
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from aicog_v2.core.retry import is_outage
+from aicog_v2.core.metrics import GatewayMetrics, NullMetrics
+
+logger = logging.getLogger(__name__)
+
+class CircuitOpenError(RuntimeError):
+    """Raised when a call is rejected because the provider's circuit is open."""
+
+class CircuitBreaker:
+    """
+    Per-provider circuit breaker.
+
+    closed    -> calls flow; `failure_threshold` consecutive failures open it.
+    open      -> calls fail fast until `recovery_timeout` seconds have passed.
+    half_open -> up to `half_open_max_calls` trial calls; a success closes the
+                 circuit, a failure opens it again.
+
+    Only outages count as failures (see `record_error`): a 400 or 404 is a
+    bad request, not a sick provider.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        recovery_timeout: float = 30.0,
+        half_open_max_calls: int = 1,
+        on_transition: Optional[Callable[[str, str], None]] = None
+    ):
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self._half_open_calls = 0
+        self.rejected = 0
+        # "closed->open" etc. -> count
+        self.transitions: Dict[str, int] = {}
+        # Called with (from_state, to_state) on every state change
+        self.on_transition = on_transition
+
+    def _transition(self, state: str):
+        if state == self.state:
+            return
+        name = f"{self.state}->{state}"
+        self.transitions[name] = self.transitions.get(name, 0) + 1
+        logger.info(f"Circuit breaker transition {name}")
+        if self.on_transition is not None:
+            self.on_transition(self.state, state)
+        self.state = state
+        if state == self.OPEN:
+            self.opened_at = time.monotonic()
+        self._half_open_calls = 0
+
+    def available(self) -> bool:
+        """
+        Whether a call would currently be admitted, without reserving a trial slot.
+        """
+        if self.state == self.OPEN:
+            return time.monotonic() - self.opened_at >= self.recovery_timeout
+        if self.state == self.HALF_OPEN:
+            return self._half_open_calls < self.half_open_max_calls
+        return True
+
+    def allow(self) -> bool:
+        if self.state == self.OPEN:
+            if time.monotonic() - self.opened_at < self.recovery_timeout:
+                self.rejected += 1
+                return False
+            self._transition(self.HALF_OPEN)
+        if self.state == self.HALF_OPEN:
+            if self._half_open_calls >= self.half_open_max_calls:
+                self.rejected += 1
+                return False
+            self._half_open_calls += 1
+        return True
+
+    def release(self):
+        """
+        Returns a trial slot taken by a call that was abandoned without an outcome.
+        """
+        if self.state == self.HALF_OPEN and self._half_open_calls:
+            self._half_open_calls -= 1
+
+    def record_success(self):
+        self.consecutive_failures = 0
+        if self.state != self.CLOSED:
+            self._transition(self.CLOSED)
+
+    def record_failure(self):
+        self.consecutive_failures += 1
+        if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            self._transition(self.OPEN)
+
+    def record_error(self, error: BaseException):
+        """
+        Counts `error` as a failure if it is an outage (transport error, 5xx,
+        429); a 4xx leaves the circuit as it was.
+        """
+        if is_outage(error):
+            self.record_failure()
+        else:
+            self.release()
+
+class ResiliencePolicy:
+    """
+    Resilience settings for AiCogClient:
+
+    - a circuit breaker per provider name, created on first use;
+    - `fallbacks`: (provider, model) pairs tried in order when the requested
+      route fails or its circuit is open;
+    - `hedge`: if the primary has not answered after its p95 latency (bounded
+      by `min_hedge_delay`/`max_hedge_delay`, or a fixed `hedge_delay`), the
+      next candidate is fired as well and the first success wins.
+    """
+
+    def __init__(
+        self,
+        fallbacks: Optional[List[Tuple[str, str]]] = None,
+        failure_threshold: int = 5,
+        recovery_timeout: float = 30.0,
+        hedge: bool = False,
+        hedge_delay: Optional[float] = None,
+        min_hedge_delay: float = 0.05,
+        max_hedge_delay: float = 10.0
+    ):
+        self.fallbacks = fallbacks or []
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.hedge = hedge
+        self.hedge_delay = hedge_delay
+        self.min_hedge_delay = min_hedge_delay
+        self.max_hedge_delay = max_hedge_delay
+        self.breakers: Dict[str, CircuitBreaker] = {}
+        # Breaker and hedge metrics; AiCogClient binds its own here
+        self.metrics: GatewayMetrics = NullMetrics()
+        self.fallbacks_used = 0
+        self.hedges_fired = 0
+        self.hedge_wins = 0
+        # Primary failed before the hedge delay and the backup ran alone
+        self.hedge_failovers = 0
+
+    def breaker(self, provider_name: str) -> CircuitBreaker:
+        breaker = self.breakers.get(provider_name)
+        if breaker is None:
+            breaker = self.breakers[provider_name] = CircuitBreaker(
+                self.failure_threshold, self.recovery_timeout,
+                on_transition=lambda old, new: self.metrics.breaker_transition(provider_name, old, new)
+            )
+            self.metrics.observe_breaker(provider_name, breaker.state)
+        return breaker
+
+    def chain(self, provider_name: str, model: str, available) -> List[Tuple[str, str]]:
+        """
+        The requested route followed by configured fallbacks, without duplicates.
+        """
+        chain = [(provider_name, model)]
+        for candidate in self.fallbacks:
+            if candidate not in chain and candidate[0] in available:
+                chain.append(candidate)
+        return chain
+
+    def delay_for(self, p95: Optional[float]) -> float:
+        if self.hedge_delay is not None:
+            return self.hedge_delay
+        if p95 is None:
+            return self.max_hedge_delay
+        return min(max(p95, self.min_hedge_delay), self.max_hedge_delay)
+
+    async def execute(
+        self,
+        chain: List[Tuple[str, str]],
+        attempt: Callable[[str, str], Awaitable[Any]],
+        p95: Callable[[str, str], Optional[float]],
+        hedge: Optional[bool] = None
+    ) -> Tuple[Any, str, str]:
+        """
+        Runs `attempt(provider, model)` along the chain with breakers and
+        optional hedging (`hedge` overrides the policy's setting for this
+        call). Returns (result, provider, model) of the winner.
+        """
+        if hedge is None:
+            hedge = self.hedge
+        last_error: Optional[BaseException] = None
+        remaining = list(chain)
+        while remaining:
+            primary = remaining.pop(0)
+            if not self.breaker(primary[0]).available():
+                self.breaker(primary[0]).rejected += 1
+                last_error = CircuitOpenError(f"Circuit open for provider {primary[0]}")
+                continue
+            if primary != chain[0]:
+                self.fallbacks_used += 1
+
+            backup = None
+            if hedge:
+                while remaining and backup is None:
+                    candidate = remaining.pop(0)
+                    if self.breaker(candidate[0]).available():
+                        backup = candidate
+
+            try:
+                if backup is None:
+                    return await self._guarded(primary, attempt), primary[0], primary[1]
+                return await self._hedged(primary, backup, attempt, self.delay_for(p95(*primary)))
+            except Exception as e:
+                last_error = e
+                logger.debug(f"Route {primary[0]}/{primary[1]} failed: {e}")
+        raise last_error
+
+    async def _guarded(self, route: Tuple[str, str], attempt: Callable[[str, str], Awaitable[Any]]) -> Any:
+        breaker = self.breaker(route[0])
+        if not breaker.allow():
+            raise CircuitOpenError(f"Circuit open for provider {route[0]}")
+        try:
+            result = await attempt(*route)
+        except asyncio.CancelledError:
+            # e.g. the losing side of a hedge
+            breaker.release()
+            raise
+        except Exception as e:
+            breaker.record_error(e)
+            raise
+        breaker.record_success()
+        return result
+
+    async def _hedged(
+        self,
+        primary: Tuple[str, str],
+        backup: Tuple[str, str],
+        attempt: Callable[[str, str], Awaitable[Any]],
+        delay: float
+    ) -> Tuple[Any, str, str]:
+        primary_task = asyncio.ensure_future(self._guarded(primary, attempt))
+        routes = {primary_task: primary}
+        try:
+            done, _ = await asyncio.wait({primary_task}, timeout=delay)
+            if done:
+                if primary_task.exception() is None:
+                    return primary_task.result(), primary[0], primary[1]
+                # Primary failed before the hedge delay: plain failover, not a hedge
+                self.hedge_failovers += 1
+                return await self._guarded(backup, attempt), backup[0], backup[1]
+
+            # Primary is slow: fire the backup and take the first success
+            self.hedges_fired += 1
+            self.metrics.hedge(backup[0], backup[1], "fired")
+            backup_task = asyncio.ensure_future(self._guarded(backup, attempt))
+            routes[backup_task] = backup
+            pending = set(routes)
+            errors = []
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is backup_task:
+                            self.hedge_wins += 1
+                            self.metrics.hedge(backup[0], backup[1], "won")
+                        route = routes[task]
+                        return task.result(), route[0], route[1]
+                    errors.append(task.exception())
+            raise errors[-1]
+        finally:
+            # Also runs when the caller is cancelled: no attempt outlives it
+            for task in routes:
+                if not task.done():
+                    task.cancel()
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "breakers": {
+                name: {
+                    "state": b.state,
+                    "transitions": dict(b.transitions),
+                    "rejected": b.rejected,
+                }
+                for name, b in self.breakers.items()
+            },
+            "fallbacks_used": self.fallbacks_used,
+            "hedges_fired": self.hedges_fired,
+            "hedge_wins": self.hedge_wins,
+            "hedge_failovers": self.hedge_failovers,
+        }
@@ -0,0 +1,94 @@
+import time
+from email.utils import parsedate_to_datetime
+from typing import TYPE_CHECKING, Callable, Optional
+
+if TYPE_CHECKING:
+    from tenacity import AsyncRetrying
+
+def retry_after_seconds(error: BaseException) -> Optional[float]:
+    """
+    Extracts the server-requested delay from a provider error's HTTP response
+    (`retry-after-ms`, or `retry-after` as seconds or an HTTP date).
+    """
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+
+    value = headers.get("retry-after-ms")
+    if value:
+        try:
+            return max(float(value) / 1000, 0.0)
+        except ValueError:
+            pass
+
+    value = headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+def http_status(error: BaseException) -> Optional[int]:
+    """The HTTP status of a provider error, or None for transport and other errors."""
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    return status
+
+def is_rate_limited(error: BaseException) -> bool:
+    """Whether a provider error is an HTTP 429."""
+    return http_status(error) == 429
+
+def is_outage(error: BaseException) -> bool:
+    """
+    Whether a provider error says the provider is unhealthy: transport errors
+    and timeouts (no HTTP status), 5xx and 429. Other 4xx are the request's fault.
+    """
+    status = http_status(error)
+    return status is None or status == 429 or status >= 500
+
+class wait_retry_after:
+    """
+    Tenacity wait strategy: honour the provider's Retry-After header when
+    present (capped at `max_wait`), otherwise fall back to `fallback`.
+    Tenacity accepts any callable as a wait strategy, so this module does not
+    import tenacity until a retry policy is built.
+    """
+
+    def __init__(self, fallback: Callable, max_wait: float = 60.0):
+        self.fallback = fallback
+        self.max_wait = max_wait
+
+    def __call__(self, retry_state) -> float:
+        outcome = retry_state.outcome
+        if outcome is not None and outcome.failed:
+            delay = retry_after_seconds(outcome.exception())
+            if delay is not None:
+                return min(delay, self.max_wait)
+        return self.fallback(retry_state)
+
+def provider_retrying(
+    max_attempts: int,
+    retry_rate_limits: bool = True,
+    on_retry: Optional[Callable[[], None]] = None
+) -> "AsyncRetrying":
+    """
+    Retry policy shared by the built-in providers. Without
+    `retry_rate_limits`, 429s are raised at once for the caller to retry.
+    `on_retry` is called before each retry.
+    """
+    from tenacity import AsyncRetrying, retry_if_exception, stop_after_attempt, wait_exponential
+
+    return AsyncRetrying(
+        stop=stop_after_attempt(max_attempts),
+        retry=retry_if_exception(lambda error: retry_rate_limits or not is_rate_limited(error)),
+        wait=wait_retry_after(wait_exponential(multiplier=1, min=2, max=10)),
+        before_sleep=(lambda retry_state: on_retry()) if on_retry is not None else None,
+        reraise=True
+    )
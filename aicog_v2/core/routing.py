@@ -1,35 +1,122 @@
-from typing import Tuple
+import logging
+from typing import Dict, Iterable, List, Optional, Tuple
+from aicog_v2.core.interfaces import estimate_cost
+from aicog_v2.core.stats import LatencyTracker
+from aicog_v2.core.rules import RuleEngine
+
+logger = logging.getLogger(__name__)
+
+# Interchangeable (provider, model) candidates per capability tier.
+# The first entry is the static default.
+CAPABILITY_TIERS: Dict[str, List[Tuple[str, str]]] = {
+    "large": [("groq", "llama-3.3-70b-versatile"), ("openai", "gpt-4o")],
+    "small": [("groq", "llama-3.1-8b-instant"), ("openai", "gpt-4o-mini")],
+}
+
+class RoutingError(ValueError):
+    """Raised when no capability tier has a configured provider."""
 
 class ModelRouter:
     """
-    Intelligently routes tasks to the best provider and model based on 
+    Intelligently routes tasks to the best provider and model based on
     content and volume.
+
+    In adaptive mode, the static table only picks a capability tier; the
+    candidate inside that tier is chosen by live EWMA latency, error rate
+    and cost, as recorded through `record()`.
+
+    Task classes, their tiers and the long-prompt threshold come from
+    `rules` (a RuleEngine, optionally loaded from YAML/TOML).
     """
-    
-    @staticmethod
-    def classify_task(prompt: str) -> str:
-        prompt_lower = prompt.lower()
-        if any(w in prompt_lower for w in ["reason", "analyze", "explain why", "complex"]):
-            return "reasoning"
-        if any(w in prompt_lower for w in ["summarize", "tl;dr", "wrap up"]):
-            return "summarization"
-        if any(w in prompt_lower for w in ["extract", "json", "csv", "format"]):
-            return "extraction"
-        return "general"
-
-    def route(self, prompt: str, token_count: int) -> Tuple[str, str]:
+
+    def __init__(
+        self,
+        adaptive: bool = False,
+        tracker: Optional[LatencyTracker] = None,
+        tiers: Optional[Dict[str, List[Tuple[str, str]]]] = None,
+        default_latency: float = 1.0,
+        error_penalty: float = 5.0,
+        cost_weight: float = 100.0,
+        expected_output_tokens: int = 256,
+        rules: Optional[RuleEngine] = None
+    ):
+        self.adaptive = adaptive
+        self.tracker = tracker or LatencyTracker()
+        self.tiers = tiers or CAPABILITY_TIERS
+        # Prior for candidates without measurements (seconds)
+        self.default_latency = default_latency
+        # Multiplier on expected latency per unit of error rate
+        self.error_penalty = error_penalty
+        # Seconds of latency one dollar of expected cost is worth
+        self.cost_weight = cost_weight
+        self.expected_output_tokens = expected_output_tokens
+        self.rules = rules or RuleEngine()
+
+    def classify_task(self, prompt: str) -> str:
+        return self.rules.classify(prompt)
+
+    def route(
+        self,
+        prompt: str,
+        token_count: int,
+        available: Optional[Iterable[str]] = None
+    ) -> Tuple[str, str]:
         """
-        Returns (provider_name, model_name)
+        Returns (provider_name, model_name). `available` restricts the choice
+        to configured provider names; when the selected tier has none, the
+        other tiers are tried in table order.
         """
-        task = self.classify_task(prompt)
-        
+        tier = self.select_tier(prompt, token_count)
+        tiers = self.rules.tiers or self.tiers
+        candidates = tiers[tier]
+        if available is not None:
+            available = set(available)
+            candidates = [c for c in candidates if c[0] in available]
+            if not candidates:
+                candidates = self._fallback_candidates(tiers, tier, available)
+        if not self.adaptive or len(candidates) == 1:
+            return candidates[0]
+        return min(candidates, key=lambda c: self.score(c[0], c[1], token_count))
+
+    @staticmethod
+    def _fallback_candidates(
+        tiers: Dict[str, List[Tuple[str, str]]],
+        tier: str,
+        available: set
+    ) -> List[Tuple[str, str]]:
+        for name, candidates in tiers.items():
+            candidates = [c for c in candidates if c[0] in available]
+            if name != tier and candidates:
+                logger.warning(f"No configured provider in tier {tier!r}, routing to tier {name!r}")
+                return candidates
+        raise RoutingError(
+            f"No configured provider for any capability tier (configured: {', '.join(sorted(available)) or 'none'})"
+        )
+
+    def select_tier(self, prompt: str, token_count: int) -> str:
+        rules = self.rules
+
         # 1. High-Volume / Long Context -> Groq (Llama 3.3)
-        if token_count > 4000 or task == "summarization":
-            return "groq", "llama-3.3-70b-versatile"
-        
-        # 2. Deep Reasoning -> OpenAI (if configured) or Groq Llama 3.3
-        if task == "reasoning":
-            return "groq", "llama-3.3-70b-versatile" # Defaulting to Groq for speed
-            
-        # 3. Fast / Simple Tasks -> Groq (Llama 8B)
-        return "groq", "llama-3.1-8b-instant"
+        if token_count > rules.long_prompt_tokens:
+            return rules.long_prompt_tier
+
+        # 2. Per-task tier (reasoning/summarization -> large by default),
+        #    otherwise Fast / Simple Tasks -> Groq (Llama 8B)
+        return rules.tier_for(self.classify_task(prompt))
+
+    def score(self, provider: str, model: str, token_count: int) -> float:
+        """
+        Lower is better: expected latency inflated by error rate, plus weighted expected cost.
+        """
+        stats = self.tracker.get(provider, model)
+        latency = self.default_latency
+        error_rate = 0.0
+        if stats is not None:
+            if stats.ewma_latency is not None:
+                latency = stats.ewma_latency
+            error_rate = stats.error_rate
+        cost = estimate_cost(model, token_count, self.expected_output_tokens)
+        return latency * (1 + self.error_penalty * error_rate) + self.cost_weight * cost
+
+    def record(self, provider: str, model: str, latency: float, error: bool = False):
+        self.tracker.record(provider, model, latency, error)
@@ -0,0 +1,274 @@
+import os
+import re
+import time
+import logging
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+class TaskRule:
+    """
+    A task class: the prompt keywords that select it and, optionally, the
+    capability tier it routes to. Keywords match whole words, case
+    insensitively; a trailing `*` also matches longer words ("summariz*"
+    matches "summarize" and "summarization"), and spaces match any
+    whitespace.
+    """
+
+    def __init__(self, name: str, keywords: Iterable[str], tier: Optional[str] = None):
+        self.name = name
+        self.keywords = list(keywords)
+        self.tier = tier
+
+# Priority order: the first rule with a keyword in the prompt wins
+DEFAULT_RULES = [
+    TaskRule("reasoning", ["reason*", "analy*", "explain why", "complex*"], tier="large"),
+    TaskRule("summarization", ["summariz*", "summaris*", "tl;dr", "wrap up"], tier="large"),
+    TaskRule("extraction", ["extract*", "json", "csv", "format*"]),
+]
+
+def _normalize(keyword: str) -> str:
+    return " ".join(keyword.lower().split())
+
+def _trie_pattern(keywords: Iterable[str]) -> str:
+    """
+    Regex alternation over `keywords` shaped as a prefix trie, so the
+    matcher branches on one character at a time instead of trying every
+    keyword at every position. A trailing `*` ends in `\\w*`; spaces
+    match any whitespace.
+    """
+    trie: Dict[str, Any] = {}
+    for keyword in keywords:
+        node = trie
+        for char in keyword.rstrip("*"):
+            node = node.setdefault(char, {})
+        node["*" if keyword.endswith("*") else ""] = None
+
+    def build(node: Dict[str, Any]) -> str:
+        branches = [
+            (r"\s+" if char == " " else re.escape(char)) + build(child)
+            for char, child in sorted(node.items()) if char not in ("", "*")
+        ]
+        if "*" in node:
+            branches.append(r"\w*")
+        elif "" in node:
+            branches.append("")
+        if len(branches) == 1:
+            return branches[0]
+        return f"(?:{'|'.join(branches)})"
+
+    return build(trie)
+
+_WORD_CHAR = re.compile(r"\w")
+
+class _CompiledRules:
+    """
+    Matching state for one rule set, built and validated in one go so a
+    RuleEngine can swap it in atomically.
+    """
+
+    def __init__(self, rules: List[TaskRule]):
+        # keyword -> index of the first (highest-priority) rule listing it
+        self.exact: Dict[str, int] = {}
+        self.prefixes: Dict[str, int] = {}
+        for index, rule in enumerate(rules):
+            if not isinstance(rule.name, str) or not rule.name:
+                raise ValueError(f"Task rule name must be a non-empty string, got {rule.name!r}")
+            for keyword in rule.keywords:
+                if not isinstance(keyword, str):
+                    raise ValueError(f"Keyword {keyword!r} of task {rule.name!r} is not a string")
+                keyword = _normalize(keyword)
+                if keyword.endswith("*"):
+                    stem = keyword.rstrip("*")
+                    if not stem:
+                        raise ValueError(f"Keyword {keyword!r} of task {rule.name!r} has no prefix")
+                    self.prefixes.setdefault(stem, index)
+                elif keyword:
+                    self.exact.setdefault(keyword, index)
+        self.names = [rule.name for rule in rules]
+        self.tiers = {rule.name: rule.tier for rule in rules if rule.tier}
+        self.max_prefix = max(map(len, self.prefixes), default=0)
+
+        self.pattern = None
+        if self.exact or self.prefixes:
+            keywords = list(self.exact) + [stem + "*" for stem in self.prefixes]
+            # No leading \b or lookbehind: a pattern that starts with its first
+            # characters lets the regex engine skip ahead to candidate positions,
+            # so the word boundary before a match is checked in first_match()
+            self.pattern = re.compile(rf"{_trie_pattern(keywords)}(?!\w)")
+
+    def rule_index(self, matched: str) -> int:
+        # A match can satisfy several keywords (e.g. "json" and "js*"); the highest-priority rule wins
+        matched = " ".join(matched.split())
+        best = self.exact.get(matched)
+        prefixes = self.prefixes
+        for end in range(1, min(len(matched), self.max_prefix) + 1):
+            index = prefixes.get(matched[:end])
+            if index is not None and (best is None or index < best):
+                best = index
+        return best
+
+    def first_match(self, text: str) -> Optional[int]:
+        """
+        Index of the highest-priority rule matching `text` (lowercased), if any.
+        """
+        pattern = self.pattern
+        if pattern is None:
+            return None
+        best = None
+        match = pattern.search(text)
+        while match is not None:
+            start = match.start()
+            if start and _WORD_CHAR.match(text, start - 1):
+                # Inside a word ("information" for "format"): retry one character on
+                match = pattern.search(text, start + 1)
+                continue
+            index = self.rule_index(match.group())
+            if best is None or index < best:
+                best = index
+                if best == 0:
+                    break
+            match = pattern.search(text, match.end())
+        return best
+
+class RuleEngine:
+    """
+    Task classifier over a lowercased window of the prompt. All keywords
+    are compiled into a single word-bounded, trie-shaped regex, so one pass
+    finds every matching rule however many rules there are.
+    Prompts longer than twice `window_chars` are only scanned in their
+    first and last `window_chars` characters, where instructions live.
+
+    Rules, tiers and thresholds load from YAML or TOML:
+
+        engine = RuleEngine.from_file("routing.yaml", reload_interval=5)
+
+    A file-backed engine checks the file's mtime at most every
+    `reload_interval` seconds while classifying and recompiles on change;
+    an invalid file is logged and the previous rules stay active.
+    """
+
+    def __init__(
+        self,
+        rules: Optional[List[TaskRule]] = None,
+        default_task: str = "general",
+        default_tier: str = "small",
+        long_prompt_tokens: int = 4000,
+        long_prompt_tier: str = "large",
+        window_chars: int = 4096,
+        tiers: Optional[Dict[str, List[Tuple[str, str]]]] = None
+    ):
+        self.rules = list(DEFAULT_RULES if rules is None else rules)
+        self._compiled = _CompiledRules(self.rules)
+        self.default_task = default_task
+        self.default_tier = default_tier
+        self.long_prompt_tokens = long_prompt_tokens
+        self.long_prompt_tier = long_prompt_tier
+        self.window_chars = window_chars
+        # Capability tiers from config; None keeps the router's own table
+        self.tiers = tiers
+        self.path: Optional[str] = None
+        self.reload_interval = 0.0
+        self.reloads = 0
+        self._mtime: Optional[float] = None
+        self._checked_at = 0.0
+
+    def classify(self, prompt: str) -> str:
+        if self.path is not None:
+            self._maybe_reload()
+        if not prompt:
+            return self.default_task
+
+        window = self.window_chars
+        if len(prompt) > 2 * window:
+            # Newline keeps a word boundary between head and tail
+            prompt = f"{prompt[:window]}\n{prompt[-window:]}"
+        compiled = self._compiled
+        index = compiled.first_match(prompt.lower())
+        return compiled.names[index] if index is not None else self.default_task
+
+    def tier_for(self, task: str) -> str:
+        return self._compiled.tiers.get(task, self.default_tier)
+
+    # Config files
+
+    @classmethod
+    def from_dict(cls, config: Dict[str, Any]) -> "RuleEngine":
+        engine = cls(rules=[])
+        engine._configure(config)
+        return engine
+
+    @classmethod
+    def from_file(cls, path: str, reload_interval: float = 5.0) -> "RuleEngine":
+        engine = cls(rules=[])
+        engine.path = path
+        engine.reload_interval = reload_interval
+        engine._mtime = os.stat(path).st_mtime
+        engine._configure(_load_config(path))
+        engine._checked_at = time.monotonic()
+        return engine
+
+    def _configure(self, config: Dict[str, Any]):
+        # Build and validate everything first, then swap it in: a bad config changes nothing
+        rules = [
+            TaskRule(entry["name"], entry.get("keywords", []), entry.get("tier"))
+            for entry in config.get("tasks", [])
+        ]
+        compiled = _CompiledRules(rules)
+        tiers = config.get("tiers")
+        if tiers:
+            tiers = {name: [tuple(c) for c in candidates] for name, candidates in tiers.items()}
+            for name, candidates in tiers.items():
+                if not candidates or any(len(c) != 2 for c in candidates):
+                    raise ValueError(f"Tier {name!r} needs a list of [provider, model] pairs")
+        settings = {
+            "default_task": config.get("default_task", "general"),
+            "default_tier": config.get("default_tier", "small"),
+            "long_prompt_tokens": config.get("long_prompt_tokens", 4000),
+            "long_prompt_tier": config.get("long_prompt_tier", "large"),
+            "window_chars": config.get("window_chars", 4096),
+        }
+        if not isinstance(settings["window_chars"], int) or settings["window_chars"] <= 0:
+            raise ValueError(f"window_chars must be a positive integer, got {settings['window_chars']!r}")
+
+        self.rules = rules
+        self._compiled = compiled
+        self.tiers = tiers or None
+        for name, value in settings.items():
+            setattr(self, name, value)
+
+    def _maybe_reload(self):
+        now = time.monotonic()
+        if now - self._checked_at < self.reload_interval:
+            return
+        self._checked_at = now
+        try:
+            mtime = os.stat(self.path).st_mtime
+            if mtime == self._mtime:
+                return
+            config = _load_config(self.path)
+            self._configure(config)
+        except Exception as e:
+            logger.warning(f"Routing rules reload from {self.path} failed, keeping previous rules: {e}")
+            return
+        self._mtime = mtime
+        self.reloads += 1
+        logger.info(f"Reloaded {len(self.rules)} routing rules from {self.path}")
+
+def _load_config(path: str) -> Dict[str, Any]:
+    if path.endswith(".toml"):
+        try:
+            import tomllib
+        except ImportError:
+            try:
+                import tomli as tomllib
+            except ImportError:
+                raise ImportError("TOML routing rules need Python 3.11+ or the 'tomli' package (pip install aicog-v2[rules])")
+        with open(path, "rb") as f:
+            return tomllib.load(f)
+    try:
+        import yaml
+    except ImportError:
+        raise ImportError("YAML routing rules need the 'PyYAML' package (pip install aicog-v2[rules])")
+    with open(path) as f:
+        return yaml.safe_load(f) or {}
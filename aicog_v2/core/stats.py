@@ -0,0 +1,83 @@
+from collections import deque
+from typing import Deque, Dict, Iterable, Optional, Tuple
+
+class ProviderStats:
+    """
+    Live health of one (provider, model) pair: EWMA latency, EWMA error
+    rate and a window of recent latencies for percentiles.
+    """
+
+    def __init__(self, alpha: float = 0.2, window: int = 256):
+        self.alpha = alpha
+        self.ewma_latency: Optional[float] = None
+        self.error_rate = 0.0
+        self.samples = 0
+        self.errors = 0
+        self._recent: Deque[float] = deque(maxlen=window)
+
+    def record(self, latency: float, error: bool = False):
+        self.samples += 1
+        self.error_rate += self.alpha * ((1.0 if error else 0.0) - self.error_rate)
+        if error:
+            self.errors += 1
+            return
+        self._recent.append(latency)
+        if self.ewma_latency is None:
+            self.ewma_latency = latency
+        else:
+            self.ewma_latency += self.alpha * (latency - self.ewma_latency)
+
+    def percentile(self, q: float) -> Optional[float]:
+        if not self._recent:
+            return None
+        ordered = sorted(self._recent)
+        index = min(len(ordered) - 1, int(q * len(ordered)))
+        return ordered[index]
+
+    @property
+    def p95(self) -> Optional[float]:
+        return self.percentile(0.95)
+
+    def snapshot(self) -> Dict[str, Optional[float]]:
+        return {
+            "ewma_latency": self.ewma_latency,
+            "p95_latency": self.p95,
+            "error_rate": self.error_rate,
+            "samples": self.samples,
+        }
+
+class LatencyTracker:
+    """
+    Registry of ProviderStats keyed by (provider, model).
+    """
+
+    def __init__(self, alpha: float = 0.2, window: int = 256):
+        self.alpha = alpha
+        self.window = window
+        self._stats: Dict[Tuple[str, str], ProviderStats] = {}
+
+    def get(self, provider: str, model: str) -> Optional[ProviderStats]:
+        return self._stats.get((provider, model))
+
+    def record(self, provider: str, model: str, latency: float, error: bool = False):
+        stats = self._stats.get((provider, model))
+        if stats is None:
+            stats = self._stats[(provider, model)] = ProviderStats(self.alpha, self.window)
+        stats.record(latency, error)
+
+    def seed(self, rows: Iterable[Tuple[str, str, float]]):
+        """
+        Seeds latencies from historical (provider, model, latency) rows, oldest first.
+        """
+        for provider, model, latency in rows:
+            if latency is not None:
+                self.record(provider, model, latency)
+
+    async def seed_from_storage(self, storage, limit: int = 1000):
+        """
+        Seeds from the most recent rows of a SQLiteStorage audit log.
+        """
+        self.seed(await storage.recent_latencies(limit))
+
+    def snapshot(self) -> Dict[str, Dict[str, Optional[float]]]:
+        return {f"{p}/{m}": s.snapshot() for (p, m), s in self._stats.items()}
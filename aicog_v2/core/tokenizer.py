@@ -0,0 +1,84 @@
+import base64
+import re
+from typing import Dict, List, Optional
+
+# cl100k/o200k-style pre-tokenization. The standard `re` module has no
+# \p{L}/\p{N}, so letters and digits are approximated with \w classes; when
+# the optional `regex` package is installed the exact pattern is used.
+_PATTERN = r"""(?i:'s|'t|'re|'ve|'m|'ll|'d)|[^\r\n\w]?[^\W\d_]+|\d{1,3}| ?[^\s\w]+[\r\n]*|\s*[\r\n]+|\s+(?!\S)|\s+"""
+_EXACT_PATTERN = r"""(?i:'s|'t|'re|'ve|'m|'ll|'d)|[^\r\n\p{L}\p{N}]?\p{L}+|\p{N}{1,3}| ?[^\s\p{L}\p{N}]+[\r\n]*|\s*[\r\n]+|\s+(?!\S)|\s+"""
+
+def _compile(pattern: Optional[str]):
+    try:
+        import regex
+    except ImportError:
+        return re.compile(pattern or _PATTERN)
+    return regex.compile(pattern or _EXACT_PATTERN)
+
+class BPETokenizer:
+    """
+    Offline byte-level BPE tokenizer over a local vocab file in tiktoken
+    format (one "<base64 token> <rank>" per line, e.g. cl100k_base.tiktoken):
+
+        tokenizer = BPETokenizer.from_file("vocab/cl100k_base.tiktoken")
+        TokenEstimator.use_tokenizer(tokenizer)
+
+    Encoding is pure Python; the BPE result of each pre-tokenized piece is
+    memoized (up to `cache_size` pieces), and since natural text repeats
+    the same pieces heavily most of a prompt is served from that cache.
+    """
+
+    def __init__(self, ranks: Dict[bytes, int], pattern: Optional[str] = None, cache_size: int = 65_536):
+        self.ranks = ranks
+        self.pattern = _compile(pattern)
+        self.cache_size = cache_size
+        self._pieces: Dict[str, List[int]] = {}
+
+    @classmethod
+    def from_file(cls, path: str, pattern: Optional[str] = None, cache_size: int = 65_536) -> "BPETokenizer":
+        ranks: Dict[bytes, int] = {}
+        with open(path, "rb") as f:
+            for line in f:
+                if line.strip():
+                    token, rank = line.split()
+                    ranks[base64.b64decode(token)] = int(rank)
+        return cls(ranks, pattern, cache_size)
+
+    def encode(self, text: str) -> List[int]:
+        tokens: List[int] = []
+        pieces = self._pieces
+        for piece in self.pattern.findall(text):
+            encoded = pieces.get(piece)
+            if encoded is None:
+                encoded = self._bpe(piece.encode("utf-8"))
+                if len(pieces) >= self.cache_size:
+                    pieces.clear()
+                pieces[piece] = encoded
+            tokens.extend(encoded)
+        return tokens
+
+    def encode_batch(self, texts: List[str]) -> List[List[int]]:
+        return [self.encode(text) for text in texts]
+
+    def count(self, text: str) -> int:
+        return len(self.encode(text))
+
+    def _bpe(self, piece: bytes) -> List[int]:
+        ranks = self.ranks
+        rank = ranks.get(piece)
+        if rank is not None:
+            return [rank]
+        parts = [piece[i:i + 1] for i in range(len(piece))]
+        # Repeatedly merge the adjacent pair with the lowest rank
+        while len(parts) > 1:
+            best_rank = None
+            best_index = 0
+            for i in range(len(parts) - 1):
+                pair_rank = ranks.get(parts[i] + parts[i + 1])
+                if pair_rank is not None and (best_rank is None or pair_rank < best_rank):
+                    best_rank = pair_rank
+                    best_index = i
+            if best_rank is None:
+                break
+            parts[best_index:best_index + 2] = [parts[best_index] + parts[best_index + 1]]
+        return [ranks[part] for part in parts]
@@ -1,21 +1,113 @@
 import re
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+_WORD = re.compile(r'\w+')
+# A window starting here cuts a word that the previous window counted
+_SPLIT_WORD = re.compile(r'\w\w')
 
 class TokenEstimator:
     """
     Simplified heuristic-based token estimator for routing decisions.
     Approximates tokens based on character count and common word patterns.
+
+    An exact tokenizer can be plugged in with `use_tokenizer` (e.g. a
+    BPETokenizer loaded from a local vocab file); recent results are then
+    memoized, since the same prompt is usually counted several times per
+    request (routing, rate limiting, usage fallback). The memo is keyed by
+    (length, hash), so it never holds on to the prompts themselves.
     """
-    @staticmethod
-    def estimate(text: str) -> int:
+
+    # Prompts longer than this are word-counted on evenly spaced windows
+    SAMPLE_THRESHOLD = 2048
+    SAMPLE_WINDOWS = 16
+    SAMPLE_WINDOW_CHARS = 128
+
+    tokenizer: Optional[Any] = None
+    cache_size = 4096
+    _memo: "OrderedDict[Tuple[int, int], int]" = OrderedDict()
+
+    @classmethod
+    def use_tokenizer(cls, tokenizer: Optional[Any], cache_size: int = 4096):
+        """
+        Counts tokens with `tokenizer` instead of the heuristic. It needs an
+        `encode(text)` method returning the token sequence (BPETokenizer,
+        tiktoken encodings and Hugging Face tokenizers all qualify). Pass
+        None to go back to the heuristic.
+        """
+        cls.tokenizer = tokenizer
+        cls.cache_size = cache_size
+        cls._memo = OrderedDict()
+
+    @classmethod
+    def estimate(cls, text: str) -> int:
+        if not text:
+            return 0
+        if cls.tokenizer is None:
+            return cls.heuristic(text)
+
+        memo = cls._memo
+        key = (len(text), hash(text))
+        count = memo.get(key)
+        if count is not None:
+            memo.move_to_end(key)
+            return count
+        count = len(cls.tokenizer.encode(text))
+        cls._remember(key, count)
+        return count
+
+    @classmethod
+    def estimate_many(cls, texts: Iterable[str]) -> List[int]:
+        """
+        Estimates a batch; with a tokenizer that has `encode_batch`, the
+        texts not already memoized are encoded in one call.
+        """
+        texts = list(texts)
+        encode_batch = getattr(cls.tokenizer, "encode_batch", None)
+        if encode_batch is None:
+            return [cls.estimate(text) for text in texts]
+
+        memo = cls._memo
+        counts = [memo.get((len(text), hash(text))) if text else 0 for text in texts]
+        missing = list({text for text, count in zip(texts, counts) if count is None})
+        if not missing:
+            return counts
+        # Read results back from this batch, not the memo: a batch larger than
+        # cache_size evicts its own entries
+        encoded: Dict[str, int] = {}
+        for text, tokens in zip(missing, encode_batch(missing)):
+            encoded[text] = len(tokens)
+            cls._remember((len(text), hash(text)), len(tokens))
+        return [count if count is not None else encoded[text] for text, count in zip(texts, counts)]
+
+    @classmethod
+    def _remember(cls, key: Tuple[int, int], count: int):
+        memo = cls._memo
+        memo[key] = count
+        if len(memo) > cls.cache_size:
+            memo.popitem(last=False)
+
+    @classmethod
+    def heuristic(cls, text: str) -> int:
         if not text:
             return 0
-        
+
         # Heuristic: ~4 characters per token for English
         char_count = len(text)
-        
-        # Word count heuristic
-        words = re.findall(r'\w+', text)
-        word_count = len(words)
-        
+
+        # Word count heuristic; longer prompts are sampled, so at most
+        # SAMPLE_WINDOWS * SAMPLE_WINDOW_CHARS characters are scanned
+        if char_count <= cls.SAMPLE_THRESHOLD:
+            word_count = len(_WORD.findall(text))
+        else:
+            window = cls.SAMPLE_WINDOW_CHARS
+            starts = range(0, char_count - window + 1, char_count // cls.SAMPLE_WINDOWS)
+            sampled = 0
+            for start in starts:
+                sampled += len(_WORD.findall(text, start, start + window))
+                if start and _SPLIT_WORD.match(text, start - 1):
+                    sampled -= 1
+            word_count = sampled * char_count / (len(starts) * window)
+
         # Average of char-based and word-based estimates
         return max(int(char_count / 4), int(word_count * 1.3))
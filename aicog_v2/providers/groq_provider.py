@@ -1,31 +1,61 @@
 import time
-from typing import Optional, Dict
-from groq import AsyncGroq
-from tenacity import retry, stop_after_attempt, wait_exponential
-from aicog_v2.core.interfaces import AIProvider, AIResponse
+from typing import TYPE_CHECKING, AsyncIterator, Callable, Optional, Dict, Iterable
+try:
+    from groq import AsyncGroq
+except ImportError as e:
+    raise ImportError("GroqProvider requires the 'groq' package (pip install aicog-v2[groq])") from e
+from aicog_v2.core.interfaces import AIProvider, AIResponse, StreamChunk, build_messages
+from aicog_v2.core.retry import provider_retrying
+
+if TYPE_CHECKING:
+    import httpx
 
 class GroqProvider(AIProvider):
-    def __init__(self, api_key: str):
-        self.client = AsyncGroq(api_key=api_key)
-
-    @retry(
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=2, max=10),
-        reraise=True
-    )
+    def __init__(
+        self,
+        api_key: str,
+        max_retries: int = 3,
+        http_client: Optional["httpx.AsyncClient"] = None,
+        retry_rate_limits: bool = True
+    ):
+        # SDK-level retries are disabled so retries (and Retry-After waits) happen only here
+        # `http_client` lets providers share one connection pool (see HTTPPool)
+        self.client = AsyncGroq(api_key=api_key, max_retries=0, http_client=http_client)
+        # Total attempts per call; use 1 when a circuit breaker/fallback chain handles failures
+        self.max_retries = max_retries
+        # False behind AiCogClient's rate_limiter: 429s are then retried by the client, through the limiter
+        self.retry_rate_limits = retry_rate_limits
+        # Called with the model before each retry; AiCogClient counts them in its metrics
+        self.on_retry: Optional[Callable[[str], None]] = None
+
+    @property
+    def base_url(self) -> str:
+        return str(self.client.base_url)
+
     async def generate(
         self, 
         prompt: str, 
         model: str, 
         system_prompt: Optional[str] = None,
+        messages: Optional[Iterable[Dict[str, str]]] = None,
+        **kwargs
+    ) -> AIResponse:
+        on_retry = (lambda: self.on_retry(model)) if self.on_retry is not None else None
+        async for attempt in provider_retrying(self.max_retries, self.retry_rate_limits, on_retry):
+            with attempt:
+                return await self._generate(prompt, model, system_prompt, messages, **kwargs)
+
+    async def _generate(
+        self,
+        prompt: str,
+        model: str,
+        system_prompt: Optional[str] = None,
+        messages: Optional[Iterable[Dict[str, str]]] = None,
         **kwargs
     ) -> AIResponse:
         start_time = time.time()
         
-        messages = []
-        if system_prompt:
-            messages.append({"role": "system", "content": system_prompt})
-        messages.append({"role": "user", "content": prompt})
+        messages = build_messages(prompt, system_prompt, messages)
 
         chat_completion = await self.client.chat.completions.create(
             messages=messages,
@@ -46,3 +76,37 @@ class GroqProvider(AIProvider):
             },
             latency=latency
         )
+
+    async def stream(
+        self,
+        prompt: str,
+        model: str,
+        system_prompt: Optional[str] = None,
+        messages: Optional[Iterable[Dict[str, str]]] = None,
+        **kwargs
+    ) -> AsyncIterator[StreamChunk]:
+        messages = build_messages(prompt, system_prompt, messages)
+
+        stream = await self.client.chat.completions.create(
+            messages=messages,
+            model=model,
+            stream=True,
+            **kwargs
+        )
+
+        async for chunk in stream:
+            choice = chunk.choices[0] if chunk.choices else None
+            usage = None
+            # Groq reports usage on the final chunk under x_groq
+            x_groq = getattr(chunk, "x_groq", None)
+            if x_groq is not None and getattr(x_groq, "usage", None):
+                usage = {
+                    "input_tokens": x_groq.usage.prompt_tokens,
+                    "output_tokens": x_groq.usage.completion_tokens,
+                    "total_tokens": x_groq.usage.total_tokens
+                }
+            yield StreamChunk(
+                content=(choice.delta.content or "") if choice else "",
+                usage=usage,
+                finish_reason=choice.finish_reason if choice else None
+            )
@@ -0,0 +1,225 @@
+import time
+import asyncio
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Tuple, Union
+
+from aicog_v2.core.interfaces import AIProvider, AIResponse, AIStorage, StreamChunk
+
+class ReplayMissError(LookupError):
+    """No recording for the requested prompt."""
+
+class _Recording:
+    __slots__ = ("response", "latency", "usage", "first_token_latency")
+
+    def __init__(self, response: str, latency: float, usage: Dict[str, int], first_token_latency: Optional[float]):
+        self.response = response
+        self.latency = latency
+        self.usage = usage
+        self.first_token_latency = first_token_latency
+
+class ReplayProvider(AIProvider):
+    """
+    Offline provider serving recorded responses, latencies and token usage,
+    e.g. from the audit log, so routing, caching and storage changes can be
+    load-tested without paying for real calls:
+
+        replay = await ReplayProvider.from_storage("aicog_monitoring.db")
+        sdk = AiCogClient(providers={"groq": replay, "openai": replay})
+
+    Recordings are keyed by (model, prompt). A prompt recorded under another
+    model is still served, so a changed routing table can be replayed; a
+    prompt recorded several times is served round-robin. The audit log keeps
+    neither system prompts nor prior turns, so those are ignored. Each call
+    waits the recorded latency times `latency_scale`. Unknown prompts go to
+    `fallback` when set, otherwise raise ReplayMissError.
+    """
+
+    def __init__(
+        self,
+        recordings: Optional[Iterable[Dict]] = None,
+        name: str = "replay",
+        latency_scale: float = 1.0,
+        fallback: Optional[AIProvider] = None
+    ):
+        self.name = name
+        self.latency_scale = latency_scale
+        self.fallback = fallback
+        self._by_model: Dict[Tuple[str, str], List[_Recording]] = {}
+        self._by_prompt: Dict[str, List[_Recording]] = {}
+        self._served: Dict[int, int] = {}
+        self.hits = 0
+        self.misses = 0
+        for row in recordings or ():
+            self.add(row)
+
+    @classmethod
+    async def from_storage(
+        cls,
+        storage: Union[AIStorage, str],
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+        **kwargs
+    ) -> "ReplayProvider":
+        """
+        Loads every audit row in [since, until) from a SQLiteStorage,
+        PartitionedSQLiteStorage or database path.
+        """
+        if isinstance(storage, str):
+            from aicog_v2.storage.sqlite_backend import SQLiteStorage
+            storage = SQLiteStorage(storage)
+        replay = cls(**kwargs)
+        async for row in storage.iter_requests(since, until):
+            replay.add(row)
+        return replay
+
+    def add(self, row: Dict):
+        """
+        Adds one recording: an audit row dict with at least `model`, `prompt`,
+        `response` and `latency`.
+        """
+        if row.get("prompt") is None or row.get("response") is None:
+            return
+        usage = {
+            "input_tokens": row.get("input_tokens") or 0,
+            "output_tokens": row.get("output_tokens") or 0,
+            "total_tokens": row.get("total_tokens") or 0,
+        }
+        recording = _Recording(row["response"], row.get("latency") or 0.0, usage, row.get("first_token_latency"))
+        self._by_model.setdefault((row["model"], row["prompt"]), []).append(recording)
+        self._by_prompt.setdefault(row["prompt"], []).append(recording)
+
+    def __len__(self) -> int:
+        return sum(len(recordings) for recordings in self._by_prompt.values())
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        return {"recordings": len(self), "prompts": len(self._by_prompt), "hits": self.hits, "misses": self.misses}
+
+    def _lookup(self, prompt: str, model: str) -> Optional[_Recording]:
+        recordings = self._by_model.get((model, prompt)) or self._by_prompt.get(prompt)
+        if not recordings:
+            return None
+        # Round-robin over repeated recordings of the same prompt
+        served = self._served.get(id(recordings), 0)
+        self._served[id(recordings)] = served + 1
+        return recordings[served % len(recordings)]
+
+    async def generate(
+        self,
+        prompt: str,
+        model: str,
+        system_prompt: Optional[str] = None,
+        **kwargs
+    ) -> AIResponse:
+        recording = self._lookup(prompt, model)
+        if recording is None:
+            self.misses += 1
+            if self.fallback is not None:
+                return await self.fallback.generate(prompt, model, system_prompt, **kwargs)
+            raise ReplayMissError(f"No recording for prompt {prompt[:50]!r} (model {model})")
+        self.hits += 1
+        start_time = time.time()
+        await asyncio.sleep(recording.latency * self.latency_scale)
+        return AIResponse(
+            content=recording.response,
+            model=model,
+            provider=self.name,
+            usage=dict(recording.usage),
+            latency=time.time() - start_time
+        )
+
+    async def stream(
+        self,
+        prompt: str,
+        model: str,
+        system_prompt: Optional[str] = None,
+        **kwargs
+    ) -> AsyncIterator[StreamChunk]:
+        """
+        Yields the first chunk after the recorded time to first token, the
+        rest once the recorded total latency has passed.
+        """
+        recording = self._lookup(prompt, model)
+        if recording is None:
+            self.misses += 1
+            if self.fallback is None:
+                raise ReplayMissError(f"No recording for prompt {prompt[:50]!r} (model {model})")
+            async for chunk in self.fallback.stream(prompt, model, system_prompt, **kwargs):
+                yield chunk
+            return
+        self.hits += 1
+        latency = recording.latency * self.latency_scale
+        first_token = min(latency, (recording.first_token_latency or latency) * self.latency_scale)
+        content = recording.response
+        await asyncio.sleep(first_token)
+        yield StreamChunk(content=content[:64])
+        await asyncio.sleep(latency - first_token)
+        if len(content) > 64:
+            yield StreamChunk(content=content[64:])
+        yield StreamChunk(usage=dict(recording.usage), finish_reason="stop")
+
+class RecordingProvider(AIProvider):
+    """
+    Recorder mode: forwards calls to a live provider and logs every
+    successful one (prompt, response, latency, usage) to `storage`, which
+    becomes a corpus for ReplayProvider.from_storage(). Streams are logged
+    once complete. Rows are written under `name`, the provider's key in the
+    client; `record_providers()` wraps a whole provider dict.
+    """
+
+    def __init__(self, provider: AIProvider, storage: AIStorage, name: str):
+        self.provider = provider
+        self.storage = storage
+        self.name = name
+        self.recorded = 0
+
+    @property
+    def base_url(self) -> Optional[str]:
+        return getattr(self.provider, "base_url", None)
+
+    async def generate(
+        self,
+        prompt: str,
+        model: str,
+        system_prompt: Optional[str] = None,
+        **kwargs
+    ) -> AIResponse:
+        response = await self.provider.generate(prompt, model, system_prompt, **kwargs)
+        await self.storage.log_request(
+            self.name, model, prompt, response.content, response.latency, response.usage,
+            response.first_token_latency
+        )
+        self.recorded += 1
+        return response
+
+    async def stream(
+        self,
+        prompt: str,
+        model: str,
+        system_prompt: Optional[str] = None,
+        **kwargs
+    ) -> AsyncIterator[StreamChunk]:
+        start_time = time.time()
+        first_token_latency = None
+        parts: List[str] = []
+        usage = None
+        async for chunk in self.provider.stream(prompt, model, system_prompt, **kwargs):
+            if chunk.content:
+                if first_token_latency is None:
+                    first_token_latency = time.time() - start_time
+                parts.append(chunk.content)
+            if chunk.usage:
+                usage = chunk.usage
+            yield chunk
+        await self.storage.log_request(
+            self.name, model, prompt, "".join(parts), time.time() - start_time, usage or {}, first_token_latency
+        )
+        self.recorded += 1
+
+def record_providers(providers: Dict[str, AIProvider], storage: AIStorage) -> Dict[str, RecordingProvider]:
+    """
+    Wraps each provider in a RecordingProvider logging to `storage`:
+
+        corpus = SQLiteStorage("replay_corpus.db", write_behind=True)
+        sdk = AiCogClient(providers=record_providers(providers, corpus), ...)
+    """
+    return {name: RecordingProvider(provider, storage, name) for name, provider in providers.items()}
@@ -0,0 +1,66 @@
+import zlib
+import hashlib
+from typing import Optional, Tuple
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+class BlobCodec:
+    """
+    Encodes text bodies for the content-addressed blob table. Bodies shorter
+    than `min_bytes`, or that do not shrink, are stored raw. zstd needs the
+    optional `zstandard` package.
+    """
+
+    def __init__(self, compression: Optional[str] = None, min_bytes: int = 512, level: Optional[int] = None):
+        if compression not in (None, "zlib", "zstd"):
+            raise ValueError(f"Unsupported compression: {compression}")
+        self.compression = compression
+        self.min_bytes = min_bytes
+        self.level = level
+        self._zstd_compressor = None
+        self._zstd_decompressor = None
+        if compression == "zstd":
+            self._zstd_compressor = self._zstd().ZstdCompressor(level=3 if level is None else level)
+
+    @staticmethod
+    def _zstd():
+        try:
+            import zstandard
+        except ImportError:
+            raise ImportError("zstd compression requires the 'zstandard' package (pip install zstandard)")
+        return zstandard
+
+    def encode(self, text: str) -> Tuple[str, int, bytes]:
+        """
+        Returns (encoding, uncompressed size, data).
+        """
+        raw = text.encode("utf-8")
+        encoding, data = self.compress(raw)
+        return encoding, len(raw), data
+
+    def decode(self, encoding: str, data: bytes) -> str:
+        return self.decompress(encoding, data).decode("utf-8")
+
+    def compress(self, raw: bytes) -> Tuple[str, bytes]:
+        """
+        Returns (encoding, data); "raw" when compression is off or does not pay.
+        """
+        if self.compression is None or len(raw) < self.min_bytes:
+            return "raw", raw
+        if self.compression == "zstd":
+            data = self._zstd_compressor.compress(raw)
+        else:
+            data = zlib.compress(raw, 6 if self.level is None else self.level)
+        if len(data) >= len(raw):
+            return "raw", raw
+        return self.compression, data
+
+    def decompress(self, encoding: str, data: bytes) -> bytes:
+        if encoding == "zlib":
+            return zlib.decompress(data)
+        if encoding == "zstd":
+            if self._zstd_decompressor is None:
+                self._zstd_decompressor = self._zstd().ZstdDecompressor()
+            return self._zstd_decompressor.decompress(data)
+        return bytes(data)
@@ -0,0 +1,206 @@
+"""
+Streaming export of the audit log to Parquet or Arrow IPC files.
+
+    aicog-export audit_trail.db exports/ --format parquet
+
+Each run writes only rows newer than the last export (tracked by row id in
+a state file next to the output) into a new file, so `exports/` grows into a
+dataset that pyarrow, DuckDB or pandas can read as a whole.
+"""
+import os
+import json
+import asyncio
+import argparse
+import logging
+from typing import Any, Dict, List, Optional, Union
+
+import aiosqlite
+
+from aicog_v2.core.interfaces import estimate_cost
+from aicog_v2.storage.sqlite_backend import SQLiteStorage, select_columns
+
+logger = logging.getLogger(__name__)
+
+STATE_FILE = "_export_state.json"
+FORMATS = {"parquet": "parquet", "arrow": "arrow"}
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.ipc
+        import pyarrow.parquet
+    except ImportError:
+        raise ImportError("Audit log export requires pyarrow (pip install aicog-v2[export])")
+    return pyarrow
+
+def _schema(pa, include_bodies: bool):
+    fields = [
+        ("id", pa.int64()),
+        ("timestamp", pa.timestamp("us", tz="UTC")),
+        ("provider", pa.string()),
+        ("model", pa.string()),
+    ]
+    if include_bodies:
+        fields += [("prompt", pa.string()), ("response", pa.string())]
+    fields += [
+        ("latency", pa.float64()),
+        ("first_token_latency", pa.float64()),
+        ("input_tokens", pa.int64()),
+        ("output_tokens", pa.int64()),
+        ("total_tokens", pa.int64()),
+        ("estimated_cost", pa.float64()),
+    ]
+    return pa.schema(fields)
+
+def read_state(destination: str) -> Dict[str, Any]:
+    try:
+        with open(os.path.join(destination, STATE_FILE)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+def _write_state(destination: str, state: Dict[str, Any]):
+    path = os.path.join(destination, STATE_FILE)
+    with open(path + ".tmp", "w") as f:
+        json.dump(state, f)
+    os.replace(path + ".tmp", path)
+
+async def export_audit_log(
+    storage: Union[SQLiteStorage, str],
+    destination: str,
+    format: str = "parquet",
+    chunk_size: int = 10_000,
+    include_bodies: bool = True,
+    since_id: Optional[int] = None,
+    compression: Optional[str] = "zstd"
+) -> Dict[str, Any]:
+    """
+    Exports audit rows with id greater than the high-water mark (`since_id`,
+    or the one saved by the previous export into `destination`) to a new
+    Parquet/Arrow file. Rows are read `chunk_size` at a time with keyset
+    pagination, so memory stays bounded regardless of table size; rows added
+    while the export runs are left for the next one. Deduplicated bodies are
+    resolved from the blob table. Logs written before the newer columns
+    existed export as-is, with those columns empty.
+
+    Returns {"path", "rows", "first_id", "last_id"}; `path` is None when there
+    was nothing new.
+    """
+    if format not in FORMATS:
+        raise ValueError(f"Unsupported export format: {format}")
+    pa = _pyarrow()
+    if isinstance(storage, str):
+        storage = SQLiteStorage(storage)
+    os.makedirs(destination, exist_ok=True)
+    state = read_state(destination)
+    if since_id is None:
+        since_id = state.get("last_id", 0)
+
+    loop = asyncio.get_running_loop()
+    schema = _schema(pa, include_bodies)
+    result = {"path": None, "rows": 0, "first_id": None, "last_id": since_id}
+
+    async with aiosqlite.connect(storage.db_path) as db:
+        async with db.execute("SELECT MAX(id) FROM requests") as cursor:
+            high_water = (await cursor.fetchone())[0] or 0
+        if high_water <= since_id:
+            return result
+
+        columns = await select_columns(db)
+        path = os.path.join(destination, f"audit-{since_id + 1:012d}-{high_water:012d}.{FORMATS[format]}")
+        tmp_path = path + ".tmp"
+        sink = pa.OSFile(tmp_path, "wb")
+        if format == "parquet":
+            writer = pa.parquet.ParquetWriter(sink, schema, compression=compression or "none")
+        else:
+            options = pa.ipc.IpcWriteOptions(compression=compression) if compression else None
+            writer = pa.ipc.new_file(sink, schema, options=options)
+
+        try:
+            last_id = since_id
+            while last_id < high_water:
+                async with db.execute(
+                    f"SELECT {columns} FROM requests WHERE id > ? AND id <= ? ORDER BY id LIMIT ?",
+                    (last_id, high_water, chunk_size)
+                ) as cursor:
+                    rows = await cursor.fetchall()
+                if not rows:
+                    break
+                bodies = {}
+                if include_bodies:
+                    hashes = {digest for row in rows for digest in row[11:13] if digest}
+                    bodies = await storage.load_blobs(db, hashes) if hashes else {}
+
+                batch = _record_batch(pa, schema, rows, bodies, include_bodies)
+                await loop.run_in_executor(None, writer.write_batch, batch)
+                if result["first_id"] is None:
+                    result["first_id"] = rows[0][0]
+                result["rows"] += len(rows)
+                last_id = rows[-1][0]
+            await loop.run_in_executor(None, writer.close)
+        except BaseException:
+            writer.close()
+            sink.close()
+            os.remove(tmp_path)
+            raise
+        sink.close()
+
+    os.replace(tmp_path, path)
+    result["path"] = path
+    result["last_id"] = last_id
+    _write_state(destination, {"last_id": last_id, "format": format})
+    logger.info(f"Exported {result['rows']} audit rows to {path}")
+    return result
+
+def _record_batch(pa, schema, rows: List[tuple], bodies: Dict[str, str], include_bodies: bool):
+    columns: Dict[str, list] = {name: [] for name in schema.names}
+    for row in rows:
+        (row_id, timestamp, provider, model, prompt, response, latency,
+         input_tokens, output_tokens, total_tokens, first_token_latency, prompt_hash, response_hash) = row
+        columns["id"].append(row_id)
+        columns["timestamp"].append(int(timestamp * 1_000_000) if timestamp is not None else None)
+        columns["provider"].append(provider)
+        columns["model"].append(model)
+        if include_bodies:
+            columns["prompt"].append(prompt if prompt is not None else bodies.get(prompt_hash))
+            columns["response"].append(response if response is not None else bodies.get(response_hash))
+        columns["latency"].append(latency)
+        columns["first_token_latency"].append(first_token_latency)
+        columns["input_tokens"].append(input_tokens)
+        columns["output_tokens"].append(output_tokens)
+        columns["total_tokens"].append(total_tokens)
+        columns["estimated_cost"].append(estimate_cost(model, input_tokens or 0, output_tokens or 0))
+    return pa.RecordBatch.from_arrays(
+        [pa.array(columns[field.name], type=field.type) for field in schema], schema=schema
+    )
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(
+        prog="aicog-export",
+        description="Export new audit log rows to Parquet or Arrow IPC."
+    )
+    parser.add_argument("db_path", help="SQLite audit database")
+    parser.add_argument("destination", help="output directory (holds the export state)")
+    parser.add_argument("--format", choices=sorted(FORMATS), default="parquet")
+    parser.add_argument("--chunk-size", type=int, default=10_000)
+    parser.add_argument("--compression", default="zstd", help="codec name, or 'none'")
+    parser.add_argument("--no-bodies", action="store_true", help="skip prompt/response text")
+    parser.add_argument("--full", action="store_true", help="ignore the saved high-water mark")
+    args = parser.parse_args(argv)
+
+    result = asyncio.run(export_audit_log(
+        args.db_path,
+        args.destination,
+        format=args.format,
+        chunk_size=args.chunk_size,
+        include_bodies=not args.no_bodies,
+        since_id=0 if args.full else None,
+        compression=None if args.compression == "none" else args.compression
+    ))
+    if result["path"]:
+        print(f"Exported {result['rows']} rows (ids {result['first_id']}-{result['last_id']}) to {result['path']}")
+    else:
+        print("Nothing new to export.")
+
+if __name__ == "__main__":
+    main()
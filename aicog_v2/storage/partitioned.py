@@ -0,0 +1,200 @@
+import os
+import time
+import asyncio
+import calendar
+import logging
+from typing import AsyncIterator, Dict, List, Optional, Sequence, Tuple
+
+from aicog_v2.core.interfaces import AIStorage
+from aicog_v2.storage import rollups as rollup_tables
+from aicog_v2.storage.sqlite_backend import SQLiteStorage
+
+logger = logging.getLogger(__name__)
+
+class PartitionedSQLiteStorage(AIStorage):
+    """
+    Audit log split into one SQLite file per time period (UTC), named
+    `{prefix}-{period}.db` inside `directory`.
+
+    When the period rolls over, new rows go to a fresh file and the previous
+    partition is drained and closed in the background, so writers never wait
+    on rotation. With `keep`, only the newest `keep` partitions are kept and
+    older files are deleted whole, which needs no vacuum. Other keyword
+    arguments are passed to each partition's SQLiteStorage.
+    """
+
+    FORMATS = {"hour": "%Y%m%d%H", "day": "%Y%m%d", "month": "%Y%m"}
+
+    def __init__(
+        self,
+        directory: str,
+        period: str = "day",
+        keep: Optional[int] = None,
+        prefix: str = "aicog",
+        **storage_kwargs
+    ):
+        if period not in self.FORMATS:
+            raise ValueError(f"Unsupported partition period: {period}")
+        self.directory = directory
+        self.period = period
+        self.keep = keep
+        self.prefix = prefix
+        self.storage_kwargs = storage_kwargs
+
+        self._active: Optional[SQLiteStorage] = None
+        self._active_name: Optional[str] = None
+        self._rotate_lock: Optional[asyncio.Lock] = None
+        # Previous partitions still draining, by path
+        self._retiring: Dict[str, asyncio.Task] = {}
+        self.rotations = 0
+
+    def partition_name(self, timestamp: float) -> str:
+        return time.strftime(self.FORMATS[self.period], time.gmtime(timestamp))
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, f"{self.prefix}-{name}.db")
+
+    def partitions(self) -> List[Tuple[str, str]]:
+        """
+        Returns (partition name, path) of every partition file, oldest first.
+        """
+        found = []
+        head = f"{self.prefix}-"
+        for filename in os.listdir(self.directory):
+            if filename.startswith(head) and filename.endswith(".db"):
+                name = filename[len(head):-3]
+                try:
+                    time.strptime(name, self.FORMATS[self.period])
+                except ValueError:
+                    continue
+                found.append((name, os.path.join(self.directory, filename)))
+        return sorted(found)
+
+    async def init_db(self):
+        os.makedirs(self.directory, exist_ok=True)
+        await self._current()
+
+    async def _current(self) -> SQLiteStorage:
+        name = self.partition_name(time.time())
+        if name == self._active_name:
+            return self._active
+        if self._rotate_lock is None:
+            self._rotate_lock = asyncio.Lock()
+        async with self._rotate_lock:
+            if name != self._active_name:
+                storage = SQLiteStorage(self._path(name), **self.storage_kwargs)
+                await storage.init_db()
+                previous, self._active, self._active_name = self._active, storage, name
+                if previous is not None:
+                    self.rotations += 1
+                    path = previous.db_path
+                    self._retiring[path] = asyncio.ensure_future(self._retire(previous))
+                    self._retiring[path].add_done_callback(lambda _: self._retiring.pop(path, None))
+        return self._active
+
+    async def _retire(self, storage: SQLiteStorage):
+        try:
+            await storage.close()
+        except Exception as e:
+            logger.warning(f"Closing partition {storage.db_path} failed: {e}")
+        self._retiring.pop(storage.db_path, None)
+        self.prune()
+
+    def prune(self) -> List[str]:
+        """
+        Deletes partition files beyond the newest `keep`. Returns the deleted paths.
+        """
+        if not self.keep:
+            return []
+        removed = []
+        for name, path in self.partitions()[:-self.keep]:
+            if name == self._active_name or path in self._retiring:
+                continue
+            for suffix in ("", "-wal", "-shm"):
+                try:
+                    os.remove(path + suffix)
+                except FileNotFoundError:
+                    pass
+            removed.append(path)
+        return removed
+
+    async def log_request(
+        self,
+        provider: str,
+        model: str,
+        prompt: str,
+        response: str,
+        latency: float,
+        usage: Dict[str, int],
+        first_token_latency: Optional[float] = None
+    ):
+        storage = await self._current()
+        await storage.log_request(provider, model, prompt, response, latency, usage, first_token_latency)
+
+    def _partition_storage(self, name: str, path: str) -> SQLiteStorage:
+        if name == self._active_name:
+            return self._active
+        return SQLiteStorage(path, **self.storage_kwargs)
+
+    async def summary(
+        self,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+        group_by: Sequence[str] = ("provider", "model")
+    ) -> List[Dict]:
+        """
+        SQLiteStorage.summary() merged across the partitions overlapping the range.
+        """
+        partitions = self.partitions()
+        starts = [calendar.timegm(time.strptime(name, self.FORMATS[self.period])) for name, _ in partitions]
+        groups: Dict[Tuple, Dict] = {}
+        for index, (name, path) in enumerate(partitions):
+            end = starts[index + 1] if index + 1 < len(starts) else float("inf")
+            if (until is not None and starts[index] >= until) or (since is not None and end <= since):
+                continue
+            storage = self._partition_storage(name, path)
+            rollup_tables.merge(groups, await storage._summary_groups(since, until, group_by))
+        return rollup_tables.finish(groups[key] for key in sorted(groups))
+
+    async def recent_latencies(self, limit: int = 1000) -> List[Tuple[str, str, float]]:
+        rows: List[Tuple[str, str, float]] = []
+        for name, path in reversed(self.partitions()):
+            if len(rows) >= limit:
+                break
+            older = await self._partition_storage(name, path).recent_latencies(limit - len(rows))
+            rows = older + rows
+        return rows
+
+    async def iter_requests(
+        self,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+        chunk_size: int = 1000
+    ) -> AsyncIterator[Dict]:
+        """
+        SQLiteStorage.iter_requests() across partitions, oldest first.
+        """
+        for name, path in self.partitions():
+            async for row in self._partition_storage(name, path).iter_requests(since, until, chunk_size):
+                yield row
+
+    async def apply_retention(self) -> int:
+        """
+        Applies row-level retention to every partition and prunes old files.
+        """
+        deleted = 0
+        for name, path in self.partitions():
+            deleted += await self._partition_storage(name, path).apply_retention()
+        self.prune()
+        return deleted
+
+    async def flush(self):
+        if self._active is not None:
+            await self._active.flush()
+        if self._retiring:
+            await asyncio.gather(*list(self._retiring.values()))
+
+    async def close(self):
+        await self.flush()
+        if self._active is not None:
+            await self._active.close()
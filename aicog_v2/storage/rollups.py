@@ -0,0 +1,151 @@
+import math
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from aicog_v2.core.interfaces import estimate_cost
+
+# Rollup granularities: table prefix -> bucket width in seconds
+GRANULARITIES = {"minute": 60, "hour": 3600}
+
+# Latency sketch: log-spaced bins with ~2% relative error (DDSketch-style)
+SKETCH_ACCURACY = 0.02
+_GAMMA = (1 + SKETCH_ACCURACY) / (1 - SKETCH_ACCURACY)
+_LOG_GAMMA = math.log(_GAMMA)
+_MIN_LATENCY = 1e-4
+
+ROLLUP_COLUMNS = (
+    "requests", "input_tokens", "output_tokens", "total_tokens", "cost", "latency_sum", "latency_max"
+)
+
+def schema() -> List[str]:
+    statements = [
+        "CREATE INDEX IF NOT EXISTS idx_requests_timestamp ON requests (timestamp)",
+        "CREATE INDEX IF NOT EXISTS idx_requests_provider_model ON requests (provider, model, timestamp)",
+    ]
+    for name in GRANULARITIES:
+        statements.append(f"""
+            CREATE TABLE IF NOT EXISTS rollup_{name} (
+                bucket INTEGER NOT NULL,
+                provider TEXT NOT NULL,
+                model TEXT NOT NULL,
+                requests INTEGER NOT NULL,
+                input_tokens INTEGER NOT NULL,
+                output_tokens INTEGER NOT NULL,
+                total_tokens INTEGER NOT NULL,
+                cost REAL NOT NULL,
+                latency_sum REAL NOT NULL,
+                latency_max REAL NOT NULL,
+                PRIMARY KEY (bucket, provider, model)
+            ) WITHOUT ROWID
+        """)
+        statements.append(f"""
+            CREATE TABLE IF NOT EXISTS rollup_{name}_latency (
+                bucket INTEGER NOT NULL,
+                provider TEXT NOT NULL,
+                model TEXT NOT NULL,
+                bin INTEGER NOT NULL,
+                count INTEGER NOT NULL,
+                PRIMARY KEY (bucket, provider, model, bin)
+            ) WITHOUT ROWID
+        """)
+    return statements
+
+def upsert_sql(name: str) -> Tuple[str, str]:
+    rollup = f"""
+        INSERT INTO rollup_{name} VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT (bucket, provider, model) DO UPDATE SET
+            requests = requests + excluded.requests,
+            input_tokens = input_tokens + excluded.input_tokens,
+            output_tokens = output_tokens + excluded.output_tokens,
+            total_tokens = total_tokens + excluded.total_tokens,
+            cost = cost + excluded.cost,
+            latency_sum = latency_sum + excluded.latency_sum,
+            latency_max = MAX(latency_max, excluded.latency_max)
+    """
+    sketch = f"""
+        INSERT INTO rollup_{name}_latency VALUES (?, ?, ?, ?, ?)
+        ON CONFLICT (bucket, provider, model, bin) DO UPDATE SET count = count + excluded.count
+    """
+    return rollup, sketch
+
+def sketch_bin(latency: float) -> int:
+    return math.ceil(math.log(max(latency, _MIN_LATENCY)) / _LOG_GAMMA)
+
+def sketch_value(bin_index: int) -> float:
+    return 2 * _GAMMA ** bin_index / (_GAMMA + 1)
+
+def sketch_quantile(sketch: Dict[int, int], q: float) -> Optional[float]:
+    total = sum(sketch.values())
+    if not total:
+        return None
+    rank = q * (total - 1)
+    seen = 0
+    for bin_index in sorted(sketch):
+        seen += sketch[bin_index]
+        if seen > rank:
+            return sketch_value(bin_index)
+    return sketch_value(max(sketch))
+
+def deltas(rows: Iterable[Sequence]) -> Dict[str, Tuple[List[Tuple], List[Tuple]]]:
+    """
+    Aggregates audit rows (in `requests` column order, without id) into
+    rollup and sketch upsert parameters for every granularity.
+    """
+    result = {}
+    rows = list(rows)
+    for name, width in GRANULARITIES.items():
+        stats: Dict[Tuple[int, str, str], List[float]] = {}
+        bins: Dict[Tuple[int, str, str, int], int] = {}
+        for row in rows:
+            timestamp, provider, model = row[0], row[1], row[2]
+            latency = row[5] or 0.0
+            input_tokens, output_tokens, total_tokens = row[6] or 0, row[7] or 0, row[8] or 0
+            key = (int(timestamp // width * width), provider, model)
+            entry = stats.get(key)
+            if entry is None:
+                entry = stats[key] = [0, 0, 0, 0, 0.0, 0.0, 0.0]
+            entry[0] += 1
+            entry[1] += input_tokens
+            entry[2] += output_tokens
+            entry[3] += total_tokens
+            entry[4] += estimate_cost(model, input_tokens, output_tokens)
+            entry[5] += latency
+            entry[6] = max(entry[6], latency)
+            bin_key = key + (sketch_bin(latency),)
+            bins[bin_key] = bins.get(bin_key, 0) + 1
+        result[name] = (
+            [key + tuple(entry) for key, entry in stats.items()],
+            [key + (count,) for key, count in bins.items()]
+        )
+    return result
+
+def finish(groups: Iterable[Dict]) -> List[Dict]:
+    """
+    Turns accumulated groups into summary rows with latency statistics.
+    """
+    summary = []
+    for group in groups:
+        sketch = group.pop("_sketch")
+        requests = group["requests"]
+        group["avg_latency"] = group.pop("latency_sum") / requests if requests else None
+        group["max_latency"] = group.pop("latency_max")
+        group["p50_latency"] = sketch_quantile(sketch, 0.50)
+        group["p95_latency"] = sketch_quantile(sketch, 0.95)
+        group["p99_latency"] = sketch_quantile(sketch, 0.99)
+        summary.append(group)
+    return summary
+
+def merge(target: Dict[Tuple, Dict], source: Dict[Tuple, Dict]):
+    """
+    Adds summary groups from another database (e.g. another partition) into `target`.
+    """
+    for key, group in source.items():
+        existing = target.get(key)
+        if existing is None:
+            target[key] = group
+            continue
+        for column in ROLLUP_COLUMNS[:-1]:
+            existing[column] += group[column]
+        existing["latency_max"] = max(existing["latency_max"], group["latency_max"])
+        sketch = existing["_sketch"]
+        for bin_index, count in group["_sketch"].items():
+            sketch[bin_index] = sketch.get(bin_index, 0) + count
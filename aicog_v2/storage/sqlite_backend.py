@@ -1,17 +1,113 @@
-import sqlite3
-import json
 import time
-import aiofiles
+import asyncio
+from collections import OrderedDict
+import logging
 import aiosqlite
-from typing import Dict
+from typing import AsyncIterator, Dict, List, Optional, Sequence, Tuple
 from aicog_v2.core.interfaces import AIStorage
+from aicog_v2.storage import rollups as rollup_tables
+from aicog_v2.storage.blobs import BlobCodec, content_hash
+
+logger = logging.getLogger(__name__)
+
+_INSERT_SQL = """
+    INSERT INTO requests
+    (timestamp, provider, model, prompt, response, latency, input_tokens, output_tokens, total_tokens,
+     first_token_latency, prompt_hash, response_hash)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+_BLOB_INSERT_SQL = "INSERT OR IGNORE INTO blobs (hash, encoding, size, data) VALUES (?, ?, ?, ?)"
+
+REQUEST_COLUMNS = (
+    "id", "timestamp", "provider", "model", "prompt", "response", "latency",
+    "input_tokens", "output_tokens", "total_tokens", "first_token_latency", "prompt_hash", "response_hash"
+)
+
+async def select_columns(db: aiosqlite.Connection, columns: Sequence[str] = REQUEST_COLUMNS) -> str:
+    """
+    SELECT list for `columns` of the requests table that also reads files
+    created before some of them existed: missing columns read as NULL, and
+    the file is left unmigrated.
+    """
+    async with db.execute("PRAGMA table_info(requests)") as cursor:
+        present = {row[1] for row in await cursor.fetchall()}
+    return ", ".join(column if column in present else f"NULL AS {column}" for column in columns)
 
 class SQLiteStorage(AIStorage):
-    def __init__(self, db_path: str = "aicog_monitoring.db"):
+    """
+    SQLite audit log.
+
+    With `write_behind=True`, `log_request` only enqueues the row; a background
+    task drains the queue over one long-lived WAL-mode connection in batched
+    `executemany` transactions, flushing whenever `batch_size` rows are queued
+    or every `flush_interval` seconds. When the queue holds `max_queue_size`
+    rows, callers either wait for room (backpressure, the default) or the row
+    is dropped and counted (`drop_when_full=True`). Call `close()` on shutdown
+    to drain the queue.
+
+    With `rollups=True` (the default), per-minute and per-hour aggregates
+    (requests, tokens, estimated cost, latency sketches) are maintained in the
+    same transaction as each insert, so `summary()` never scans raw rows.
+
+    With `dedup=True`, prompt and response bodies go to a content-addressed
+    `blobs` table (optionally zlib/zstd compressed) and `requests` only keeps
+    their hashes; `recent_requests()` resolves them. `retention_days` and
+    `max_size_mb` bound the log: `apply_retention()` deletes the oldest rows in
+    small transactions, drops unreferenced blobs and returns free pages with
+    incremental vacuum. The write-behind writer applies retention every
+    `retention_interval` seconds; otherwise call it yourself.
+    """
+
+    def __init__(
+        self,
+        db_path: str = "aicog_monitoring.db",
+        write_behind: bool = False,
+        batch_size: int = 200,
+        flush_interval: float = 0.5,
+        max_queue_size: int = 10_000,
+        drop_when_full: bool = False,
+        rollups: bool = True,
+        dedup: bool = False,
+        compression: Optional[str] = None,
+        retention_days: Optional[float] = None,
+        max_size_mb: Optional[float] = None,
+        retention_interval: float = 3600.0
+    ):
         self.db_path = db_path
+        self.write_behind = write_behind
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_queue_size = max_queue_size
+        self.drop_when_full = drop_when_full
+        self.rollups = rollups
+        self.dedup = dedup
+        self.codec = BlobCodec(compression)
+        self.retention_days = retention_days
+        self.max_size_mb = max_size_mb
+        self.retention_interval = retention_interval
+        # Hashes of blobs already stored, so repeated bodies skip compression and the insert
+        self._known_blobs: "OrderedDict[str, None]" = OrderedDict()
+        self._known_blobs_max = 10_000
+        self._last_retention = time.monotonic()
+
+        self._conn: Optional[aiosqlite.Connection] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._batch_ready: Optional[asyncio.Event] = None
+        self._writer_task: Optional[asyncio.Task] = None
+        self._flushing = 0
+        self._closing = False
+
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
 
     async def init_db(self):
         async with aiosqlite.connect(self.db_path) as db:
+            # Only takes effect on a new, empty file; lets retention give pages back
+            await db.execute("PRAGMA auto_vacuum=INCREMENTAL")
+            if self.write_behind:
+                await db.execute("PRAGMA journal_mode=WAL")
             await db.execute("""
                 CREATE TABLE IF NOT EXISTS requests (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -23,37 +119,511 @@ class SQLiteStorage(AIStorage):
                     latency REAL,
                     input_tokens INTEGER,
                     output_tokens INTEGER,
-                    total_tokens INTEGER
+                    total_tokens INTEGER,
+                    first_token_latency REAL,
+                    prompt_hash TEXT,
+                    response_hash TEXT
+                )
+            """)
+            await db.execute("""
+                CREATE TABLE IF NOT EXISTS blobs (
+                    hash TEXT PRIMARY KEY,
+                    encoding TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    data BLOB NOT NULL
                 )
             """)
+            await self._migrate(db)
+            await db.execute(
+                "CREATE INDEX IF NOT EXISTS idx_requests_prompt_hash ON requests (prompt_hash) "
+                "WHERE prompt_hash IS NOT NULL"
+            )
+            await db.execute(
+                "CREATE INDEX IF NOT EXISTS idx_requests_response_hash ON requests (response_hash) "
+                "WHERE response_hash IS NOT NULL"
+            )
+            if self.rollups:
+                async with db.execute(
+                    "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'rollup_minute'"
+                ) as cursor:
+                    existed = await cursor.fetchone() is not None
+                for statement in rollup_tables.schema():
+                    await db.execute(statement)
+                if not existed:
+                    # Rollups are new to this file: backfill them from existing rows
+                    await self._rebuild_rollups(db)
             await db.commit()
 
+    async def _migrate(self, db: aiosqlite.Connection):
+        """
+        Adds columns introduced after a database file was first created.
+        """
+        async with db.execute("PRAGMA table_info(requests)") as cursor:
+            columns = {row[1] for row in await cursor.fetchall()}
+        if "first_token_latency" not in columns:
+            await db.execute("ALTER TABLE requests ADD COLUMN first_token_latency REAL")
+        for column in ("prompt_hash", "response_hash"):
+            if column not in columns:
+                await db.execute(f"ALTER TABLE requests ADD COLUMN {column} TEXT")
+
     async def log_request(
-        self, 
-        provider: str, 
-        model: str, 
-        prompt: str, 
-        response: str, 
-        latency: float, 
-        usage: Dict[str, int]
+        self,
+        provider: str,
+        model: str,
+        prompt: str,
+        response: str,
+        latency: float,
+        usage: Dict[str, int],
+        first_token_latency: Optional[float] = None
     ):
+        row = (
+            time.time(),
+            provider,
+            model,
+            prompt,
+            response,
+            latency,
+            usage.get("input_tokens", 0),
+            usage.get("output_tokens", 0),
+            usage.get("total_tokens", 0),
+            first_token_latency
+        )
+
+        if self.write_behind:
+            await self._enqueue(row)
+            return
+
         async with aiosqlite.connect(self.db_path) as db:
-            await db.execute(
-                """
-                INSERT INTO requests 
-                (timestamp, provider, model, prompt, response, latency, input_tokens, output_tokens, total_tokens)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """,
-                (
-                    time.time(),
-                    provider,
-                    model,
-                    prompt,
-                    response,
-                    latency,
-                    usage.get("input_tokens", 0),
-                    usage.get("output_tokens", 0),
-                    usage.get("total_tokens", 0)
-                )
-            )
+            new_blobs = await self._insert_rows(db, [row])
+            await db.commit()
+        self._remember_blobs(new_blobs)
+        self.written += 1
+
+    async def _insert_rows(self, db: aiosqlite.Connection, rows: List[Tuple]) -> List[str]:
+        """
+        Inserts audit rows (and their blobs and rollups) without committing.
+        Returns the hashes of blobs written, to remember once committed.
+        """
+        new_blobs: Dict[str, Tuple] = {}
+        if self.dedup:
+            stored = []
+            # Known blobs skip compression, but may since have been deleted by retention
+            # (here or in another process), so their existence is still checked
+            known: Dict[str, str] = {}
+            for row in rows:
+                hashes = []
+                for text in (row[3], row[4]):
+                    digest = content_hash(text or "")
+                    if digest in self._known_blobs:
+                        known[digest] = text or ""
+                    elif digest not in new_blobs:
+                        new_blobs[digest] = (digest,) + self.codec.encode(text or "")
+                    hashes.append(digest)
+                stored.append(row[:3] + (None, None) + row[5:] + tuple(hashes))
+            if known:
+                present = await self._existing_blobs(db, known)
+                for digest, text in known.items():
+                    if digest not in present and digest not in new_blobs:
+                        new_blobs[digest] = (digest,) + self.codec.encode(text)
+            await db.executemany(_BLOB_INSERT_SQL, list(new_blobs.values()))
+        else:
+            stored = [row + (None, None) for row in rows]
+        await db.executemany(_INSERT_SQL, stored)
+        if self.rollups:
+            await self._apply_rollups(db, rows)
+        return list(new_blobs)
+
+    @staticmethod
+    async def _existing_blobs(db: aiosqlite.Connection, hashes, chunk_size: int = 500) -> set:
+        hashes = list(hashes)
+        present = set()
+        for start in range(0, len(hashes), chunk_size):
+            chunk = hashes[start:start + chunk_size]
+            async with db.execute(
+                f"SELECT hash FROM blobs WHERE hash IN ({', '.join('?' * len(chunk))})", chunk
+            ) as cursor:
+                present.update(row[0] for row in await cursor.fetchall())
+        return present
+
+    def _remember_blobs(self, hashes: List[str]):
+        known = self._known_blobs
+        for digest in hashes:
+            known[digest] = None
+            known.move_to_end(digest)
+        while len(known) > self._known_blobs_max:
+            known.popitem(last=False)
+
+    async def _apply_rollups(self, db: aiosqlite.Connection, rows: Sequence[Sequence]):
+        for name, (stats, bins) in rollup_tables.deltas(rows).items():
+            rollup_sql, sketch_sql = rollup_tables.upsert_sql(name)
+            await db.executemany(rollup_sql, stats)
+            await db.executemany(sketch_sql, bins)
+
+    async def _rebuild_rollups(self, db: aiosqlite.Connection, chunk_size: int = 10_000):
+        for name in rollup_tables.GRANULARITIES:
+            await db.execute(f"DELETE FROM rollup_{name}")
+            await db.execute(f"DELETE FROM rollup_{name}_latency")
+        async with db.execute(
+            "SELECT timestamp, provider, model, NULL, NULL, latency, input_tokens, output_tokens, total_tokens "
+            "FROM requests"
+        ) as cursor:
+            while True:
+                rows = await cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                await self._apply_rollups(db, rows)
+
+    async def rebuild_rollups(self):
+        """
+        Recomputes the rollup tables from the raw `requests` rows.
+        """
+        async with aiosqlite.connect(self.db_path) as db:
+            await self._rebuild_rollups(db)
             await db.commit()
+
+    async def summary(
+        self,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+        group_by: Sequence[str] = ("provider", "model")
+    ) -> List[Dict]:
+        """
+        Requests, tokens, estimated cost and latency (avg, max and sketched
+        p50/p95/p99) read from the rollup tables. `since`/`until` are epoch
+        seconds, resolved to the minute. `group_by` takes any of "provider",
+        "model", "minute" and "hour". Whole hours are read from the hourly
+        rollup and only the partial hours at the edges from the per-minute one.
+        """
+        groups = await self._summary_groups(since, until, group_by)
+        return rollup_tables.finish(groups[key] for key in sorted(groups))
+
+    async def _summary_groups(
+        self,
+        since: Optional[float],
+        until: Optional[float],
+        group_by: Sequence[str]
+    ) -> Dict[Tuple, Dict]:
+        if not self.rollups:
+            raise ValueError("summary() needs rollups=True")
+        for field in group_by:
+            if field not in ("provider", "model", "minute", "hour"):
+                raise ValueError(f"Cannot group by {field!r}")
+
+        since_bucket = int(since // 60 * 60) if since is not None else None
+        until_bucket = int(-(-until // 60) * 60) if until is not None else None
+        if "minute" in group_by:
+            ranges = [("minute", since_bucket, until_bucket)]
+        else:
+            hour_start = -(-since_bucket // 3600) * 3600 if since_bucket is not None else None
+            hour_end = until_bucket // 3600 * 3600 if until_bucket is not None else None
+            if hour_start is not None and hour_end is not None and hour_start >= hour_end:
+                ranges = [("minute", since_bucket, until_bucket)]
+            else:
+                ranges = [("hour", hour_start, hour_end)]
+                if since_bucket is not None and since_bucket < hour_start:
+                    ranges.append(("minute", since_bucket, hour_start))
+                if until_bucket is not None and hour_end < until_bucket:
+                    ranges.append(("minute", hour_end, until_bucket))
+
+        def group_key(bucket: int, provider: str, model: str) -> Tuple:
+            values = {"provider": provider, "model": model, "minute": bucket, "hour": bucket // 3600 * 3600}
+            return tuple(values[field] for field in group_by)
+
+        columns = rollup_tables.ROLLUP_COLUMNS
+        groups: Dict[Tuple, Dict] = {}
+        async with aiosqlite.connect(self.db_path) as db:
+            for table, low, high in ranges:
+                conditions, params = [], []
+                if low is not None:
+                    conditions.append("bucket >= ?")
+                    params.append(low)
+                if high is not None:
+                    conditions.append("bucket < ?")
+                    params.append(high)
+                where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+
+                async with db.execute(
+                    f"SELECT bucket, provider, model, {', '.join(columns)} FROM rollup_{table}{where}", params
+                ) as cursor:
+                    async for row in cursor:
+                        key = group_key(*row[:3])
+                        group = groups.get(key)
+                        if group is None:
+                            group = groups[key] = dict(zip(group_by, key))
+                            group.update({column: 0 for column in columns})
+                            group["_sketch"] = {}
+                        for column, value in zip(columns[:-1], row[3:-1]):
+                            group[column] += value
+                        group["latency_max"] = max(group["latency_max"], row[-1])
+
+                async with db.execute(
+                    f"SELECT bucket, provider, model, bin, count FROM rollup_{table}_latency{where}", params
+                ) as cursor:
+                    async for bucket, provider, model, bin_index, count in cursor:
+                        sketch = groups[group_key(bucket, provider, model)]["_sketch"]
+                        sketch[bin_index] = sketch.get(bin_index, 0) + count
+        return groups
+
+    async def recent_latencies(self, limit: int = 1000) -> List[Tuple[str, str, float]]:
+        """
+        Returns the latest (provider, model, latency) rows, oldest first.
+        """
+        async with aiosqlite.connect(self.db_path) as db:
+            async with db.execute(
+                "SELECT provider, model, latency FROM requests ORDER BY id DESC LIMIT ?",
+                (limit,)
+            ) as cursor:
+                rows = await cursor.fetchall()
+        return [tuple(row) for row in reversed(rows)]
+
+    async def recent_requests(self, limit: int = 100) -> List[Dict]:
+        """
+        Returns the latest audit rows as dicts, oldest first, with deduplicated
+        prompt/response bodies resolved from the blob table.
+        """
+        async with aiosqlite.connect(self.db_path) as db:
+            db.row_factory = aiosqlite.Row
+            async with db.execute(
+                f"SELECT {await select_columns(db)} FROM requests ORDER BY id DESC LIMIT ?", (limit,)
+            ) as cursor:
+                rows = [dict(row) for row in await cursor.fetchall()]
+            hashes = {row[column] for row in rows for column in ("prompt_hash", "response_hash") if row[column]}
+            bodies = await self.load_blobs(db, hashes)
+        for row in rows:
+            for column in ("prompt", "response"):
+                digest = row.pop(f"{column}_hash")
+                if row[column] is None and digest:
+                    row[column] = bodies.get(digest)
+        return list(reversed(rows))
+
+    async def iter_requests(
+        self,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+        chunk_size: int = 1000
+    ) -> AsyncIterator[Dict]:
+        """
+        Yields audit rows as dicts (like `recent_requests()`), oldest first,
+        read `chunk_size` at a time with keyset pagination so memory stays
+        bounded. `since`/`until` filter on the epoch timestamp.
+        """
+        conditions, params = ["id > ?"], []
+        if since is not None:
+            conditions.append("timestamp >= ?")
+            params.append(since)
+        if until is not None:
+            conditions.append("timestamp < ?")
+            params.append(until)
+        last_id = 0
+        async with aiosqlite.connect(self.db_path) as db:
+            db.row_factory = aiosqlite.Row
+            # Also reads logs written before the newer columns existed
+            sql = f"SELECT {await select_columns(db)} FROM requests WHERE {' AND '.join(conditions)} ORDER BY id LIMIT ?"
+            while True:
+                async with db.execute(sql, [last_id] + params + [chunk_size]) as cursor:
+                    rows = [dict(row) for row in await cursor.fetchall()]
+                if not rows:
+                    return
+                hashes = {row[column] for row in rows for column in ("prompt_hash", "response_hash") if row[column]}
+                bodies = await self.load_blobs(db, hashes) if hashes else {}
+                for row in rows:
+                    for column in ("prompt", "response"):
+                        digest = row.pop(f"{column}_hash")
+                        if row[column] is None and digest:
+                            row[column] = bodies.get(digest)
+                    yield row
+                last_id = rows[-1]["id"]
+
+    async def load_blobs(self, db: aiosqlite.Connection, hashes, chunk_size: int = 500) -> Dict[str, str]:
+        """
+        Decoded deduplicated bodies by content hash, read over `db`; hashes
+        without a blob are left out.
+        """
+        hashes = list(hashes)
+        bodies: Dict[str, str] = {}
+        for start in range(0, len(hashes), chunk_size):
+            chunk = hashes[start:start + chunk_size]
+            async with db.execute(
+                f"SELECT hash, encoding, data FROM blobs WHERE hash IN ({', '.join('?' * len(chunk))})",
+                chunk
+            ) as cursor:
+                async for digest, encoding, data in cursor:
+                    bodies[digest] = self.codec.decode(encoding, data)
+        return bodies
+
+    async def apply_retention(self, chunk_size: int = 5000, vacuum_pages: int = 1000) -> int:
+        """
+        Deletes rows older than `retention_days`, then the oldest rows while the
+        live data exceeds `max_size_mb`, in transactions of `chunk_size` rows so
+        writers are never blocked for long. Unreferenced blobs are removed and
+        free pages returned to the OS `vacuum_pages` at a time. Rollups are
+        kept. Returns the number of rows deleted.
+        """
+        self._last_retention = time.monotonic()
+        deleted = 0
+        async with aiosqlite.connect(self.db_path) as db:
+            if self.retention_days is not None:
+                cutoff = time.time() - self.retention_days * 86400
+                while True:
+                    cursor = await db.execute(
+                        "DELETE FROM requests WHERE id IN "
+                        "(SELECT id FROM requests WHERE timestamp < ? ORDER BY id LIMIT ?)",
+                        (cutoff, chunk_size)
+                    )
+                    await db.commit()
+                    deleted += cursor.rowcount
+                    if cursor.rowcount < chunk_size:
+                        break
+                await self._delete_orphan_blobs(db)
+
+            if self.max_size_mb is not None:
+                limit = self.max_size_mb * 1024 * 1024
+                while await self._live_bytes(db) > limit:
+                    cursor = await db.execute(
+                        "DELETE FROM requests WHERE id IN (SELECT id FROM requests ORDER BY id LIMIT ?)",
+                        (chunk_size,)
+                    )
+                    await db.commit()
+                    if cursor.rowcount <= 0:
+                        break
+                    deleted += cursor.rowcount
+                    await self._delete_orphan_blobs(db)
+
+            async with db.execute("PRAGMA auto_vacuum") as cursor:
+                incremental = (await cursor.fetchone())[0] == 2
+            previous = None
+            while incremental:
+                async with db.execute("PRAGMA freelist_count") as cursor:
+                    free_pages = (await cursor.fetchone())[0]
+                if not free_pages or free_pages == previous:
+                    break
+                previous = free_pages
+                async with db.execute(f"PRAGMA incremental_vacuum({vacuum_pages})") as cursor:
+                    await cursor.fetchall()
+                await db.commit()
+        return deleted
+
+    async def _delete_orphan_blobs(self, db: aiosqlite.Connection):
+        # Deleted blobs must be rewritten if they show up again
+        self._known_blobs.clear()
+        await db.execute("""
+            DELETE FROM blobs WHERE
+                NOT EXISTS (SELECT 1 FROM requests WHERE prompt_hash = blobs.hash) AND
+                NOT EXISTS (SELECT 1 FROM requests WHERE response_hash = blobs.hash)
+        """)
+        await db.commit()
+
+    @staticmethod
+    async def _live_bytes(db: aiosqlite.Connection) -> int:
+        values = []
+        for pragma in ("page_count", "freelist_count", "page_size"):
+            async with db.execute(f"PRAGMA {pragma}") as cursor:
+                values.append((await cursor.fetchone())[0])
+        page_count, freelist_count, page_size = values
+        return (page_count - freelist_count) * page_size
+
+    @property
+    def pending(self) -> int:
+        return self._queue.qsize() if self._queue else 0
+
+    async def _enqueue(self, row: Tuple):
+        self._ensure_writer()
+        if self.drop_when_full:
+            try:
+                self._queue.put_nowait(row)
+            except asyncio.QueueFull:
+                self.dropped += 1
+                return
+        else:
+            await self._queue.put(row)
+        if self._queue.qsize() >= self.batch_size:
+            self._batch_ready.set()
+
+    def _ensure_writer(self):
+        # Created lazily so they bind to the running event loop
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+            self._batch_ready = asyncio.Event()
+        if self._closing:
+            return
+        if self._writer_task is None or self._writer_task.done():
+            self._writer_task = asyncio.get_running_loop().create_task(self._writer())
+
+    async def _connection(self) -> aiosqlite.Connection:
+        if self._conn is None:
+            self._conn = await aiosqlite.connect(self.db_path)
+            await self._conn.execute("PRAGMA journal_mode=WAL")
+            # WAL + NORMAL only fsyncs at checkpoints, not on every commit
+            await self._conn.execute("PRAGMA synchronous=NORMAL")
+        return self._conn
+
+    async def _writer(self):
+        while True:
+            if self._queue.qsize() < self.batch_size and not (self._flushing and self._queue.qsize()):
+                try:
+                    await asyncio.wait_for(self._batch_ready.wait(), self.flush_interval)
+                except asyncio.TimeoutError:
+                    pass
+            self._batch_ready.clear()
+            if self._closing and self._queue.empty():
+                return
+
+            batch: List[Tuple] = []
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except asyncio.QueueEmpty:
+                    break
+            if not batch:
+                continue
+
+            try:
+                await self._write_batch(batch)
+                self.written += len(batch)
+            except Exception as e:
+                self.failed += len(batch)
+                logger.warning(f"SQLite batch write of {len(batch)} rows failed: {e}")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def _write_batch(self, batch: List[Tuple]):
+        db = await self._connection()
+        try:
+            new_blobs = await self._insert_rows(db, batch)
+            await db.commit()
+        except Exception:
+            await db.rollback()
+            raise
+        self._remember_blobs(new_blobs)
+        if (self.retention_days or self.max_size_mb) and \
+                time.monotonic() - self._last_retention >= self.retention_interval:
+            try:
+                await self.apply_retention()
+            except Exception as e:
+                logger.warning(f"SQLite retention pass failed: {e}")
+
+    async def flush(self):
+        if self._queue is None:
+            return
+        self._ensure_writer()
+        self._flushing += 1
+        try:
+            self._batch_ready.set()
+            await self._queue.join()
+        finally:
+            self._flushing -= 1
+
+    async def close(self):
+        await self.flush()
+        if self._writer_task is not None:
+            # Stop cooperatively: cancelling a task parked in wait_for() can be
+            # swallowed when the event fires at the same moment.
+            self._closing = True
+            self._batch_ready.set()
+            await self._writer_task
+            self._writer_task = None
+            self._closing = False
+        if self._conn is not None:
+            await self._conn.close()
+            self._conn = None
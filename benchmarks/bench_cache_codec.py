@@ -0,0 +1,96 @@
+"""
+Stored size and encode/decode time of cache payloads: legacy JSON text vs
+CacheSerializer with zlib, zstd and (when installed) msgpack.
+
+Payloads mimic cached LLM responses (prose with a repetitive vocabulary,
+plus the usage/latency envelope the client stores) at several sizes.
+
+    python benchmarks/bench_cache_codec.py --sizes 200 2000 20000 --count 500
+"""
+import argparse
+import importlib.util
+import json
+import random
+import time
+
+from aicog_v2.cache.serialization import CacheSerializer
+
+WORDS = (
+    "the model returns a response with tokens latency cache provider request "
+    "prompt answer context function data system user result value example code "
+    "python async await error retry summary table list step first second finally"
+).split()
+
+def make_payload(size: int, rng: random.Random) -> str:
+    words = []
+    length = 0
+    while length < size:
+        word = rng.choice(WORDS)
+        words.append(word)
+        length += len(word) + 1
+    content = " ".join(words)[:size]
+    return json.dumps({
+        "content": content,
+        "usage": {"input_tokens": rng.randint(10, 500), "output_tokens": size // 4, "total_tokens": size // 4 + 100},
+        "latency": rng.random()
+    })
+
+def codecs():
+    yield "json (legacy)", None
+    yield "zlib", CacheSerializer(compression="zlib")
+    if importlib.util.find_spec("zstandard"):
+        yield "zstd", CacheSerializer(compression="zstd")
+        if importlib.util.find_spec("msgpack"):
+            yield "msgpack+zstd", CacheSerializer(compression="zstd", format="msgpack")
+
+def bench(size: int, count: int, seed: int):
+    rng = random.Random(seed)
+    payloads = [make_payload(size, rng) for _ in range(count)]
+    raw_bytes = sum(len(p.encode("utf-8")) for p in payloads)
+    results = []
+    for name, serializer in codecs():
+        if serializer is None:
+            stored, encode_time, decode_time = raw_bytes, 0.0, 0.0
+        else:
+            start = time.perf_counter()
+            encoded = [serializer.dumps(p) for p in payloads]
+            encode_time = time.perf_counter() - start
+            start = time.perf_counter()
+            for data in encoded:
+                serializer.loads(data)
+            decode_time = time.perf_counter() - start
+            stored = sum(len(data) for data in encoded)
+        results.append({
+            "size": size,
+            "codec": name,
+            "avg_stored_bytes": round(stored / count, 1),
+            "bytes_saved_pct": round(100 * (1 - stored / raw_bytes), 1),
+            "entries_per_memory": round(raw_bytes / stored, 2),
+            "encode_us": round(encode_time / count * 1e6, 2),
+            "decode_us": round(decode_time / count * 1e6, 2),
+        })
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[200, 2000, 20000])
+    parser.add_argument("--count", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", help="write JSON results to this file")
+    args = parser.parse_args()
+
+    results = []
+    for size in args.sizes:
+        results.extend(bench(size, args.count, args.seed))
+    for r in results:
+        print(
+            f"size={r['size']:>6}  {r['codec']:<14} {r['avg_stored_bytes']:>10.1f}B"
+            f"  saved {r['bytes_saved_pct']:>5.1f}%  x{r['entries_per_memory']:<5}"
+            f"  encode {r['encode_us']:>7.2f}us  decode {r['decode_us']:>7.2f}us"
+        )
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == "__main__":
+    main()
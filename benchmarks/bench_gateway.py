@@ -0,0 +1,196 @@
+"""
+Gateway overhead benchmark: how much latency and CPU AiCogClient.generate
+adds on top of the provider, across concurrency levels and cache-hit ratios.
+
+Everything runs offline: fake providers with simulated latency/errors/429s,
+an in-memory or fakeredis cache, and a temp-file SQLite audit log.
+
+    python benchmarks/bench_gateway.py --output results.json
+    python benchmarks/bench_gateway.py --compare results.json   # diff against an earlier run
+"""
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+import platform
+import tempfile
+from typing import Dict, List
+
+from fakes import FakeProvider, TimedCache, TimedStorage, make_cache
+
+import aicog_v2
+from aicog_v2.client import AiCogClient
+from aicog_v2.storage.sqlite_backend import SQLiteStorage
+
+MODEL = "fake-model"
+HOT_PROMPTS = 64
+
+def percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+async def run_scenario(args, concurrency: int, hit_ratio: float, db_dir: str) -> Dict:
+    provider = FakeProvider(
+        latency=args.provider_latency,
+        distribution=args.distribution,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        seed=args.seed
+    )
+    cache = make_cache(args.cache)
+    timed_cache = TimedCache(cache) if cache is not None else None
+    timed_storage = None
+    if args.storage != "none":
+        storage = SQLiteStorage(
+            os.path.join(db_dir, f"bench_{concurrency}_{hit_ratio}.db"),
+            write_behind=args.storage == "write-behind"
+        )
+        await storage.init_db()
+        timed_storage = TimedStorage(storage)
+    client = AiCogClient(
+        providers={"fake": provider},
+        cache=timed_cache,
+        storage=timed_storage,
+        default_provider="fake"
+    )
+
+    # Warm the cache with the hot set so hits are real hits (no injected failures)
+    hot = [f"hot prompt number {i}: explain the trade-offs of caching" for i in range(HOT_PROMPTS)]
+    if timed_cache is not None:
+        provider.error_rate = provider.rate_limit_rate = 0.0
+        for prompt in hot:
+            await client.generate(prompt, model=MODEL)
+        provider.error_rate, provider.rate_limit_rate = args.error_rate, args.rate_limit_rate
+
+    rng = random.Random(args.seed)
+    prompts = [
+        rng.choice(hot) if rng.random() < hit_ratio else f"cold prompt {i}: {rng.random()}"
+        for i in range(args.requests)
+    ]
+
+    provider.calls = 0
+    provider.busy_time = 0.0
+    if timed_cache is not None:
+        timed_cache.time = {"get": 0.0, "set": 0.0}
+    if timed_storage is not None:
+        timed_storage.time = 0.0
+
+    latencies: List[float] = []
+    errors: Dict[str, int] = {}
+    queue: asyncio.Queue = asyncio.Queue()
+    for prompt in prompts:
+        queue.put_nowait(prompt)
+
+    async def worker():
+        while True:
+            try:
+                prompt = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            start = time.perf_counter()
+            try:
+                await client.generate(prompt, model=MODEL)
+            except Exception as e:
+                errors[type(e).__name__] = errors.get(type(e).__name__, 0) + 1
+            latencies.append(time.perf_counter() - start)
+
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(concurrency)])
+    wall = time.perf_counter() - wall_start
+    cpu = time.process_time() - cpu_start
+    await client.aclose()
+
+    n = len(latencies)
+    mean_latency = sum(latencies) / n
+    overhead = mean_latency - provider.busy_time / n
+    stages = {
+        "provider_ms": provider.busy_time / n * 1000,
+        "cache_get_ms": timed_cache.time["get"] / n * 1000 if timed_cache else 0.0,
+        "cache_set_ms": timed_cache.time["set"] / n * 1000 if timed_cache else 0.0,
+        "storage_ms": timed_storage.time / n * 1000 if timed_storage else 0.0,
+    }
+    stages["other_overhead_ms"] = max(
+        overhead * 1000 - stages["cache_get_ms"] - stages["cache_set_ms"] - stages["storage_ms"], 0.0
+    )
+    return {
+        "name": f"c{concurrency}_hit{int(hit_ratio * 100)}",
+        "concurrency": concurrency,
+        "hit_ratio": hit_ratio,
+        "requests": n,
+        "provider_calls": provider.calls,
+        "errors": errors,
+        "rps": n / wall,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "mean_ms": mean_latency * 1000,
+        "overhead_ms": overhead * 1000,
+        "cpu_us_per_request": cpu / n * 1_000_000,
+        "stages": stages,
+    }
+
+def compare(results: List[Dict], baseline_path: str):
+    with open(baseline_path) as f:
+        baseline = {r["name"]: r for r in json.load(f)["results"]}
+    print(f"\nComparison against {baseline_path}:")
+    for r in results:
+        old = baseline.get(r["name"])
+        if old is None:
+            continue
+        deltas = []
+        for metric in ("rps", "p50_ms", "p99_ms", "cpu_us_per_request"):
+            if old[metric]:
+                deltas.append(f"{metric} {100 * (r[metric] - old[metric]) / old[metric]:+.1f}%")
+        print(f"  {r['name']:<14} " + "  ".join(deltas))
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 16, 64])
+    parser.add_argument("--hit-ratios", type=float, nargs="+", default=[0.0, 0.5, 0.9])
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--provider-latency", type=float, default=0.005, help="median seconds")
+    parser.add_argument("--distribution", choices=["constant", "uniform", "lognormal"], default="lognormal")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="fraction of calls answered with 429")
+    parser.add_argument("--cache", choices=["memory", "fakeredis", "none"], default="memory")
+    parser.add_argument("--storage", choices=["sync", "write-behind", "none"], default="write-behind")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="write JSON results to this file")
+    parser.add_argument("--compare", help="earlier JSON results to diff against")
+    args = parser.parse_args()
+
+    results = []
+    with tempfile.TemporaryDirectory() as db_dir:
+        for concurrency in args.concurrency:
+            for hit_ratio in args.hit_ratios:
+                r = await run_scenario(args, concurrency, hit_ratio, db_dir)
+                results.append(r)
+                print(
+                    f"{r['name']:<14} rps={r['rps']:>9.1f}  p50={r['p50_ms']:>7.2f}ms  p99={r['p99_ms']:>7.2f}ms"
+                    f"  overhead={r['overhead_ms']:>6.3f}ms  cpu={r['cpu_us_per_request']:>7.1f}us/req"
+                    f"  errors={sum(r['errors'].values())}"
+                )
+
+    report = {
+        "meta": {
+            "aicog_version": aicog_v2.__version__,
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "timestamp": time.time(),
+            "args": vars(args),
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.compare:
+        compare(results, args.compare)
+
+if __name__ == "__main__":
+    asyncio.run(main())
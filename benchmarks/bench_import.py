@@ -0,0 +1,87 @@
+"""
+Cold-start benchmark: how long importing aicog_v2 takes, and which
+backends each entry point drags in.
+
+    python benchmarks/bench_import.py --budget-ms 300
+
+Each statement runs in a fresh interpreter with `python -X importtime`;
+the reported time is the median over `--runs`. Exits non-zero when a
+statement is over budget or imports a backend it should not.
+"""
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+from typing import Dict, List, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# statement -> top-level modules it must not import
+SCENARIOS = {
+    "import aicog_v2": ["groq", "openai", "redis", "aiosqlite", "pydantic", "tenacity"],
+    "from aicog_v2 import AiCogClient": ["groq", "openai", "redis", "aiosqlite", "tenacity"],
+    "from aicog_v2 import AiCogClient, MemoryCache, SQLiteStorage": ["groq", "openai", "redis"],
+    "from aicog_v2 import GroqProvider": ["openai", "redis", "aiosqlite"],
+    "from aicog_v2 import OpenAIProvider": ["groq", "redis", "aiosqlite"],
+}
+
+def run_once(statement: str) -> Tuple[float, List[Tuple[str, int]], List[str]]:
+    probe = f"{statement}\nimport sys\nprint('MODULES=' + ','.join(sorted(sys.modules)))"
+    env = dict(os.environ, PYTHONPATH=ROOT + os.pathsep + os.environ.get("PYTHONPATH", ""))
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", probe],
+        capture_output=True, text=True, env=env, check=True
+    )
+    timings: List[Tuple[str, int]] = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        _, cumulative_us, name = line.split(":", 1)[1].split("|")
+        # One leading space marks a top-level import (nested ones are indented further)
+        if len(name) - len(name.lstrip()) == 1:
+            timings.append((name.strip(), int(cumulative_us)))
+    # Interpreter startup (site and friends) is imported before the statement runs
+    statement_timings = timings[[name for name, _ in timings].index("site") + 1:] if any(
+        name == "site" for name, _ in timings) else timings
+    modules = proc.stdout.split("MODULES=", 1)[1].strip().split(",")
+    return sum(us for _, us in statement_timings) / 1000, statement_timings, modules
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=300.0, help="budget for 'from aicog_v2 import AiCogClient'")
+    parser.add_argument("--top", type=int, default=5, help="slowest top-level imports to show")
+    parser.add_argument("--output", help="write JSON results to this file")
+    args = parser.parse_args()
+
+    failures = []
+    results: Dict[str, Dict] = {}
+    for statement, forbidden in SCENARIOS.items():
+        samples = [run_once(statement) for _ in range(args.runs)]
+        median_ms = statistics.median(sample[0] for sample in samples)
+        _, timings, modules = samples[-1]
+        loaded = {module.split(".")[0] for module in modules}
+        leaked = [name for name in forbidden if name in loaded]
+        results[statement] = {"median_ms": median_ms, "leaked": leaked}
+
+        print(f"{statement:<62} {median_ms:>8.1f} ms")
+        for name, us in sorted(timings, key=lambda item: -item[1])[:args.top]:
+            print(f"    {name:<40} {us / 1000:>8.1f} ms")
+        if leaked:
+            failures.append(f"{statement!r} imported {', '.join(leaked)}")
+
+    client_ms = results["from aicog_v2 import AiCogClient"]["median_ms"]
+    if client_ms > args.budget_ms:
+        failures.append(f"AiCogClient import took {client_ms:.1f} ms (budget {args.budget_ms:.0f} ms)")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"python": sys.version.split()[0], "results": results}, f, indent=2)
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    main()
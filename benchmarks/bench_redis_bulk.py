@@ -0,0 +1,118 @@
+"""
+Round trips and wall time of per-key vs bulk (MGET / pipelined SETEX) cache access.
+
+Runs against a local Redis when REDIS_URL is set, otherwise against fakeredis
+with a simulated network round-trip time (--rtt-ms).
+
+    python benchmarks/bench_redis_bulk.py --batch-sizes 1 10 100 1000 --rtt-ms 0.5
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+
+from aicog_v2.cache.redis_backend import RedisCache
+
+class RoundTripCounter:
+    """
+    Wraps an async Redis client, counting network round trips and optionally
+    sleeping `rtt` seconds per round trip to model a remote server.
+    """
+
+    def __init__(self, client, rtt: float = 0.0):
+        self._client = client
+        self.rtt = rtt
+        self.round_trips = 0
+
+    async def _trip(self):
+        self.round_trips += 1
+        if self.rtt:
+            await asyncio.sleep(self.rtt)
+
+    async def get(self, key):
+        await self._trip()
+        return await self._client.get(key)
+
+    async def setex(self, key, ttl, value):
+        await self._trip()
+        return await self._client.setex(key, ttl, value)
+
+    async def mget(self, keys):
+        await self._trip()
+        return await self._client.mget(keys)
+
+    def pipeline(self, transaction=True):
+        counter = self
+        pipe = self._client.pipeline(transaction=transaction)
+        execute = pipe.execute
+
+        async def counted_execute(*args, **kwargs):
+            await counter._trip()
+            return await execute(*args, **kwargs)
+
+        pipe.execute = counted_execute
+        return pipe
+
+def make_client():
+    url = os.getenv("REDIS_URL")
+    if url:
+        import redis.asyncio as redis
+        return redis.Redis.from_url(url, decode_responses=True), "redis"
+    import fakeredis
+    return fakeredis.FakeAsyncRedis(decode_responses=True), "fakeredis"
+
+async def bench(batch_size: int, rtt: float, payload_bytes: int):
+    raw, backend = make_client()
+    counter = RoundTripCounter(raw, rtt=rtt if backend == "fakeredis" else 0.0)
+    cache = RedisCache(client=counter)
+    items = {f"bench:{batch_size}:{i}": "x" * payload_bytes for i in range(batch_size)}
+    keys = list(items)
+
+    counter.round_trips = 0
+    start = time.perf_counter()
+    for key, value in items.items():
+        await cache.set(key, value)
+    for key in keys:
+        await cache.get(key)
+    single_time = time.perf_counter() - start
+    single_trips = counter.round_trips
+
+    counter.round_trips = 0
+    start = time.perf_counter()
+    await cache.set_many(items)
+    await cache.get_many(keys)
+    bulk_time = time.perf_counter() - start
+    bulk_trips = counter.round_trips
+
+    return {
+        "backend": backend,
+        "batch_size": batch_size,
+        "single_round_trips": single_trips,
+        "bulk_round_trips": bulk_trips,
+        "round_trips_saved": single_trips - bulk_trips,
+        "single_ms": round(single_time * 1000, 3),
+        "bulk_ms": round(bulk_time * 1000, 3),
+        "speedup": round(single_time / bulk_time, 2) if bulk_time else None,
+    }
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 10, 100, 1000])
+    parser.add_argument("--rtt-ms", type=float, default=0.5, help="simulated RTT for fakeredis")
+    parser.add_argument("--payload-bytes", type=int, default=512)
+    parser.add_argument("--output", help="write JSON results to this file")
+    args = parser.parse_args()
+
+    results = [await bench(n, args.rtt_ms / 1000, args.payload_bytes) for n in args.batch_sizes]
+    for r in results:
+        print(
+            f"batch={r['batch_size']:>5}  round trips {r['single_round_trips']:>5} -> {r['bulk_round_trips']}"
+            f"  time {r['single_ms']:>9.2f}ms -> {r['bulk_ms']:.2f}ms  ({r['speedup']}x)"
+        )
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,84 @@
+"""
+Per-request CPU of the cache-hit response path: the previous json +
+validated AIResponse (+ model_copy for coalesced followers and stream
+replays) vs the fast path (orjson when installed, slotted ResponseData,
+unvalidated AIResponse at the boundary).
+
+    PYTHONPATH=. python benchmarks/bench_response.py --sizes 200 2000 20000
+"""
+import argparse
+import json
+import time
+
+from aicog_v2.core.fastpath import ResponseData, copy_response, json_dumps, orjson
+from aicog_v2.core.interfaces import AIResponse
+
+USAGE = {"input_tokens": 120, "output_tokens": 480, "total_tokens": 600}
+
+def previous_hit(cached_val: str) -> AIResponse:
+    data = json.loads(cached_val)
+    response = AIResponse(
+        content=data["content"],
+        model="gpt-4o-mini",
+        provider="openai",
+        usage=data.get("usage", {"input_tokens": 0, "output_tokens": 0, "total_tokens": 0}),
+        latency=data.get("latency", 0.0),
+        cached=True
+    )
+    return response.model_copy(update={"first_token_latency": 0.0})
+
+def fast_hit(cached_val: str) -> AIResponse:
+    response = ResponseData.from_cache(cached_val, "gpt-4o-mini", "openai").to_response()
+    return copy_response(response, first_token_latency=0.0)
+
+def previous_store(response: AIResponse) -> str:
+    return json.dumps({"content": response.content, "usage": response.usage, "latency": response.latency})
+
+def fast_store(response: AIResponse) -> str:
+    return json_dumps({"content": response.content, "usage": response.usage, "latency": response.latency})
+
+def timed(fn, value, repeat: int) -> float:
+    start = time.process_time()
+    for _ in range(repeat):
+        fn(value)
+    return (time.process_time() - start) / repeat
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[200, 2000, 20_000])
+    parser.add_argument("--repeat", type=int, default=20_000)
+    parser.add_argument("--output", help="write JSON results to this file")
+    args = parser.parse_args()
+
+    results = []
+    for size in args.sizes:
+        content = ("lorem ipsum dolor sit amet " * (size // 27 + 1))[:size]
+        response = AIResponse(content=content, model="gpt-4o-mini", provider="openai", usage=USAGE, latency=0.42)
+        cached_val = previous_store(response)
+        assert fast_hit(cached_val) == previous_hit(cached_val)
+        for stage, previous, fast, value in (
+            ("hit", previous_hit, fast_hit, cached_val),
+            ("store", previous_store, fast_store, response),
+        ):
+            before = timed(previous, value, args.repeat)
+            after = timed(fast, value, args.repeat)
+            results.append({
+                "stage": stage,
+                "size": size,
+                "previous_us": round(before * 1e6, 2),
+                "fast_us": round(after * 1e6, 2),
+                "speedup": round(before / after, 2) if after else None,
+            })
+
+    print(f"orjson: {'yes' if orjson is not None else 'no (stdlib json)'}")
+    for r in results:
+        print(
+            f"{r['stage']:<5} size={r['size']:>6}  previous {r['previous_us']:>7.2f}us"
+            f"  fast {r['fast_us']:>7.2f}us  ({r['speedup']}x)"
+        )
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == "__main__":
+    main()
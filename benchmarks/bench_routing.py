@@ -0,0 +1,91 @@
+"""
+Microbenchmark of task classification: the previous lowercase + per-keyword
+substring scans vs the compiled RuleEngine, for the default rules and for
+a large synthetic rule set, across prompt sizes.
+
+    PYTHONPATH=. python benchmarks/bench_routing.py --sizes 100 10000 100000 --rules 50
+"""
+import argparse
+import json
+import random
+import time
+
+from aicog_v2.core.rules import DEFAULT_RULES, RuleEngine, TaskRule
+
+FILLER = (
+    "the service handles requests from many users and stores results in a database "
+    "while background workers process queued jobs and report metrics"
+).split()
+
+def previous_classify(rules, prompt: str) -> str:
+    prompt_lower = prompt.lower()
+    for rule in rules:
+        if any(keyword.rstrip("*") in prompt_lower for keyword in rule.keywords):
+            return rule.name
+    return "general"
+
+def synthetic_rules(count: int, rng: random.Random):
+    rules = []
+    for i in range(count):
+        keywords = [f"task{i}word{j}" for j in range(8)] + [f"phrase {i} {j}" for j in range(2)]
+        rules.append(TaskRule(f"class{i}", keywords, tier="large" if i % 2 else None))
+    return rules
+
+def make_prompt(size: int, keyword: str, rng: random.Random) -> str:
+    words = []
+    length = 0
+    while length < size:
+        word = rng.choice(FILLER)
+        words.append(word)
+        length += len(word) + 1
+    # Instruction at the end, where long prompts usually carry it
+    return " ".join(words)[:size] + " " + keyword
+
+def timed(fn, prompts, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for prompt in prompts:
+            fn(prompt)
+    return (time.perf_counter() - start) / (repeat * len(prompts))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 10_000, 100_000])
+    parser.add_argument("--rules", type=int, default=50, help="synthetic rule count")
+    parser.add_argument("--count", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", help="write JSON results to this file")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    results = []
+    for label, rules in (("default", DEFAULT_RULES), (f"{args.rules} rules", synthetic_rules(args.rules, rng))):
+        engine = RuleEngine(rules=rules)
+        # Match the last rule (worst case for a linear scan) or nothing at all
+        for keyword in (rules[-1].keywords[0].rstrip("*"), "nothing"):
+            for size in args.sizes:
+                prompts = [make_prompt(size, keyword, rng) for _ in range(args.count)]
+                assert all(engine.classify(p) == previous_classify(rules, p) for p in prompts)
+                previous = timed(lambda p: previous_classify(rules, p), prompts, args.repeat)
+                compiled = timed(engine.classify, prompts, args.repeat)
+                results.append({
+                    "rules": label,
+                    "match": keyword != "nothing",
+                    "size": size,
+                    "previous_us": round(previous * 1e6, 2),
+                    "compiled_us": round(compiled * 1e6, 2),
+                    "speedup": round(previous / compiled, 2) if compiled else None,
+                })
+
+    for r in results:
+        print(
+            f"{r['rules']:<10} {'hit ' if r['match'] else 'miss'} size={r['size']:>7}"
+            f"  previous {r['previous_us']:>10.2f}us  compiled {r['compiled_us']:>8.2f}us  ({r['speedup']}x)"
+        )
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+Speed and accuracy of token estimation: the previous full-regex heuristic,
+the current (sampled) heuristic, and an exact BPE tokenizer loaded from a
+local tiktoken-format vocab file.
+
+Besides synthetic prose, code and JSON, the "repo" kind cuts texts from a
+fixed corpus: this repository's README and package sources. The sampled
+heuristic's deviation from the full count is always reported; the error
+against exact BPE counts needs --vocab (e.g. a downloaded
+cl100k_base.tiktoken):
+
+    PYTHONPATH=. python benchmarks/bench_tokens.py --vocab vocab/cl100k_base.tiktoken
+"""
+import argparse
+import glob
+import json
+import os
+import random
+import re
+import time
+
+from aicog_v2.core.tokenizer import BPETokenizer
+from aicog_v2.core.utils import TokenEstimator
+
+_WORD = re.compile(r'\w+')
+
+PROSE = (
+    "the model returns a response with tokens and the cache stores it for the next request while "
+    "the router picks a provider based on latency cost and the size of the prompt"
+).split()
+CODE = [
+    "def handler(event, context):", "    return {'status': 200, 'body': json.dumps(data)}",
+    "for i in range(len(items)):", "    total += items[i].price * 1.08", "if not user.is_active:",
+    "    raise PermissionError(f\"user {user.id} disabled\")",
+]
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def repo_corpus() -> str:
+    paths = [os.path.join(ROOT, "README.md")] + sorted(glob.glob(os.path.join(ROOT, "aicog_v2", "**", "*.py"), recursive=True))
+    parts = []
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            parts.append(f.read())
+    return "\n".join(parts)
+
+def previous_estimate(text: str) -> int:
+    if not text:
+        return 0
+    return max(int(len(text) / 4), int(len(_WORD.findall(text)) * 1.3))
+
+def make_text(kind: str, size: int, rng: random.Random, corpus: str = "") -> str:
+    if kind == "repo":
+        while len(corpus) < size:
+            corpus += corpus
+        start = rng.randrange(len(corpus) - size + 1)
+        return corpus[start:start + size]
+    parts = []
+    length = 0
+    while length < size:
+        if kind == "prose":
+            part = " ".join(rng.choice(PROSE) for _ in range(12)) + ". "
+        elif kind == "code":
+            part = rng.choice(CODE) + "\n"
+        else:
+            part = json.dumps({"id": rng.randint(1, 10**6), "score": rng.random(), "tags": ["a", "b"]}) + "\n"
+        parts.append(part)
+        length += len(part)
+    return "".join(parts)[:size]
+
+def timed(fn, texts, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for text in texts:
+            fn(text)
+    return (time.perf_counter() - start) / (repeat * len(texts))
+
+def mean_error_pct(fn, texts, exact) -> float:
+    errors = [abs(fn(text) - n) / n for text, n in zip(texts, exact) if n]
+    return round(100 * sum(errors) / len(errors), 1)
+
+def bench(kind: str, size: int, count: int, repeat: int, tokenizer, rng: random.Random, corpus: str):
+    texts = [make_text(kind, size, rng, corpus) for _ in range(count)]
+    full = [previous_estimate(text) for text in texts]
+    result = {
+        "kind": kind,
+        "size": size,
+        "previous_us": round(timed(previous_estimate, texts, repeat) * 1e6, 2),
+        "heuristic_us": round(timed(TokenEstimator.heuristic, texts, repeat) * 1e6, 2),
+        # Sampled heuristic vs the same heuristic over the whole text
+        "sampling_error_pct": mean_error_pct(TokenEstimator.heuristic, texts, full),
+    }
+    if tokenizer is not None:
+        result["bpe_us"] = round(timed(tokenizer.count, texts, 1) * 1e6, 2)
+        TokenEstimator.use_tokenizer(tokenizer)
+        TokenEstimator.estimate_many(texts)
+        result["bpe_memoized_us"] = round(timed(TokenEstimator.estimate, texts, repeat) * 1e6, 2)
+        TokenEstimator.use_tokenizer(None)
+        exact = [tokenizer.count(text) for text in texts]
+        for name, fn in (("previous", previous_estimate), ("heuristic", TokenEstimator.heuristic)):
+            result[f"{name}_error_pct"] = mean_error_pct(fn, texts, exact)
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[200, 4000, 100_000])
+    parser.add_argument("--kinds", nargs="+", default=["prose", "code", "json", "repo"])
+    parser.add_argument("--count", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--vocab", help="tiktoken-format vocab file for exact counts")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", help="write JSON results to this file")
+    args = parser.parse_args()
+
+    tokenizer = BPETokenizer.from_file(args.vocab) if args.vocab else None
+    rng = random.Random(args.seed)
+    corpus = repo_corpus()
+    results = [
+        bench(kind, size, args.count, args.repeat, tokenizer, rng, corpus)
+        for kind in args.kinds for size in args.sizes
+    ]
+    for r in results:
+        line = (
+            f"{r['kind']:<6} size={r['size']:>7}  previous {r['previous_us']:>9.2f}us"
+            f"  heuristic {r['heuristic_us']:>8.2f}us (sampling error {r['sampling_error_pct']}%)"
+        )
+        if tokenizer is not None:
+            line += (
+                f"  bpe {r['bpe_us']:>10.2f}us (memoized {r['bpe_memoized_us']:.2f}us)"
+                f"  error previous {r['previous_error_pct']}% / heuristic {r['heuristic_error_pct']}%"
+            )
+        print(line)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+"""
+Fake providers and backend stand-ins for benchmarking the gateway offline.
+"""
+import time
+import random
+import asyncio
+from typing import Dict, Optional
+
+from aicog_v2.core.interfaces import AICache, AIProvider, AIResponse, AIStorage, StreamChunk
+from aicog_v2.cache.tiered_backend import MemoryCache
+
+class FakeRateLimitError(Exception):
+    """429 lookalike carrying a Retry-After header, like the SDKs' APIStatusError."""
+
+    def __init__(self, retry_after: float):
+        super().__init__("429 Too Many Requests")
+        self.status_code = 429
+        self.response = type("Response", (), {"headers": {"retry-after": str(retry_after)}})()
+
+class FakeProviderError(Exception):
+    pass
+
+class FakeProvider(AIProvider):
+    """
+    Simulated provider. Latency is drawn from `distribution`:
+      "constant"  -> always `latency`
+      "uniform"   -> uniform in [0, 2 * latency]
+      "lognormal" -> lognormal with median `latency` and shape `sigma`
+    `error_rate` and `rate_limit_rate` inject failures and 429s.
+    """
+
+    def __init__(
+        self,
+        name: str = "fake",
+        latency: float = 0.05,
+        distribution: str = "lognormal",
+        sigma: float = 0.5,
+        error_rate: float = 0.0,
+        rate_limit_rate: float = 0.0,
+        retry_after: float = 1.0,
+        output_tokens: int = 128,
+        seed: Optional[int] = None
+    ):
+        self.name = name
+        self.latency = latency
+        self.distribution = distribution
+        self.sigma = sigma
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+        self.output_tokens = output_tokens
+        self.rng = random.Random(seed)
+        self.calls = 0
+        self.busy_time = 0.0
+
+    def sample_latency(self) -> float:
+        if self.distribution == "constant":
+            return self.latency
+        if self.distribution == "uniform":
+            return self.rng.uniform(0, 2 * self.latency)
+        return self.rng.lognormvariate(0, self.sigma) * self.latency
+
+    async def _simulate(self) -> float:
+        self.calls += 1
+        delay = self.sample_latency()
+        await asyncio.sleep(delay)
+        self.busy_time += delay
+        roll = self.rng.random()
+        if roll < self.rate_limit_rate:
+            raise FakeRateLimitError(self.retry_after)
+        if roll < self.rate_limit_rate + self.error_rate:
+            raise FakeProviderError("simulated provider failure")
+        return delay
+
+    async def generate(self, prompt: str, model: str, system_prompt: Optional[str] = None, **kwargs) -> AIResponse:
+        delay = await self._simulate()
+        input_tokens = max(1, len(prompt) // 4)
+        return AIResponse(
+            content="x" * (self.output_tokens * 4),
+            model=model,
+            provider=self.name,
+            usage={
+                "input_tokens": input_tokens,
+                "output_tokens": self.output_tokens,
+                "total_tokens": input_tokens + self.output_tokens
+            },
+            latency=delay
+        )
+
+    async def stream(self, prompt: str, model: str, system_prompt: Optional[str] = None, **kwargs):
+        response = await self.generate(prompt, model, system_prompt, **kwargs)
+        for start in range(0, len(response.content), 16):
+            yield StreamChunk(content=response.content[start:start + 16])
+        yield StreamChunk(usage=response.usage, finish_reason="stop")
+
+def make_cache(kind: str) -> Optional[AICache]:
+    """
+    "memory" -> in-process MemoryCache; "fakeredis" -> RedisCache over fakeredis
+    (falls back to memory when fakeredis is not installed); "none" -> no cache.
+    """
+    if kind == "none":
+        return None
+    if kind == "fakeredis":
+        try:
+            import fakeredis
+            from aicog_v2.cache.redis_backend import RedisCache
+            return RedisCache(client=fakeredis.FakeAsyncRedis(decode_responses=True))
+        except ImportError:
+            pass
+    return MemoryCache(max_entries=1_000_000, max_bytes=1 << 32)
+
+class TimedCache(AICache):
+    """Wraps a cache and accumulates time spent in it."""
+
+    def __init__(self, inner: AICache):
+        self.inner = inner
+        self.time: Dict[str, float] = {"get": 0.0, "set": 0.0}
+
+    async def get(self, key):
+        start = time.perf_counter()
+        try:
+            return await self.inner.get(key)
+        finally:
+            self.time["get"] += time.perf_counter() - start
+
+    async def set(self, key, value, ttl=3600):
+        start = time.perf_counter()
+        try:
+            return await self.inner.set(key, value, ttl)
+        finally:
+            self.time["set"] += time.perf_counter() - start
+
+    async def get_many(self, keys):
+        start = time.perf_counter()
+        try:
+            return await self.inner.get_many(keys)
+        finally:
+            self.time["get"] += time.perf_counter() - start
+
+class TimedStorage(AIStorage):
+    """Wraps a storage backend and accumulates time spent in log_request."""
+
+    def __init__(self, inner: AIStorage):
+        self.inner = inner
+        self.time = 0.0
+
+    async def log_request(self, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return await self.inner.log_request(*args, **kwargs)
+        finally:
+            self.time += time.perf_counter() - start
+
+    async def flush(self):
+        await self.inner.flush()
+
+    async def close(self):
+        await self.inner.close()
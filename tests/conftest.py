@@ -0,0 +1,72 @@
+import time
+import asyncio
+import sqlite3
+import pytest
+from aicog_v2.client import AiCogClient
+from aicog_v2.core.interfaces import AICache, AIProvider, AIResponse
+
+class FakeProvider(AIProvider):
+    def __init__(self, delay: float = 0.01, fail: bool = False):
+        self.delay = delay
+        self.fail = fail
+        self.calls = 0
+
+    async def generate(self, prompt, model, system_prompt=None, **kwargs):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("provider down")
+        return AIResponse(
+            content=f"echo: {prompt}",
+            model=model,
+            provider="fake",
+            usage={"input_tokens": 3, "output_tokens": 5, "total_tokens": 8},
+            latency=self.delay
+        )
+
+class DictCache(AICache):
+    def __init__(self):
+        self.data = {}
+        self.gets = 0
+
+    async def get(self, key):
+        self.gets += 1
+        return self.data.get(key)
+
+    async def set(self, key, value, ttl=3600):
+        self.data[key] = value
+
+class TTLCache(DictCache):
+    def __init__(self):
+        super().__init__()
+        self.ttls = {}
+
+    async def set(self, key, value, ttl=3600):
+        self.data[key] = value
+        self.ttls[key] = ttl
+
+def baseline_audit_db(path, count):
+    """An audit log in the original schema, before any column was added."""
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE requests (id INTEGER PRIMARY KEY AUTOINCREMENT, timestamp REAL, provider TEXT, "
+                 "model TEXT, prompt TEXT, response TEXT, latency REAL, input_tokens INTEGER, "
+                 "output_tokens INTEGER, total_tokens INTEGER)")
+    conn.executemany(
+        "INSERT INTO requests (timestamp, provider, model, prompt, response, latency, input_tokens, "
+        "output_tokens, total_tokens) VALUES (?, 'groq', 'llama-3.1-8b-instant', ?, ?, 0.01, 10, 20, 30)",
+        [(time.time() - count + i, f"prompt {i}", f"answer {i}") for i in range(count)]
+    )
+    conn.commit()
+    conn.close()
+    return path
+
+@pytest.fixture
+def make_client():
+    """
+    Factory for an AiCogClient serving `provider` under the name "fake";
+    extra keyword arguments go to the client.
+    """
+    def make(provider, cache=None, **options):
+        return AiCogClient(providers={"fake": provider}, cache=cache, default_provider="fake", **options)
+
+    return make
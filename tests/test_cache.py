@@ -0,0 +1,114 @@
+import asyncio
+import fakeredis
+from aicog_v2.cache.redis_backend import RedisCache
+from aicog_v2.cache.tiered_backend import MemoryCache, TieredCache
+from conftest import DictCache, FakeProvider
+
+def test_memory_cache_lru_eviction_by_entries():
+    cache = MemoryCache(max_entries=2)
+
+    async def run():
+        await cache.set("a", "1")
+        await cache.set("b", "2")
+        await cache.get("a")  # "b" becomes least recently used
+        await cache.set("c", "3")
+        return await cache.get("a"), await cache.get("b")
+
+    assert asyncio.run(run()) == ("1", None)
+    assert cache.evictions == 1
+
+def test_memory_cache_evicts_by_bytes():
+    cache = MemoryCache(max_bytes=20)
+
+    async def run():
+        await cache.set("a", "x" * 9)
+        await cache.set("b", "y" * 9)
+        await cache.set("c", "z" * 9)
+
+    asyncio.run(run())
+    assert len(cache) == 2
+    assert cache.current_bytes <= 20
+
+def test_memory_cache_ttl_expiry():
+    cache = MemoryCache()
+
+    async def run():
+        await cache.set("a", "1", ttl=0)
+        return await cache.get("a")
+
+    assert asyncio.run(run()) is None
+    assert cache.expirations == 1
+
+def test_empty_memory_cache_is_used_by_the_client(make_client):
+    provider = FakeProvider()
+    cache = MemoryCache()
+    client = make_client(provider, cache)
+    # Empty, hence falsy like any sized container; the client must still use it
+    assert not cache
+
+    async def run():
+        await client.generate("hello", model="m1")
+        return await client.generate("hello", model="m1")
+
+    assert asyncio.run(run()).cached
+    assert provider.calls == 1 and len(cache) == 1
+
+def test_tiered_cache_promotes_remote_hits():
+    remote = DictCache()
+    remote.data["k"] = "v"
+    cache = TieredCache(remote=remote)
+
+    async def run():
+        return await cache.get("k"), await cache.get("k")
+
+    assert asyncio.run(run()) == ("v", "v")
+    assert remote.gets == 1
+    assert cache.stats["local"]["hits"] == 1
+    assert cache.stats["remote"]["hits"] == 1
+
+def test_tiered_cache_writes_through():
+    remote = DictCache()
+    cache = TieredCache(remote=remote)
+    asyncio.run(cache.set("k", "v"))
+    assert remote.data["k"] == "v"
+    assert len(cache.local) == 1
+
+def test_default_get_many_and_set_many():
+    cache = DictCache()
+
+    async def run():
+        await cache.set_many({"a": "1", "b": "2"})
+        return await cache.get_many(["a", "missing", "b"])
+
+    assert asyncio.run(run()) == ["1", None, "2"]
+
+def test_tiered_cache_get_many_only_fetches_local_misses():
+    remote = DictCache()
+    remote.data.update({"a": "1", "b": "2"})
+    cache = TieredCache(remote=remote)
+
+    async def run():
+        await cache.get("a")
+        remote.gets = 0
+        return await cache.get_many(["a", "b", "c"])
+
+    assert asyncio.run(run()) == ["1", "2", None]
+    # "a" served locally, "b" and "c" via the default per-key remote lookup
+    assert remote.gets == 2
+    assert cache.stats["remote"] == {"hits": 2, "misses": 1}
+
+def test_promoted_entries_keep_the_remote_expiry():
+    # cache_ttl=5 written by another process, local_ttl=300 here
+    for remote in (MemoryCache(), RedisCache(client=fakeredis.FakeAsyncRedis(decode_responses=True))):
+        cache = TieredCache(remote=remote, local_ttl=300)
+
+        async def run():
+            await remote.set_many({"a": "1", "b": "2"}, ttl=5)
+            await remote.set("forever", "3", ttl=3600)
+            await cache.get("a")
+            await cache.get_many(["b", "forever"])
+            return [(await cache.local.get_with_ttl(key))[1] for key in ("a", "b", "forever")]
+
+        a, b, forever = asyncio.run(run())
+        assert 0 < a <= 5 and 0 < b <= 5
+        assert 5 < forever <= 300
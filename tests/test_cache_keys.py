@@ -0,0 +1,82 @@
+import asyncio
+import pytest
+from aicog_v2.cache.keys import CacheKeyBuilder
+from aicog_v2.cache.tiered_backend import MemoryCache, TieredCache
+from conftest import FakeProvider, DictCache, TTLCache
+
+def test_generation_kwargs_change_the_key():
+    builder = CacheKeyBuilder()
+    base = builder.build("hi", "m", "fake")
+    assert builder.build("hi", "m", "fake", params={"max_tokens": 10}) != base
+    assert builder.build("hi", "m", "other") != base
+    assert builder.build("hi", "m", "fake", params={"timeout": 5, "user": "u1"}) == base
+    assert base.startswith("aicog:v1:")
+
+def test_equivalent_kwargs_share_a_key():
+    builder = CacheKeyBuilder()
+    assert (
+        builder.build("hi", "m", "fake", params={"temperature": 0, "stop": {"a", "b"}})
+        == builder.build("hi", "m", "fake", params={"stop": {"b", "a"}, "temperature": 0.0})
+    )
+
+def test_allowlist_limits_the_key():
+    builder = CacheKeyBuilder(allow={"max_tokens"})
+    assert builder.build("hi", "m", "fake", params={"top_p": 0.5}) == builder.build("hi", "m", "fake")
+
+def test_sampled_calls_bypass_the_cache_unless_forced(make_client):
+    provider = FakeProvider(delay=0)
+    cache = DictCache()
+    client = make_client(provider, cache)
+
+    async def run():
+        await client.generate("hi", model="m", temperature=0.7)
+        await client.generate("hi", model="m", temperature=0.7)
+        assert provider.calls == 2 and not cache.data
+        await client.generate("hi", model="m", temperature=0.7, seed=1)
+        await client.generate("hi", model="m", temperature=0.7, force_cache=True)
+        return await client.generate("hi", model="m", temperature=0.7, force_cache=True)
+
+    response = asyncio.run(run())
+    assert response.cached
+    assert provider.calls == 4
+    assert len(cache.data) == 2
+
+def test_cache_ttl_is_passed_through(make_client):
+    cache = TTLCache()
+    client = make_client(FakeProvider(delay=0), cache)
+    client.cache_policy.ttl = 60
+
+    async def run():
+        await client.generate("a", model="m")
+        await client.generate("b", model="m", cache_ttl=5)
+
+    asyncio.run(run())
+    assert sorted(cache.ttls.values()) == [5, 60]
+
+def test_version_bump_and_prefix_invalidation(make_client):
+    provider = FakeProvider(delay=0)
+    cache = TieredCache(remote=MemoryCache())
+    builder = CacheKeyBuilder(namespace="app")
+    client = make_client(provider, cache, key_builder=builder)
+
+    async def run():
+        await client.generate("hi", model="m")
+        await client.generate("hi", model="m")
+        assert provider.calls == 1
+        builder.version = 2
+        await client.generate("hi", model="m")
+        assert provider.calls == 2
+        assert await client.invalidate_cache() == 1
+        await client.generate("hi", model="m")
+        assert provider.calls == 3
+        assert len(cache.remote) == 2
+
+    asyncio.run(run())
+
+def test_invalidation_needs_prefix_deletion(make_client):
+    assert MemoryCache.supports_delete_prefix and not DictCache.supports_delete_prefix
+    assert not TieredCache(remote=DictCache()).supports_delete_prefix
+    client = make_client(FakeProvider(delay=0), DictCache())
+
+    with pytest.raises(NotImplementedError, match="key_builder.version"):
+        asyncio.run(client.invalidate_cache())
@@ -0,0 +1,130 @@
+import asyncio
+import json
+import time
+import pytest
+from aicog_v2.cache.policy import CachePolicy, RefreshScheduler
+from aicog_v2.cache.semantic import SemanticCache
+from conftest import FakeProvider, TTLCache
+
+def expire_all(cache):
+    for key, value in cache.data.items():
+        data = json.loads(value)
+        data["fresh_until"] = time.time() - 1
+        cache.data[key] = json.dumps(data)
+
+def test_ttl_by_task_category_and_caller(make_client):
+    cache = TTLCache()
+    policy = CachePolicy(ttl=600, task_ttls={"extraction": 86400})
+    client = make_client(FakeProvider(delay=0), cache, cache_policy=policy)
+
+    async def run():
+        await client.generate("extract the dates as json", model="m")
+        await client.generate("hello there", model="m")
+        await client.generate("hello again", model="m", cache_ttl=5)
+
+    asyncio.run(run())
+    assert sorted(cache.ttls.values()) == [5, 600, 86400]
+
+def test_invalid_caller_ttl_is_rejected_before_the_call(make_client):
+    policy = CachePolicy(ttl=600)
+    assert policy.ttl_for(override=None) == 600
+    for bad in (-1, -5, 1.5):
+        with pytest.raises(ValueError, match="cache_ttl"):
+            policy.ttl_for(override=bad)
+    provider = FakeProvider(delay=0)
+    client = make_client(provider, TTLCache(), cache_policy=policy)
+
+    with pytest.raises(ValueError, match="cache_ttl"):
+        asyncio.run(client.generate("hi", model="m", cache_ttl=-1))
+    assert provider.calls == 0
+
+def test_zero_caller_ttl_skips_the_cache_write(make_client):
+    cache = TTLCache()
+    provider = FakeProvider(delay=0)
+    client = make_client(provider, cache, semantic_cache=SemanticCache())
+
+    async def run():
+        await client.generate("hi", model="m", cache_ttl=0)
+        await client.stream("hi", model="m", cache_ttl=0).collect()
+        await client.generate_many(["hi"], model="m", cache_ttl=0)
+
+    asyncio.run(run())
+    assert provider.calls == 3
+    assert cache.data == {}
+    assert len(client.semantic_cache.index) == 0
+
+def test_stale_entry_is_served_and_refreshed_once(make_client):
+    provider = FakeProvider(delay=0.05)
+    cache = TTLCache()
+    client = make_client(provider, cache, cache_policy=CachePolicy(ttl=60, stale_ttl=300))
+
+    async def run():
+        first = await client.generate("hi", model="m")
+        assert list(cache.ttls.values()) == [360]
+        expire_all(cache)
+        start = time.perf_counter()
+        stale = await asyncio.gather(*[client.generate("hi", model="m") for _ in range(5)])
+        elapsed = time.perf_counter() - start
+        await client.refresher.drain()
+        return first, stale, elapsed
+
+    first, stale, elapsed = asyncio.run(run())
+    assert not first.cached and all(r.cached for r in stale)
+    assert elapsed < 0.05
+    assert provider.calls == 2
+    assert client.refresher.scheduled == 1 and client.refresher.deduplicated == 4
+    assert json.loads(next(iter(cache.data.values())))["fresh_until"] > time.time()
+
+def test_refreshes_are_bounded():
+    scheduler = RefreshScheduler(max_concurrent=2, max_pending=3)
+    running = 0
+    peak = 0
+
+    async def refresh():
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+
+    async def run():
+        results = [scheduler.schedule(f"k{i}", refresh) for i in range(5)]
+        await scheduler.drain()
+        return results
+
+    assert asyncio.run(run()) == [True, True, True, False, False]
+    assert peak == 2 and scheduler.dropped == 2
+
+def test_failed_refresh_keeps_serving_stale(make_client):
+    provider = FakeProvider(delay=0)
+    cache = TTLCache()
+    client = make_client(provider, cache, cache_policy=CachePolicy(ttl=60, stale_ttl=300))
+
+    async def run():
+        await client.generate("hi", model="m")
+        expire_all(cache)
+        provider.fail = True
+        response = await client.generate("hi", model="m")
+        await client.refresher.drain()
+        return response
+
+    assert asyncio.run(run()).content == "echo: hi"
+    assert client.refresher.failed == 1
+
+def test_stale_near_duplicate_is_refreshed(make_client):
+    provider = FakeProvider(delay=0)
+    cache = TTLCache()
+    client = make_client(
+        provider, cache, cache_policy=CachePolicy(ttl=60, stale_ttl=300), semantic_cache=SemanticCache()
+    )
+
+    async def run():
+        await client.generate("What is the capital of France?", model="m")
+        expire_all(cache)
+        response = await client.generate("what is the capital of france", model="m")
+        await client.refresher.drain()
+        return response
+
+    assert asyncio.run(run()).cached
+    assert client.refresher.scheduled == 1 and provider.calls == 2
+    assert json.loads(next(iter(cache.data.values())))["fresh_until"] > time.time()
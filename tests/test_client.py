@@ -0,0 +1,229 @@
+import asyncio
+from aicog_v2.client import AiCogClient
+from aicog_v2.core.interfaces import StreamChunk
+from aicog_v2.core.metrics import GatewayMetrics
+from aicog_v2.core.ratelimit import RateLimit, RateLimiter
+from aicog_v2.core.resilience import ResiliencePolicy
+from conftest import FakeProvider, DictCache
+
+def test_concurrent_identical_requests_are_coalesced(make_client):
+    provider = FakeProvider()
+    client = make_client(provider, DictCache())
+
+    async def run():
+        return await asyncio.gather(*[client.generate("hi", model="m") for _ in range(10)])
+
+    results = asyncio.run(run())
+    assert provider.calls == 1
+    assert client.coalescer.coalesced == 9
+    assert sum(not r.cached for r in results) == 1
+    assert all(r.content == "echo: hi" for r in results)
+
+def test_distinct_requests_are_not_coalesced(make_client):
+    provider = FakeProvider()
+    client = make_client(provider, DictCache())
+
+    async def run():
+        await asyncio.gather(client.generate("a", model="m"), client.generate("b", model="m"))
+
+    asyncio.run(run())
+    assert provider.calls == 2
+    assert client.coalescer.coalesced == 0
+
+def test_leader_error_propagates_to_followers(make_client):
+    provider = FakeProvider(fail=True)
+    client = make_client(provider, DictCache())
+
+    async def run():
+        return await asyncio.gather(
+            *[client.generate("hi", model="m") for _ in range(3)],
+            return_exceptions=True
+        )
+
+    results = asyncio.run(run())
+    assert provider.calls == 1
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert client.coalescer.inflight == 0
+
+def test_use_cache_false_bypasses_coalescing(make_client):
+    provider = FakeProvider()
+    client = make_client(provider, DictCache())
+
+    async def run():
+        await asyncio.gather(*[client.generate("hi", model="m", use_cache=False) for _ in range(3)])
+
+    asyncio.run(run())
+    assert provider.calls == 3
+
+class ConcurrencyProbe(FakeProvider):
+    def __init__(self, delay=0.01):
+        super().__init__(delay)
+        self.active = 0
+        self.peak = 0
+
+    async def generate(self, prompt, model, system_prompt=None, **kwargs):
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            if prompt == "boom":
+                raise RuntimeError("bad item")
+            return await super().generate(prompt, model, system_prompt, **kwargs)
+        finally:
+            self.active -= 1
+
+def test_generate_many_bounds_concurrency_and_isolates_errors(make_client):
+    provider = ConcurrencyProbe()
+    client = make_client(provider, DictCache())
+    prompts = [f"p{i}" for i in range(20)] + ["boom"]
+
+    results = asyncio.run(client.generate_many(prompts, model="m", max_concurrency=3))
+    assert provider.peak <= 3
+    assert isinstance(results[-1], RuntimeError)
+    assert [r.content for r in results[:-1]] == [f"echo: p{i}" for i in range(20)]
+
+def test_generate_many_serves_cache_hits_without_provider_calls(make_client):
+    provider = FakeProvider()
+    client = make_client(provider, DictCache())
+
+    async def run():
+        await client.generate("p1", model="m")
+        return await client.generate_many(["p1", "p2"], model="m")
+
+    results = asyncio.run(run())
+    assert provider.calls == 2
+    assert results[0].cached and not results[1].cached
+
+def test_iter_generate_many_ordered(make_client):
+    provider = FakeProvider()
+    client = make_client(provider)
+
+    async def run():
+        return [i async for i, _ in client.iter_generate_many(["a", "b", "c"], model="m", ordered=True)]
+
+    assert asyncio.run(run()) == [0, 1, 2]
+
+class StreamingProvider(FakeProvider):
+    async def stream(self, prompt, model, system_prompt=None, **kwargs):
+        self.calls += 1
+        for word in ["Hello", " ", "world"]:
+            await asyncio.sleep(0)
+            yield StreamChunk(content=word)
+        yield StreamChunk(usage={"input_tokens": 1, "output_tokens": 2, "total_tokens": 3}, finish_reason="stop")
+
+def test_stream_tees_into_cache_and_replays_hits(make_client):
+    provider = StreamingProvider()
+    client = make_client(provider, DictCache())
+
+    async def run():
+        first = client.stream("hi", model="m")
+        live = [chunk.content async for chunk in first]
+        second = client.stream("hi", model="m")
+        replayed = await second.collect()
+        return live, first.response, replayed
+
+    live, response, replayed = asyncio.run(run())
+    assert "".join(live) == "Hello world"
+    assert response.usage["total_tokens"] == 3
+    assert response.first_token_latency is not None
+    assert replayed.cached and replayed.content == "Hello world"
+    assert provider.calls == 1
+
+def test_stream_falls_back_for_non_streaming_providers(make_client):
+    provider = FakeProvider()
+    client = make_client(provider)
+    response = asyncio.run(client.stream("hi", model="m").collect())
+    assert response.content == "echo: hi"
+    assert response.usage["total_tokens"] == 8
+
+class BrokenStreamProvider(StreamingProvider):
+    async def stream(self, prompt, model, system_prompt=None, **kwargs):
+        self.calls += 1
+        raise RuntimeError("provider down")
+        yield
+
+class ClosingStreamProvider(StreamingProvider):
+    closed = False
+
+    async def stream(self, prompt, model, system_prompt=None, **kwargs):
+        try:
+            async for chunk in super().stream(prompt, model, system_prompt, **kwargs):
+                yield chunk
+        finally:
+            self.closed = True
+
+class RecordingLimiter(RateLimiter):
+    def __init__(self):
+        super().__init__({"fake": RateLimit(rpm=1000)})
+        self.settled = []
+
+    def reconcile(self, provider, model, reserved, actual):
+        self.settled.append(actual)
+        super().reconcile(provider, model, reserved, actual)
+
+def test_stream_fails_over_to_the_fallback_route():
+    primary, backup = BrokenStreamProvider(), StreamingProvider()
+    client = AiCogClient(
+        providers={"fake": primary, "backup": backup}, default_provider="fake",
+        resilience=ResiliencePolicy(fallbacks=[("backup", "m2")])
+    )
+    response = asyncio.run(client.stream("hi", model="m").collect())
+    assert response.content == "Hello world"
+    assert (response.provider, response.model) == ("backup", "m2")
+    assert primary.calls == backup.calls == 1
+    assert client.resilience.breaker("fake").consecutive_failures == 1
+
+def test_abandoned_stream_is_closed_and_settled(make_client):
+    provider = ClosingStreamProvider()
+    limiter = RecordingLimiter()
+    client = make_client(provider, DictCache(), rate_limiter=limiter, metrics=GatewayMetrics())
+
+    async def run():
+        stream = client.stream("hi", model="m")
+        first = await stream.__anext__()
+        await stream.aclose()
+        return first
+
+    assert asyncio.run(run()).content == "Hello"
+    assert provider.closed
+    assert len(limiter.settled) == 1 and limiter.settled[0] > 0
+    assert client.metrics.request_seconds.count("fake", "m", "abandoned") == 1
+    # A partial answer is never cached
+    assert client.cache.data == {}
+
+def test_cached_fallback_answer_names_the_route_that_answered():
+    client = AiCogClient(
+        providers={"fake": FakeProvider(fail=True), "backup": FakeProvider()}, cache=DictCache(),
+        default_provider="fake", resilience=ResiliencePolicy(fallbacks=[("backup", "m2")])
+    )
+
+    async def run():
+        live = await client.generate("hi", model="m")
+        return live, await client.generate("hi", model="m")
+
+    live, hit = asyncio.run(run())
+    assert live.model == "m2"
+    assert hit.cached and (hit.provider, hit.model) == ("backup", "m2")
+
+class ConcurrencyProvider(FakeProvider):
+    def __init__(self):
+        super().__init__(delay=0.01)
+        self.active = self.peak = 0
+
+    async def generate(self, prompt, model, system_prompt=None, **kwargs):
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            return await super().generate(prompt, model, system_prompt, **kwargs)
+        finally:
+            self.active -= 1
+
+def test_batch_concurrency_limit_spans_a_providers_models(make_client):
+    provider = ConcurrencyProvider()
+    client = make_client(provider)
+    client.router.route = lambda prompt, tokens, available=None: ("fake", prompt[0])
+
+    async def run():
+        return await client.generate_many(["a1", "b1", "a2", "b2"], concurrency_limits={"fake": 1})
+
+    assert all(r.content.startswith("echo") for r in asyncio.run(run()))
+    assert provider.peak == 1
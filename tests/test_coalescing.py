@@ -0,0 +1,119 @@
+import asyncio
+import pytest
+from aicog_v2.core.coalescing import RedisRequestCoalescer, RequestCoalescer
+
+def test_cancelled_leader_does_not_fail_followers():
+    coalescer = RequestCoalescer()
+    calls = 0
+
+    async def work():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return "done"
+
+    async def run():
+        leader = asyncio.ensure_future(coalescer.run("k", work))
+        await asyncio.sleep(0)
+        followers = [asyncio.ensure_future(coalescer.run("k", work)) for _ in range(3)]
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        results = await asyncio.gather(*followers)
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return results
+
+    assert asyncio.run(run()) == [("done", False)] * 3
+    assert calls == 1
+    assert coalescer.inflight == 0
+
+def test_work_is_cancelled_once_nobody_waits():
+    coalescer = RequestCoalescer()
+
+    async def run():
+        stopped = asyncio.Event()
+
+        async def work():
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                stopped.set()
+                raise
+
+        callers = [asyncio.ensure_future(coalescer.run("k", work)) for _ in range(2)]
+        await asyncio.sleep(0.01)
+        for caller in callers:
+            caller.cancel()
+        await asyncio.wait_for(stopped.wait(), timeout=1)
+
+    asyncio.run(run())
+    assert coalescer.inflight == 0
+
+def test_errors_reach_every_waiter():
+    coalescer = RequestCoalescer()
+
+    async def work():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("provider down")
+
+    async def run():
+        return await asyncio.gather(*[coalescer.run("k", work) for _ in range(3)], return_exceptions=True)
+
+    results = asyncio.run(run())
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert coalescer.leaders == 1
+
+def test_redis_coalescer_reuses_another_process_result():
+    fakeredis = pytest.importorskip("fakeredis")
+    server = fakeredis.FakeServer()
+    published = {}
+    calls = []
+
+    def process(name):
+        return RedisRequestCoalescer(
+            fakeredis.FakeAsyncRedis(server=server), poll_interval=0.01, wait_timeout=1
+        ), name
+
+    async def work(name):
+        calls.append(name)
+        await asyncio.sleep(0.05)
+        published["k"] = f"from {name}"
+        return published["k"]
+
+    async def wait_for():
+        return published.get("k")
+
+    async def run():
+        (first, a), (second, b) = process("a"), process("b")
+        results = await asyncio.gather(
+            first.run("k", lambda: work(a), wait_for),
+            second.run("k", lambda: work(b), wait_for),
+        )
+        lock_left = await first.client.exists("aicog:lock:k")
+        return results, second.remote_coalesced, lock_left
+
+    results, remote_coalesced, lock_left = asyncio.run(run())
+    assert results == [("from a", True), ("from a", True)]
+    assert calls == ["a"]
+    assert remote_coalesced == 1
+    assert not lock_left
+
+def test_redis_coalescer_does_the_work_when_holder_publishes_nothing():
+    fakeredis = pytest.importorskip("fakeredis")
+    client = fakeredis.FakeAsyncRedis()
+    coalescer = RedisRequestCoalescer(client, poll_interval=0.01, wait_timeout=1)
+
+    async def run():
+        # Lock held by a process that dies without publishing
+        await client.set("aicog:lock:k", "other", px=50)
+
+        async def wait_for():
+            return None
+
+        async def work():
+            return "local"
+
+        return await coalescer.run("k", work, wait_for)
+
+    assert asyncio.run(run()) == ("local", True)
+    assert coalescer.remote_coalesced == 0
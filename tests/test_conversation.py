@@ -0,0 +1,86 @@
+import asyncio
+from aicog_v2.core.conversation import Conversation
+from aicog_v2.core.interfaces import build_messages
+from conftest import FakeProvider, DictCache
+
+class HistoryProvider(FakeProvider):
+    def __init__(self):
+        super().__init__(delay=0)
+        self.seen = []
+
+    async def generate(self, prompt, model, system_prompt=None, messages=None, **kwargs):
+        self.seen.append(build_messages(prompt, system_prompt, messages))
+        return await super().generate(prompt, model, system_prompt, **kwargs)
+
+def test_prefix_keys_are_rolling_and_content_addressed():
+    conversation = Conversation()
+    conversation.append("user", "hi")
+    first = conversation.key
+    conversation.append("assistant", "hello")
+    assert conversation.key_at(1) == first
+    assert conversation.key != first
+    assert Conversation(conversation.messages).prefix_keys == conversation.prefix_keys
+    assert Conversation([{"role": "user", "content": "hello"}]).key != first
+    assert conversation.tokens > conversation.prefix_tokens[0] > 0
+
+def test_chat_sends_history_and_appends_turns(make_client):
+    provider = HistoryProvider()
+    client = make_client(provider, DictCache())
+    conversation = Conversation()
+
+    async def run():
+        await client.chat(conversation, "What is Redis?", model="m", system_prompt="be brief")
+        await client.chat(conversation, "How does it persist?", model="m", system_prompt="be brief")
+
+    asyncio.run(run())
+    assert len(conversation) == 4
+    assert provider.seen[-1] == [
+        {"role": "system", "content": "be brief"},
+        {"role": "user", "content": "What is Redis?"},
+        {"role": "assistant", "content": "echo: What is Redis?"},
+        {"role": "user", "content": "How does it persist?"},
+    ]
+
+def test_cache_is_keyed_by_conversation_prefix(make_client):
+    provider = HistoryProvider()
+    client = make_client(provider, DictCache())
+    history_a = [{"role": "user", "content": "Tell me about Redis"}, {"role": "assistant", "content": "It is a store."}]
+    history_b = [{"role": "user", "content": "Tell me about SQLite"}, {"role": "assistant", "content": "It is a store."}]
+
+    async def run():
+        first = await client.generate("Go on", model="m", messages=history_a)
+        same_prefix = await client.generate("Go on", model="m", messages=Conversation(history_a))
+        other_prefix = await client.generate("Go on", model="m", messages=history_b)
+        no_history = await client.generate("Go on", model="m")
+        return first, same_prefix, other_prefix, no_history
+
+    first, same_prefix, other_prefix, no_history = asyncio.run(run())
+    assert not first.cached and same_prefix.cached
+    assert not other_prefix.cached and not no_history.cached
+    assert provider.calls == 3
+
+def test_tool_messages_keep_their_fields(make_client):
+    provider = HistoryProvider()
+    client = make_client(provider, DictCache())
+    call = {"id": "call_1", "type": "function", "function": {"name": "lookup", "arguments": '{"q": "redis"}'}}
+    history = [
+        {"role": "user", "content": "Look up Redis"},
+        {"role": "assistant", "content": None, "tool_calls": [call]},
+        {"role": "tool", "tool_call_id": "call_1", "name": "lookup", "content": "in-memory store"},
+    ]
+    other_call = dict(call, function={"name": "lookup", "arguments": '{"q": "sqlite"}'})
+    other = [history[0], dict(history[1], tool_calls=[other_call]), history[2]]
+
+    async def run():
+        first = await client.generate("Summarize", model="m", messages=history)
+        second = await client.generate("Summarize", model="m", messages=other)
+        return first, second
+
+    first, second = asyncio.run(run())
+    assert provider.seen[0][:3] == history
+    # Differing only in tool call arguments is a different prefix
+    assert not first.cached and not second.cached
+    conversation = Conversation(history)
+    assert conversation.tokens >= 3 * 4
+    # Field order within a message does not change the key
+    assert Conversation([dict(reversed(list(m.items()))) for m in history]).key == conversation.key
@@ -0,0 +1,61 @@
+import asyncio
+import pytest
+from aicog_v2.storage.sqlite_backend import SQLiteStorage
+from aicog_v2.storage.export import export_audit_log, main, read_state
+from conftest import baseline_audit_db
+
+pa = pytest.importorskip("pyarrow")
+import pyarrow.parquet as pq
+import pyarrow.ipc as ipc
+
+USAGE = {"input_tokens": 1, "output_tokens": 2, "total_tokens": 3}
+
+def fill(storage, start, count):
+    async def run():
+        await storage.init_db()
+        for i in range(start, start + count):
+            await storage.log_request("groq", "llama-3.1-8b-instant", f"prompt {i}", f"answer {i}", 0.1, USAGE)
+    asyncio.run(run())
+
+def test_incremental_parquet_export(tmp_path):
+    storage = SQLiteStorage(str(tmp_path / "audit.db"), dedup=True)
+    out = str(tmp_path / "out")
+    fill(storage, 0, 25)
+
+    first = asyncio.run(export_audit_log(storage, out, chunk_size=10))
+    assert (first["rows"], first["first_id"], first["last_id"]) == (25, 1, 25)
+    table = pq.read_table(first["path"])
+    assert table.num_rows == 25
+    assert table.column("prompt").to_pylist()[3] == "prompt 3"
+    assert table.column("estimated_cost")[0].as_py() > 0
+
+    assert asyncio.run(export_audit_log(storage, out))["path"] is None
+
+    fill(storage, 25, 5)
+    second = asyncio.run(export_audit_log(storage, out))
+    assert (second["rows"], second["first_id"]) == (5, 26)
+    assert read_state(out)["last_id"] == 30
+    assert pq.read_table(out, schema=table.schema).num_rows == 30
+
+def test_cli_exports_arrow_without_bodies(tmp_path, capsys):
+    db_path = str(tmp_path / "audit.db")
+    fill(SQLiteStorage(db_path), 0, 3)
+    out = str(tmp_path / "out")
+
+    main([db_path, out, "--format", "arrow", "--no-bodies"])
+    assert "Exported 3 rows" in capsys.readouterr().out
+    path = out + "/audit-000000000001-000000000003.arrow"
+    with pa.OSFile(path) as source:
+        table = ipc.open_file(source).read_all()
+    assert table.num_rows == 3
+    assert "prompt" not in table.column_names
+
+def test_exports_a_log_from_before_the_new_columns(tmp_path, capsys):
+    db_path = baseline_audit_db(str(tmp_path / "old.db"), 4)
+    out = str(tmp_path / "out")
+
+    main([db_path, out])
+    assert "Exported 4 rows" in capsys.readouterr().out
+    table = pq.read_table(out + "/audit-000000000001-000000000004.parquet")
+    assert table.column("prompt").to_pylist() == [f"prompt {i}" for i in range(4)]
+    assert table.column("first_token_latency").null_count == 4
@@ -0,0 +1,105 @@
+import json
+import copy
+import pickle
+import asyncio
+from aicog_v2 import configure_pricing
+from aicog_v2.core import interfaces
+from aicog_v2.core.interfaces import AIResponse
+from aicog_v2.core import fastpath
+from aicog_v2.core.fastpath import ResponseData, build_response, copy_response, json_dumps, json_loads
+from conftest import FakeProvider, DictCache
+
+USAGE = {"input_tokens": 1000, "output_tokens": 2000, "total_tokens": 3000}
+
+def test_build_response_matches_validated_model():
+    fast = build_response("hi", "gpt-4o", "openai", USAGE, 0.5, first_token_latency=0.1)
+    validated = AIResponse(
+        content="hi", model="gpt-4o", provider="openai", usage=USAGE, latency=0.5, first_token_latency=0.1
+    )
+    assert fast == validated
+    assert fast.model_dump() == validated.model_dump()
+    assert json.loads(fast.model_dump_json()) == validated.model_dump()
+    assert fast.estimated_cost == validated.estimated_cost
+
+def test_unvalidated_responses_behave_like_pydantic_models():
+    # Pins the pydantic internals _wrap relies on: if an upgrade changes the
+    # model layout, this fails instead of the fast path breaking silently
+    assert fastpath._FAST_WRAP
+    fast = build_response("hi", "gpt-4o", "openai", dict(USAGE), 0.5)
+    validated = AIResponse(content="hi", model="gpt-4o", provider="openai", usage=USAGE, latency=0.5)
+    assert fast.model_fields_set == set(AIResponse.model_fields)
+    assert repr(fast) == repr(validated)
+    assert pickle.loads(pickle.dumps(fast)) == validated
+    assert copy.deepcopy(fast) == validated
+    assert fast.model_copy(update={"cached": True}).estimated_cost == 0.0
+    fast.content = "changed"
+    assert fast.model_dump()["content"] == "changed"
+    assert AIResponse.model_validate(fast.model_dump()) == fast
+
+def test_unknown_model_layout_falls_back_to_validation(monkeypatch):
+    monkeypatch.setattr(fastpath, "_FAST_WRAP", False)
+    response = build_response("hi", "gpt-4o", "openai", USAGE, 0.5)
+    assert response == AIResponse(content="hi", model="gpt-4o", provider="openai", usage=USAGE, latency=0.5)
+
+def test_copy_response_leaves_original_untouched():
+    original = build_response("hi", "gpt-4o", "openai", USAGE, 0.5)
+    copy = copy_response(original, cached=True)
+    assert copy.cached and not original.cached
+    assert copy.content == "hi"
+    assert copy.estimated_cost == 0.0
+
+def test_responses_do_not_share_usage_dicts():
+    original = build_response("hi", "gpt-4o", "openai", dict(USAGE), 0.5)
+    copy_response(original, cached=True).usage["total_tokens"] = 0
+    assert original.usage == USAGE
+    # Cache entries without usage must not hand out a shared default
+    first = ResponseData.from_cache(json_dumps({"content": "a"}), "m", "p").to_response()
+    first.usage["input_tokens"] = 99
+    second = ResponseData.from_cache(json_dumps({"content": "b"}), "m", "p")
+    assert second.usage["input_tokens"] == 0
+    data = ResponseData("hi", "m", "p", dict(USAGE), 0.1)
+    data.to_response().usage.clear()
+    assert data.to_response().usage == USAGE
+
+def test_response_data_round_trips_cache_values():
+    cached_val = json_dumps({"content": "hi", "usage": USAGE, "latency": 0.5, "fresh_until": 123.0})
+    assert json_loads(cached_val)["content"] == "hi"
+    entry = ResponseData.from_cache(cached_val, "gpt-4o", "openai")
+    assert entry.fresh_until == 123.0
+    assert entry.estimated_cost == 0.0
+    response = entry.to_response(first_token_latency=0.0)
+    assert response == AIResponse(
+        content="hi", model="gpt-4o", provider="openai", usage=USAGE, latency=0.5,
+        cached=True, first_token_latency=0.0
+    )
+
+def test_configure_pricing_is_shared():
+    saved_rates, saved_default = dict(interfaces.MODEL_RATES), interfaces.DEFAULT_RATE
+    response = AIResponse(content="", model="my-model", provider="x", usage=USAGE, latency=0.1)
+    try:
+        configure_pricing({"my-model": (1.0, 2.0)})
+        assert response.estimated_cost == 0.001 + 0.004
+        configure_pricing(default=(10.0, 10.0), replace=True)
+        assert "gpt-4o" not in interfaces.MODEL_RATES
+        assert response.estimated_cost == 0.03
+    finally:
+        interfaces.MODEL_RATES.clear()
+        interfaces.MODEL_RATES.update(saved_rates)
+        interfaces.DEFAULT_RATE = saved_default
+
+def test_cache_hits_and_followers_use_fast_responses(make_client):
+    async def run():
+        provider = FakeProvider(delay=0.01)
+        client = make_client(provider, DictCache())
+        first, follower = await asyncio.gather(
+            client.generate("hello", model="m1"), client.generate("hello", model="m1")
+        )
+        hit = await client.generate("hello", model="m1")
+        replay = await client.stream("hello", model="m1").collect()
+        return provider, first, follower, hit, replay
+
+    provider, first, follower, hit, replay = asyncio.run(run())
+    assert provider.calls == 1
+    assert not first.cached and follower.cached and hit.cached
+    assert hit.content == first.content and hit.usage == first.usage
+    assert replay.cached and replay.first_token_latency == 0.0
@@ -0,0 +1,55 @@
+import asyncio
+from aicog_v2.core.http import HTTPPool
+from conftest import FakeProvider
+
+async def start_server():
+    async def handle(reader, writer):
+        # Minimal keep-alive HTTP/1.1 responder
+        while True:
+            request_line = await reader.readline()
+            if not request_line:
+                break
+            while (await reader.readline()) not in (b"\r\n", b""):
+                pass
+            body = b"" if request_line.startswith(b"HEAD") else b"ok"
+            writer.write(b"HTTP/1.1 200 OK\r\nContent-Length: 2\r\n\r\n" + body)
+            await writer.drain()
+        writer.close()
+
+    server = await asyncio.start_server(handle, "127.0.0.1", 0)
+    return server, f"http://127.0.0.1:{server.sockets[0].getsockname()[1]}"
+
+def test_pool_reuses_connections():
+    pool = HTTPPool()
+
+    async def run():
+        server, url = await start_server()
+        for _ in range(5):
+            await pool.client.get(url + "/v1/chat")
+        await pool.aclose()
+        server.close()
+
+    asyncio.run(run())
+    assert pool.stats["requests"] == 5
+    assert pool.stats["new_connections"] == 1
+    assert pool.stats["reused_connections"] == 4
+
+def test_client_prewarm_and_aclose(make_client):
+    pool = HTTPPool()
+    provider = FakeProvider()
+
+    async def run():
+        server, url = await start_server()
+        provider.base_url = url + "/v1"
+        client = make_client(provider, http_pool=pool)
+        await client.prewarm(connections=2)
+        warmed = pool.new_connections
+        await asyncio.gather(*[pool.client.get(url) for _ in range(2)])
+        await client.aclose()
+        server.close()
+        return warmed
+
+    assert asyncio.run(run()) == 2
+    assert pool.new_connections == 2
+    assert pool.stats["reused_connections"] == 2
+    assert pool._client is None
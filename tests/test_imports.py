@@ -0,0 +1,25 @@
+import os
+import sys
+import subprocess
+import aicog_v2
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def loaded_modules(statement):
+    probe = f"{statement}\nimport sys\nprint(' '.join(sorted({{m.split('.')[0] for m in sys.modules}})))"
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    out = subprocess.run([sys.executable, "-c", probe], capture_output=True, text=True, env=env, check=True)
+    return set(out.stdout.split())
+
+def test_package_import_loads_no_backends():
+    loaded = loaded_modules("import aicog_v2")
+    assert not loaded & {"groq", "openai", "redis", "aiosqlite", "pydantic", "tenacity"}
+
+def test_client_import_loads_no_provider_sdks():
+    loaded = loaded_modules("from aicog_v2 import AiCogClient")
+    assert not loaded & {"groq", "openai", "redis", "aiosqlite", "tenacity"}
+
+def test_all_public_names_resolve():
+    for name in aicog_v2.__all__:
+        assert getattr(aicog_v2, name).__name__ == name
+    assert set(aicog_v2.__all__) <= set(dir(aicog_v2))
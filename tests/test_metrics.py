@@ -0,0 +1,121 @@
+import asyncio
+import pytest
+from aicog_v2.core.metrics import GatewayMetrics, Histogram, NullMetrics
+from aicog_v2.core.resilience import ResiliencePolicy
+from aicog_v2.core.retry import provider_retrying
+from conftest import FakeProvider, DictCache
+
+def test_histogram_buckets_are_cumulative():
+    hist = Histogram("h", "help", ("stage",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 5.0):
+        hist.observe(value, "x")
+    lines = hist.render()
+    assert 'h_bucket{stage="x",le="0.1"} 1' in lines
+    assert 'h_bucket{stage="x",le="1"} 2' in lines
+    assert 'h_bucket{stage="x",le="+Inf"} 3' in lines
+    assert 'h_count{stage="x"} 3' in lines
+    assert hist.sum("x") == pytest.approx(5.55)
+
+def test_generate_records_stages_cache_and_usage(make_client):
+    metrics = GatewayMetrics()
+    client = make_client(FakeProvider(delay=0), DictCache(), metrics=metrics)
+
+    async def run():
+        await client.generate("hi", model="llama-3.1-8b-instant")
+        await client.generate("hi", model="llama-3.1-8b-instant")
+
+    asyncio.run(run())
+    model = "llama-3.1-8b-instant"
+    assert metrics.stage_seconds.count("provider", "fake", model) == 1
+    assert metrics.stage_seconds.count("cache_set", "fake", model) == 1
+    assert metrics.stage_seconds.count("cache_get", "fake", model) == 2
+    assert metrics.cache_lookups.get("exact", "miss") == 1
+    assert metrics.cache_lookups.get("exact", "hit") == 1
+    assert metrics.request_seconds.count("fake", model, "miss") == 1
+    assert metrics.request_seconds.count("fake", model, "cache_hit") == 1
+    assert metrics.tokens.get("fake", model, "output") == 5
+    assert metrics.cost.get("fake", model) > 0
+
+    text = metrics.render()
+    assert "# TYPE aicog_stage_seconds histogram" in text
+    assert 'aicog_cache_lookups_total{layer="exact",result="hit"} 1' in text
+
+def test_provider_errors_are_counted(make_client):
+    metrics = GatewayMetrics()
+    client = make_client(FakeProvider(delay=0, fail=True), metrics=metrics)
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(client.generate("hi", model="m"))
+    assert metrics.provider_errors.get("fake", "m", "RuntimeError") == 1
+    assert metrics.request_seconds.count("fake", "m", "error") == 1
+
+def test_null_metrics_is_default_and_records_nothing(make_client):
+    client = make_client(FakeProvider(delay=0))
+    asyncio.run(client.generate("hi", model="m"))
+    assert isinstance(client.metrics, NullMetrics)
+    assert client.metrics.render() == "\n"
+
+def test_serve_exposes_prometheus_text():
+    metrics = GatewayMetrics()
+    metrics.retry("fake", "m")
+
+    async def run():
+        server = await metrics.serve("127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(b"GET /metrics HTTP/1.1\r\nHost: localhost\r\n\r\n")
+        body = await reader.read()
+        writer.close()
+        server.close()
+        await server.wait_closed()
+        return body.decode()
+
+    body = asyncio.run(run())
+    assert body.startswith("HTTP/1.1 200 OK")
+    assert 'aicog_retries_total{provider="fake",model="m"} 1' in body
+
+def test_breaker_and_hedge_activity_is_recorded(make_client):
+    metrics = GatewayMetrics()
+    client = make_client(
+        FakeProvider(delay=0, fail=True), metrics=metrics, resilience=ResiliencePolicy(failure_threshold=1)
+    )
+    with pytest.raises(RuntimeError):
+        asyncio.run(client.generate("hi", model="m"))
+    assert metrics.breaker_transitions.get("fake", "closed", "open") == 1
+    assert metrics.breaker_state.get("fake") == 2
+
+    policy = ResiliencePolicy(fallbacks=[("b", "m")], hedge=True, hedge_delay=0.01)
+    policy.metrics = metrics
+
+    async def attempt(provider, model):
+        await asyncio.sleep(1.0 if provider == "a" else 0)
+        return provider
+
+    asyncio.run(policy.execute(policy.chain("a", "m", {"a", "b"}), attempt, lambda p, m: None))
+    assert metrics.hedges.get("b", "m", "fired") == metrics.hedges.get("b", "m", "won") == 1
+    assert metrics.breaker_state.get("b") == 0
+    assert "# TYPE aicog_breaker_state gauge" in metrics.render()
+
+class RetryAfterError(Exception):
+    def __init__(self):
+        super().__init__("503 Service Unavailable")
+        self.response = type("Response", (), {"headers": {"retry-after-ms": "0"}})()
+
+class RetryingProvider(FakeProvider):
+    on_retry = None
+
+    async def generate(self, prompt, model, system_prompt=None, **kwargs):
+        on_retry = (lambda: self.on_retry(model)) if self.on_retry is not None else None
+        async for attempt in provider_retrying(3, on_retry=on_retry):
+            with attempt:
+                self.calls += 1
+                if self.calls < 3:
+                    raise RetryAfterError()
+                return await super().generate(prompt, model, system_prompt, **kwargs)
+
+def test_retries_inside_a_provider_are_counted(make_client):
+    metrics = GatewayMetrics()
+    client = make_client(RetryingProvider(delay=0), metrics=metrics)
+    asyncio.run(client.generate("hi", model="m"))
+    assert metrics.provider_retries.get("fake", "m") == 2
+    assert metrics.retries.get("fake", "m") == 0
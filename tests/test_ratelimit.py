@@ -0,0 +1,100 @@
+import asyncio
+import pytest
+from aicog_v2.core.ratelimit import RateLimit, RateLimiter, TokenBucket
+from aicog_v2.core.retry import retry_after_seconds
+from conftest import FakeProvider
+
+class FakeHTTPError(Exception):
+    def __init__(self, headers):
+        super().__init__("429")
+        self.response = type("Response", (), {"headers": headers})()
+
+def test_token_bucket_debt_delays_admission():
+    bucket = TokenBucket(rate=10, capacity=10)
+    bucket.consume(10)
+    bucket.adjust(5)  # actual usage was 5 tokens more than reserved
+    assert bucket.time_until(1) > 0.5
+
+def test_limiter_admits_within_quota_immediately():
+    limiter = RateLimiter({"groq": RateLimit(rpm=600)})
+
+    async def run():
+        for _ in range(5):
+            await asyncio.wait_for(limiter.acquire("groq", "m", 10), timeout=0.1)
+
+    asyncio.run(run())
+    assert limiter.stats["groq"]["admitted"] == 5
+
+def test_limiter_prefers_higher_priority_waiters():
+    # 1 request per 50ms, burst of 1
+    limiter = RateLimiter({"groq": RateLimit(rpm=1200)})
+    limiter._lane("groq", "m").requests.capacity = 1
+    limiter._lane("groq", "m").requests.level = 0
+    order = []
+
+    async def request(name, priority):
+        await limiter.acquire("groq", "m", 1, priority=priority)
+        order.append(name)
+
+    async def run():
+        await asyncio.gather(request("low", 0), request("high", 10), request("low2", 0))
+
+    asyncio.run(run())
+    assert order == ["high", "low", "low2"]
+
+def test_model_specific_limit_wins():
+    limiter = RateLimiter({"groq": RateLimit(rpm=10), "groq/big": RateLimit(tpm=1000)})
+    assert limiter._lane("groq", "big").tokens is not None
+    assert limiter._lane("groq", "small").tokens is None
+
+def test_retry_after_header_parsing():
+    assert retry_after_seconds(FakeHTTPError({"retry-after": "3"})) == 3.0
+    assert retry_after_seconds(FakeHTTPError({"retry-after-ms": "250"})) == 0.25
+    assert retry_after_seconds(FakeHTTPError({})) is None
+    assert retry_after_seconds(RuntimeError("no response")) is None
+
+class RateLimitedError(FakeHTTPError):
+    status_code = 429
+
+def test_provider_leaves_429_retries_to_the_client():
+    from aicog_v2.core.retry import provider_retrying
+
+    async def call(retrying, error):
+        calls = 0
+        with pytest.raises(type(error)):
+            async for attempt in retrying:
+                with attempt:
+                    calls += 1
+                    raise error
+        return calls
+
+    assert asyncio.run(call(provider_retrying(3, retry_rate_limits=False), RateLimitedError({}))) == 1
+
+def test_client_retries_429s_through_the_limiter(make_client):
+    provider = FakeProvider(delay=0)
+    provider.max_retries = 3
+    provider.retry_rate_limits = False
+    limiter = RateLimiter({"fake": RateLimit(rpm=600)})
+    client = make_client(provider, rate_limiter=limiter)
+    failures = [RateLimitedError({"retry-after-ms": "100"})]
+    generate = provider.generate
+
+    async def flaky(*args, **kwargs):
+        if failures:
+            provider.calls += 1
+            raise failures.pop()
+        return await generate(*args, **kwargs)
+
+    provider.generate = flaky
+
+    async def run():
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        response = await client.generate("hi", model="m")
+        return response, loop.time() - start
+
+    response, elapsed = asyncio.run(run())
+    assert response.content == "echo: hi" and provider.calls == 2
+    # The retry was queued behind the pause and admitted by the limiter
+    assert elapsed >= 0.09
+    assert limiter.stats["fake"]["waited"] == 1
@@ -0,0 +1,116 @@
+import json
+import asyncio
+import pytest
+from aicog_v2 import AiCogClient
+from aicog_v2.cache.tiered_backend import MemoryCache
+from aicog_v2.core.loadgen import TraceRequest, load_trace, main, replay_trace
+from aicog_v2.providers.replay_provider import ReplayMissError, ReplayProvider, record_providers
+from aicog_v2.storage.sqlite_backend import SQLiteStorage
+from conftest import FakeProvider, baseline_audit_db
+
+USAGE = {"input_tokens": 10, "output_tokens": 20, "total_tokens": 30}
+
+def fill(path, count, dedup=False, latency=0.01):
+    storage = SQLiteStorage(path, dedup=dedup)
+
+    async def run():
+        await storage.init_db()
+        for i in range(count):
+            await storage.log_request("groq", "llama-3.1-8b-instant", f"prompt {i}", f"answer {i}", latency, USAGE)
+
+    asyncio.run(run())
+    return storage
+
+def test_iter_requests_pages_and_resolves_bodies(tmp_path):
+    storage = fill(str(tmp_path / "audit.db"), 25, dedup=True)
+
+    async def run():
+        return [row async for row in storage.iter_requests(chunk_size=10)]
+
+    rows = asyncio.run(run())
+    assert [row["id"] for row in rows] == list(range(1, 26))
+    assert rows[7]["prompt"] == "prompt 7" and rows[7]["response"] == "answer 7"
+
+def test_recorded_calls_replay_offline(tmp_path, make_client):
+    corpus = SQLiteStorage(str(tmp_path / "corpus.db"))
+
+    async def record():
+        await corpus.init_db()
+        client = AiCogClient(providers=record_providers({"fake": FakeProvider()}, corpus), default_provider="fake")
+        live = await client.generate("hello", model="m1")
+        streamed = await client.stream("stream me", model="m1", use_cache=False).collect()
+        return live, streamed
+
+    live, streamed = asyncio.run(record())
+
+    async def replay():
+        provider = await ReplayProvider.from_storage(corpus, latency_scale=0.0)
+        client = make_client(provider)
+        exact = await client.generate("hello", model="m1", use_cache=False)
+        rerouted = await client.generate("hello", model="m2", use_cache=False)
+        replayed_stream = await client.stream("stream me", model="m1", use_cache=False).collect()
+        with pytest.raises(ReplayMissError):
+            await provider.generate("never recorded", "m1")
+        return provider, exact, rerouted, replayed_stream
+
+    provider, exact, rerouted, replayed_stream = asyncio.run(replay())
+    assert exact.content == live.content and exact.usage == live.usage
+    assert rerouted.content == live.content and rerouted.model == "m2"
+    assert replayed_stream.content == streamed.content
+    assert provider.stats == {"recordings": 2, "prompts": 2, "hits": 3, "misses": 1}
+
+def test_repeated_recordings_are_served_round_robin():
+    provider = ReplayProvider(
+        [{"model": "m", "prompt": "p", "response": answer, "latency": 0.0} for answer in ("a", "b")]
+    )
+
+    async def run():
+        return [(await provider.generate("p", "m")).content for _ in range(3)]
+
+    assert asyncio.run(run()) == ["a", "b", "a"]
+
+def test_replay_trace_follows_schedule():
+    provider = ReplayProvider(
+        [{"model": "m", "prompt": f"p{i % 5}", "response": "r", "latency": 0.01, **USAGE} for i in range(5)]
+    )
+    # 20 requests over 2 recorded seconds, replayed 20x faster
+    trace = [TraceRequest(1000.0 + i * 0.1, "replay", "m", f"p{i % 5}") for i in range(20)]
+
+    async def run():
+        client = AiCogClient(providers={"replay": provider}, cache=MemoryCache(), default_provider="replay")
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        report = await replay_trace(client, trace, speed=20)
+        return report, loop.time() - start
+
+    report, elapsed = asyncio.run(run())
+    assert 0.09 <= elapsed < 1.0
+    assert report["requests"] == 20 and not report["errors"]
+    assert report["cached"] == 15
+    assert provider.hits == 5
+    assert report["estimated_cost"] > 0
+
+def test_replay_cli(tmp_path, capsys):
+    path = str(tmp_path / "audit.db")
+    fill(path, 10, latency=0.001)
+    out = str(tmp_path / "report.json")
+    assert len(asyncio.run(load_trace(path, limit=4))) == 4
+
+    main([path, "--speed", "1000", "--cache", "memory", "--output", out])
+    with open(out) as f:
+        report = json.load(f)
+    assert report["requests"] == 10 and not report["errors"]
+    assert report["replay"]["hits"] == 10
+    assert '"requests": 10' in capsys.readouterr().out
+
+def test_replay_reads_logs_from_before_the_new_columns(tmp_path):
+    path = baseline_audit_db(str(tmp_path / "old.db"), 3)
+
+    async def run():
+        provider = await ReplayProvider.from_storage(path, latency_scale=0.0)
+        return provider, await load_trace(path)
+
+    provider, trace = asyncio.run(run())
+    assert [request.prompt for request in trace] == ["prompt 0", "prompt 1", "prompt 2"]
+    assert provider.stats["recordings"] == 3
+    main([path, "--speed", "1000"])
@@ -0,0 +1,130 @@
+import asyncio
+import pytest
+from aicog_v2.core.resilience import CircuitBreaker, CircuitOpenError, ResiliencePolicy
+
+def test_breaker_opens_and_recovers():
+    breaker = CircuitBreaker(failure_threshold=2, recovery_timeout=0.0)
+    breaker.record_failure()
+    assert breaker.state == "closed"
+    breaker.record_failure()
+    assert breaker.state == "open"
+    # recovery_timeout elapsed -> one half-open trial call
+    assert breaker.allow()
+    assert breaker.state == "half_open"
+    assert not breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed"
+    assert breaker.transitions == {"closed->open": 1, "open->half_open": 1, "half_open->closed": 1}
+
+class HTTPError(Exception):
+    def __init__(self, status_code):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+def test_breaker_counts_only_outages():
+    breaker = CircuitBreaker(failure_threshold=1)
+    breaker.record_error(HTTPError(400))
+    breaker.record_error(HTTPError(404))
+    assert breaker.state == "closed" and breaker.consecutive_failures == 0
+    breaker.record_error(HTTPError(429))
+    assert breaker.state == "open"
+    for error in (HTTPError(503), TimeoutError()):
+        breaker = CircuitBreaker(failure_threshold=1)
+        breaker.record_error(error)
+        assert breaker.state == "open"
+
+def test_open_breaker_fails_fast():
+    breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=60)
+    breaker.record_failure()
+    assert not breaker.allow()
+    assert breaker.rejected == 1
+
+def test_fallback_chain_used_when_primary_fails():
+    policy = ResiliencePolicy(fallbacks=[("b", "m2")])
+    calls = []
+
+    async def attempt(provider, model):
+        calls.append(provider)
+        if provider == "a":
+            raise RuntimeError("down")
+        return "ok"
+
+    chain = policy.chain("a", "m1", {"a", "b"})
+    result = asyncio.run(policy.execute(chain, attempt, lambda p, m: None))
+    assert result == ("ok", "b", "m2")
+    assert calls == ["a", "b"]
+    assert policy.fallbacks_used == 1
+
+def test_all_routes_failing_raises_last_error():
+    policy = ResiliencePolicy(failure_threshold=1)
+    policy.breaker("a").record_failure()
+
+    async def attempt(provider, model):
+        return "unreachable"
+
+    with pytest.raises(CircuitOpenError):
+        asyncio.run(policy.execute([("a", "m")], attempt, lambda p, m: None))
+
+def test_hedged_request_takes_faster_backup():
+    policy = ResiliencePolicy(fallbacks=[("b", "m")], hedge=True)
+
+    async def attempt(provider, model):
+        await asyncio.sleep(1.0 if provider == "a" else 0.01)
+        return provider
+
+    chain = policy.chain("a", "m", {"a", "b"})
+    result = asyncio.run(policy.execute(chain, attempt, lambda p, m: 0.02))
+    assert result[0] == "b"
+    assert policy.hedges_fired == 1
+    assert policy.hedge_wins == 1
+
+def test_hedge_not_fired_when_primary_is_fast():
+    policy = ResiliencePolicy(fallbacks=[("b", "m")], hedge=True)
+
+    async def attempt(provider, model):
+        return provider
+
+    chain = policy.chain("a", "m", {"a", "b"})
+    assert asyncio.run(policy.execute(chain, attempt, lambda p, m: 0.5))[0] == "a"
+    assert policy.hedges_fired == 0
+
+def test_early_primary_failure_is_a_failover_not_a_hedge():
+    policy = ResiliencePolicy(fallbacks=[("b", "m")], hedge=True)
+
+    async def attempt(provider, model):
+        if provider == "a":
+            raise RuntimeError("down")
+        return provider
+
+    chain = policy.chain("a", "m", {"a", "b"})
+    assert asyncio.run(policy.execute(chain, attempt, lambda p, m: 0.5))[0] == "b"
+    assert policy.hedges_fired == 0 and policy.hedge_wins == 0
+    assert policy.hedge_failovers == 1
+
+def test_cancelled_caller_cancels_hedged_attempts():
+    cancelled = []
+
+    async def attempt(provider, model):
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(provider)
+            raise
+
+    async def run(hedge_delay):
+        policy = ResiliencePolicy(fallbacks=[("b", "m")], hedge=True, hedge_delay=hedge_delay)
+        caller = asyncio.ensure_future(policy.execute(policy.chain("a", "m", {"a", "b"}), attempt, lambda p, m: None))
+        await asyncio.sleep(0.05)
+        caller.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await caller
+        await asyncio.sleep(0)
+        # Checked before asyncio.run() cancels leftover tasks on exit
+        return policy, sorted(cancelled)
+
+    # Cancelled while waiting out the hedge delay, then after the backup fired
+    assert asyncio.run(run(1.0))[1] == ["a"]
+    cancelled.clear()
+    policy, stopped = asyncio.run(run(0.01))
+    assert stopped == ["a", "b"]
+    assert all(breaker.state == "closed" for breaker in policy.breakers.values())
@@ -1,4 +1,7 @@
-from aicog_v2.core.routing import ModelRouter
+import os
+import pytest
+from aicog_v2.core.routing import ModelRouter, RoutingError
+from aicog_v2.core.rules import RuleEngine, TaskRule
 
 def test_classify_task_reasoning():
     router = ModelRouter()
@@ -25,3 +28,128 @@ def test_routing_logic_complex_task():
     provider, model = router.route("Explain why gravity exists", 50)
     assert provider == "groq"
     assert model == "llama-3.3-70b-versatile"
+
+def test_route_only_picks_configured_providers():
+    router = ModelRouter()
+    provider, model = router.route("Hello", 10, available=["openai"])
+    assert (provider, model) == ("openai", "gpt-4o-mini")
+
+def test_adaptive_routing_avoids_slow_provider():
+    router = ModelRouter(adaptive=True)
+    for _ in range(20):
+        router.record("groq", "llama-3.1-8b-instant", 5.0)
+        router.record("openai", "gpt-4o-mini", 0.3)
+    provider, _ = router.route("Hello", 10, available=["groq", "openai"])
+    assert provider == "openai"
+
+def test_adaptive_routing_penalizes_errors():
+    router = ModelRouter(adaptive=True)
+    for _ in range(20):
+        router.record("groq", "llama-3.1-8b-instant", 0.2, error=True)
+        router.record("openai", "gpt-4o-mini", 0.4)
+    provider, _ = router.route("Hello", 10, available=["groq", "openai"])
+    assert provider == "openai"
+
+def test_tracker_seed_and_p95():
+    router = ModelRouter()
+    router.tracker.seed([("groq", "m", float(i)) for i in range(1, 101)])
+    stats = router.tracker.get("groq", "m")
+    assert stats.samples == 100
+    assert 94 <= stats.p95 <= 96
+
+def test_keywords_match_whole_words_only():
+    router = ModelRouter()
+    assert router.classify_task("Give me information about cats") == "general"
+    # A rejected match inside a word does not hide a later whole-word one
+    assert router.classify_task("Reformat the information as csv") == "extraction"
+    assert router.classify_task("FORMATTING help please") == "extraction"
+    assert router.classify_task("Write a summarization of this") == "summarization"
+
+def test_rule_priority_wins_regardless_of_position():
+    router = ModelRouter()
+    assert router.classify_task("Output JSON, and explain why it works") == "reasoning"
+
+def test_long_prompts_only_scan_head_and_tail():
+    engine = RuleEngine(window_chars=100)
+    filler = "lorem ipsum " * 100
+    assert engine.classify(filler + "summarize" + filler) == "general"
+    assert engine.classify(filler + "please summarize") == "summarization"
+    assert engine.classify("extract " + filler) == "extraction"
+
+def test_rules_from_yaml_route_to_configured_tiers(tmp_path):
+    path = tmp_path / "routing.yaml"
+    path.write_text(
+        "tasks:\n"
+        "  - {name: translation, keywords: [translat*, 'in french'], tier: large}\n"
+        "  - {name: code, keywords: [python, function*]}\n"
+        "default_tier: small\n"
+        "tiers:\n"
+        "  large: [[openai, gpt-4o]]\n"
+        "  small: [[groq, llama-3.1-8b-instant]]\n"
+    )
+    router = ModelRouter(rules=RuleEngine.from_file(str(path)))
+    assert router.classify_task("Translate this to German") == "translation"
+    assert router.route("Say hello in French", 10) == ("openai", "gpt-4o")
+    assert router.route("Write a python function", 10) == ("groq", "llama-3.1-8b-instant")
+
+def test_rules_from_toml(tmp_path):
+    path = tmp_path / "routing.toml"
+    path.write_text('long_prompt_tokens = 100\n[[tasks]]\nname = "math"\nkeywords = ["integral*"]\ntier = "large"\n')
+    engine = RuleEngine.from_file(str(path))
+    assert engine.classify("Solve the integrals") == "math"
+    assert ModelRouter(rules=engine).select_tier("hello", 500) == "large"
+
+def test_rules_hot_reload_keeps_previous_rules_on_error(tmp_path):
+    path = tmp_path / "routing.yaml"
+    path.write_text("tasks:\n  - {name: greeting, keywords: [hello]}\n")
+    engine = RuleEngine.from_file(str(path), reload_interval=0)
+    assert engine.classify("hello there") == "greeting"
+
+    path.write_text("tasks:\n  - {name: farewell, keywords: [bye]}\n")
+    os.utime(path, (1, 1))
+    assert engine.classify("bye now") == "farewell"
+    assert engine.reloads == 1
+
+    path.write_text("tasks: [{keywords: [oops]}]\n")
+    os.utime(path, (2, 2))
+    assert engine.classify("bye now") == "farewell"
+    assert engine.reloads == 1
+
+def test_malformed_reload_leaves_rules_untouched(tmp_path):
+    path = tmp_path / "routing.yaml"
+    path.write_text("tasks:\n  - {name: greeting, keywords: [hello]}\n")
+    engine = RuleEngine.from_file(str(path), reload_interval=0)
+
+    path.write_text("tasks:\n  - {name: broken, keywords: [123]}\n")
+    os.utime(path, (1, 1))
+    for _ in range(2):
+        assert engine.classify("hello there") == "greeting"
+        assert engine.classify("nothing here") == "general"
+    assert [rule.name for rule in engine.rules] == ["greeting"]
+    assert engine.reloads == 0
+
+def test_keyword_forms_match_in_one_pattern():
+    rules = [TaskRule(f"class{i}", [f"word{i}x", f"stem{i}*", f"two {i}"]) for i in range(20)]
+    rules.append(TaskRule("dotnet", [".net"]))
+    engine = RuleEngine(rules=rules)
+    assert engine._compiled.pattern is not None
+    assert engine.classify("please stem7ming now") == "class7"
+    assert engine.classify("a two\n 3 b and word1x") == "class1"
+    assert engine.classify("xword1x stemless") == "general"
+    assert engine.classify("ported to .net") == "dotnet"
+    assert engine.classify("asp.net") == "general"
+
+def test_empty_rules_fall_back_to_default_task():
+    engine = RuleEngine(rules=[TaskRule("unused", [])], default_task="chat")
+    assert engine.classify("anything") == "chat"
+
+def test_route_falls_back_to_a_tier_with_configured_providers():
+    router = ModelRouter(tiers={"large": [("openai", "gpt-4o")], "small": [("groq", "llama-3.1-8b-instant")]})
+    # "small" is selected but only "large" has a configured provider, and vice versa
+    assert router.route("Hello", 10, available=["openai"]) == ("openai", "gpt-4o")
+    assert router.route("Explain why gravity exists", 50, available=["groq"]) == ("groq", "llama-3.1-8b-instant")
+
+def test_route_raises_when_no_tier_is_configured():
+    router = ModelRouter()
+    with pytest.raises(RoutingError, match="configured: fake"):
+        router.route("Hello", 10, available=["fake"])
@@ -0,0 +1,67 @@
+import asyncio
+from aicog_v2.cache.semantic import MinHashLSHIndex, SemanticCache, normalize_prompt
+from conftest import DictCache, FakeProvider
+
+def test_normalize_prompt():
+    assert normalize_prompt("  Hello,   WORLD!! ") == "hello world"
+    assert normalize_prompt("Is 2+3 > 4.5? Don't guess.") == "is 2+3 > 4.5 don't guess"
+
+def test_prompts_with_different_meaning_miss():
+    cache = SemanticCache()
+    pairs = [
+        ("What is 2+3?", "What is 2*3?", "general"),
+        ("Is x > y", "Is x < y", "general"),
+        (
+            "Write a Python function that returns the maximum of a list",
+            "Write a Python function that returns the minimum of a list",
+            "general",
+        ),
+        ("Summarize this article in 3 bullet points", "Summarize this article in 5 bullet points", "summarization"),
+    ]
+    for i, (cached, asked, task) in enumerate(pairs):
+        cache.add(cached, "m", f"k{i}")
+        assert cache.lookup(asked, "m", task) is None, asked
+    assert cache.hits == 0
+
+def test_below_threshold_matches_do_not_refresh_recency():
+    cache = SemanticCache(index=MinHashLSHIndex(max_entries=2))
+    cache.add("Write a Python function that returns the maximum of a list", "m", "old")
+    cache.add("Explain how Redis caching works in production systems", "m", "new")
+    assert cache.lookup("Write a Python function that returns the minimum of a list", "m", "general") is None
+    cache.add("Tell me a joke about databases and their indexes", "m", "newest")
+    # "old" was only a near miss, so it stayed least recently used
+    assert cache.lookup("Write a Python function that returns the maximum of a list", "m", "general") is None
+    assert cache.lookup("explain how redis caching works in production systems", "m", "general") == "new"
+
+def test_index_matches_near_duplicates_only_within_scope():
+    index = MinHashLSHIndex()
+    index.add("Explain how Redis caching works in production systems", "m", "k1")
+    match = index.query("explain how redis caching works in production systems?", "m")
+    assert match[0] == "k1" and match[1] == 1.0
+    assert index.query("explain how redis caching works in production systems?", "other") is None
+
+def test_index_rejects_unrelated_prompts():
+    index = MinHashLSHIndex()
+    index.add("Explain how Redis caching works in production systems", "m", "k1")
+    match = index.query("Write a poem about autumn leaves falling slowly", "m")
+    assert match is None or match[1] < 0.5
+
+def test_index_is_bounded():
+    index = MinHashLSHIndex(max_entries=3)
+    for i in range(5):
+        index.add(f"prompt number {i} with some text", "m", f"k{i}")
+    assert len(index) == 3
+    assert index.evictions == 2
+
+def test_client_serves_near_duplicate_from_cache(make_client):
+    provider = FakeProvider()
+    client = make_client(provider, DictCache(), semantic_cache=SemanticCache())
+
+    async def run():
+        await client.generate("What is the capital of France?", model="m")
+        return await client.generate("what is the capital of france", model="m")
+
+    response = asyncio.run(run())
+    assert response.cached
+    assert provider.calls == 1
+    assert client.semantic_cache.hits == 1
@@ -0,0 +1,56 @@
+import asyncio
+import json
+import pytest
+import fakeredis
+from aicog_v2.cache.redis_backend import RedisCache
+from aicog_v2.cache.serialization import CacheSerializer
+
+PAYLOAD = json.dumps({"content": "The quick brown fox jumps over the lazy dog. " * 40, "usage": {"total_tokens": 8}, "latency": 0.5})
+
+def test_round_trip_compresses_large_values():
+    serializer = CacheSerializer(compression="zlib")
+    data = serializer.dumps(PAYLOAD)
+    assert data[0] == 1 and len(data) < len(PAYLOAD) / 4
+    assert serializer.loads(data) == PAYLOAD
+    assert serializer.stats["bytes_saved"] > 0
+
+def test_small_values_are_stored_raw():
+    serializer = CacheSerializer(compression="zlib", min_bytes=256)
+    data = serializer.dumps('{"content": "hi"}')
+    assert data[1] == 0 and data[3:] == b'{"content": "hi"}'
+    assert serializer.loads(data) == '{"content": "hi"}'
+
+def test_zstd_and_msgpack_round_trip():
+    pytest.importorskip("zstandard")
+    pytest.importorskip("msgpack")
+    serializer = CacheSerializer(compression="zstd", format="msgpack")
+    assert json.loads(serializer.loads(serializer.dumps(PAYLOAD))) == json.loads(PAYLOAD)
+
+def test_redis_cache_reads_legacy_json_entries():
+    client = fakeredis.FakeAsyncRedis(decode_responses=False)
+    legacy = RedisCache(client=client)
+    cache = RedisCache(client=client, serializer=CacheSerializer(compression="zlib"))
+
+    async def run():
+        await legacy.set("old", PAYLOAD)
+        await cache.set("new", PAYLOAD)
+        await client.set("garbage", b"\x01\x09\x00abc")
+        assert len(await client.get("new")) < len(PAYLOAD) / 4
+        return await cache.get("old"), await cache.get_many(["new", "missing", "garbage"])
+
+    old, many = asyncio.run(run())
+    assert old == PAYLOAD
+    assert many == [PAYLOAD, None, None]
+
+def test_redis_prefix_delete_survives_an_outage():
+    class DownRedis(fakeredis.FakeAsyncRedis):
+        async def unlink(self, *keys):
+            raise ConnectionError("redis down")
+
+    cache = RedisCache(client=DownRedis(decode_responses=True))
+
+    async def run():
+        await cache.set("ns:a", "1")
+        return await cache.delete_prefix("ns:")
+
+    assert asyncio.run(run()) == 0
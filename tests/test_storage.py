@@ -0,0 +1,260 @@
+import os
+import time
+import asyncio
+import sqlite3
+import pytest
+from aicog_v2.storage.sqlite_backend import SQLiteStorage
+from aicog_v2.storage.partitioned import PartitionedSQLiteStorage
+from aicog_v2.core.interfaces import estimate_cost
+from conftest import baseline_audit_db
+
+USAGE = {"input_tokens": 1, "output_tokens": 2, "total_tokens": 3}
+
+def count_rows(path):
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute("SELECT COUNT(*) FROM requests").fetchone()[0]
+    finally:
+        conn.close()
+
+def test_log_request_sync(tmp_path):
+    path = str(tmp_path / "audit.db")
+    storage = SQLiteStorage(path)
+
+    async def run():
+        await storage.init_db()
+        await storage.log_request("groq", "m", "p", "r", 0.1, USAGE)
+
+    asyncio.run(run())
+    assert count_rows(path) == 1
+
+def test_write_behind_batches_and_drains_on_close(tmp_path):
+    path = str(tmp_path / "audit.db")
+    storage = SQLiteStorage(path, write_behind=True, batch_size=50, flush_interval=10)
+
+    async def run():
+        await storage.init_db()
+        for i in range(120):
+            await storage.log_request("groq", "m", f"p{i}", "r", 0.1, USAGE)
+        await storage.close()
+
+    asyncio.run(run())
+    assert count_rows(path) == 120
+    assert storage.written == 120
+    assert storage.pending == 0
+
+def test_write_behind_flush_does_not_wait_for_interval(tmp_path):
+    path = str(tmp_path / "audit.db")
+    storage = SQLiteStorage(path, write_behind=True, batch_size=100, flush_interval=30)
+
+    async def run():
+        await storage.init_db()
+        await storage.log_request("groq", "m", "p", "r", 0.1, USAGE)
+        await asyncio.wait_for(storage.flush(), timeout=5)
+        rows = count_rows(path)
+        await storage.close()
+        return rows
+
+    assert asyncio.run(run()) == 1
+
+def test_write_behind_drop_policy(tmp_path):
+    path = str(tmp_path / "audit.db")
+    storage = SQLiteStorage(path, write_behind=True, max_queue_size=5, drop_when_full=True, batch_size=100)
+
+    async def run():
+        await storage.init_db()
+        # No await point between puts, so the writer cannot drain in between
+        for i in range(8):
+            await storage.log_request("groq", "m", f"p{i}", "r", 0.1, USAGE)
+        await storage.close()
+
+    asyncio.run(run())
+    assert storage.dropped == 3
+    assert count_rows(path) == 5
+
+def test_init_db_migrates_existing_table(tmp_path):
+    path = str(tmp_path / "audit.db")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE requests (id INTEGER PRIMARY KEY AUTOINCREMENT, timestamp REAL, provider TEXT, "
+                 "model TEXT, prompt TEXT, response TEXT, latency REAL, input_tokens INTEGER, "
+                 "output_tokens INTEGER, total_tokens INTEGER)")
+    conn.commit()
+    conn.close()
+    storage = SQLiteStorage(path)
+
+    async def run():
+        await storage.init_db()
+        await storage.log_request("groq", "m", "p", "r", 0.5, USAGE, first_token_latency=0.1)
+
+    asyncio.run(run())
+    conn = sqlite3.connect(path)
+    assert conn.execute("SELECT first_token_latency FROM requests").fetchone()[0] == 0.1
+    conn.close()
+
+def test_summary_reads_rollups(tmp_path):
+    path = str(tmp_path / "audit.db")
+    storage = SQLiteStorage(path, write_behind=True)
+
+    async def run():
+        await storage.init_db()
+        for i in range(100):
+            await storage.log_request("groq", "llama-3.1-8b-instant", "p", "r", (i + 1) / 100, USAGE)
+        await storage.log_request("openai", "gpt-4o", "p", "r", 2.0, USAGE)
+        await storage.close()
+        return await storage.summary()
+
+    by_model = {row["model"]: row for row in asyncio.run(run())}
+    groq = by_model["llama-3.1-8b-instant"]
+    assert groq["requests"] == 100
+    assert groq["total_tokens"] == 300
+    assert groq["cost"] == pytest.approx(100 * estimate_cost("llama-3.1-8b-instant", 1, 2))
+    assert groq["max_latency"] == 1.0
+    assert groq["p50_latency"] == pytest.approx(0.5, rel=0.05)
+    assert groq["p99_latency"] == pytest.approx(0.99, rel=0.05)
+    assert by_model["gpt-4o"]["requests"] == 1
+
+def test_summary_time_range_and_grouping(tmp_path, monkeypatch):
+    path = str(tmp_path / "audit.db")
+    storage = SQLiteStorage(path)
+    hour = 1_700_000_000 // 3600 * 3600
+    # Partial hour before, a whole hour, partial hour after
+    timestamps = [hour - 120, hour + 10, hour + 1800, hour + 3600 + 60, hour + 3600 + 600]
+
+    async def run():
+        await storage.init_db()
+        for ts in timestamps:
+            monkeypatch.setattr("time.time", lambda ts=ts: ts)
+            await storage.log_request("groq", "m", "p", "r", 0.1, USAGE)
+        monkeypatch.undo()
+        total = await storage.summary(since=hour - 60, until=hour + 3600 + 120, group_by=())
+        hourly = await storage.summary(group_by=("hour",))
+        return total, hourly
+
+    total, hourly = asyncio.run(run())
+    assert total[0]["requests"] == 3
+    assert [(row["hour"], row["requests"]) for row in hourly] == [(hour - 3600, 1), (hour, 2), (hour + 3600, 2)]
+
+def test_rollups_are_backfilled_for_existing_rows(tmp_path):
+    path = str(tmp_path / "audit.db")
+
+    async def run():
+        legacy = SQLiteStorage(path, rollups=False)
+        await legacy.init_db()
+        for _ in range(3):
+            await legacy.log_request("groq", "m", "p", "r", 0.1, USAGE)
+        storage = SQLiteStorage(path)
+        await storage.init_db()
+        return await storage.summary()
+
+    assert asyncio.run(run())[0]["requests"] == 3
+
+def test_dedup_stores_bodies_once_and_resolves_them(tmp_path):
+    path = str(tmp_path / "audit.db")
+    storage = SQLiteStorage(path, dedup=True, compression="zlib")
+    system_prompt = "You are a helpful assistant. " * 100
+
+    async def run():
+        await storage.init_db()
+        for i in range(5):
+            await storage.log_request("groq", "m", system_prompt, f"answer {i}", 0.1, USAGE)
+        return await storage.recent_requests(limit=10)
+
+    rows = asyncio.run(run())
+    assert [row["response"] for row in rows] == [f"answer {i}" for i in range(5)]
+    assert all(row["prompt"] == system_prompt for row in rows)
+    conn = sqlite3.connect(path)
+    try:
+        assert conn.execute("SELECT COUNT(*) FROM blobs").fetchone()[0] == 6
+        assert conn.execute("SELECT encoding FROM blobs WHERE size > 1000").fetchone()[0] == "zlib"
+        assert conn.execute("SELECT COUNT(*) FROM requests WHERE prompt IS NOT NULL").fetchone()[0] == 0
+    finally:
+        conn.close()
+
+def test_retention_by_age_removes_rows_and_orphan_blobs(tmp_path, monkeypatch):
+    path = str(tmp_path / "audit.db")
+    storage = SQLiteStorage(path, dedup=True, retention_days=1)
+    now = time.time()
+
+    async def run():
+        await storage.init_db()
+        monkeypatch.setattr("time.time", lambda: now - 3 * 86400)
+        await storage.log_request("groq", "m", "old prompt", "old answer", 0.1, USAGE)
+        monkeypatch.undo()
+        await storage.log_request("groq", "m", "new prompt", "new answer", 0.1, USAGE)
+        deleted = await storage.apply_retention()
+        return deleted, await storage.recent_requests(), await storage.summary()
+
+    deleted, rows, summary = asyncio.run(run())
+    assert deleted == 1
+    assert [row["prompt"] for row in rows] == ["new prompt"]
+    # Rollups outlive raw rows
+    assert summary[0]["requests"] == 2
+    conn = sqlite3.connect(path)
+    try:
+        assert conn.execute("SELECT COUNT(*) FROM blobs").fetchone()[0] == 2
+    finally:
+        conn.close()
+
+def test_blob_deleted_by_another_instance_is_rewritten(tmp_path, monkeypatch):
+    path = str(tmp_path / "audit.db")
+    writer = SQLiteStorage(path, dedup=True)
+    janitor = SQLiteStorage(path, dedup=True, retention_days=1)
+    now = time.time()
+
+    async def run():
+        await writer.init_db()
+        monkeypatch.setattr("time.time", lambda: now - 3 * 86400)
+        await writer.log_request("groq", "m", "same prompt", "same answer", 0.1, USAGE)
+        monkeypatch.undo()
+        # Retention in another instance drops the blobs the writer remembers
+        assert await janitor.apply_retention() == 1
+        await writer.log_request("groq", "m", "same prompt", "same answer", 0.1, USAGE)
+        return await writer.recent_requests()
+
+    rows = asyncio.run(run())
+    assert [(row["prompt"], row["response"]) for row in rows] == [("same prompt", "same answer")]
+
+def test_retention_by_size_deletes_oldest_rows(tmp_path):
+    path = str(tmp_path / "audit.db")
+    storage = SQLiteStorage(path, max_size_mb=0.5)
+
+    async def run():
+        await storage.init_db()
+        for i in range(400):
+            await storage.log_request("groq", "m", f"{i} " + "x" * 4000, "r", 0.1, USAGE)
+        await storage.apply_retention(chunk_size=50)
+
+    asyncio.run(run())
+    assert os.path.getsize(path) <= 0.5 * 1024 * 1024
+    conn = sqlite3.connect(path)
+    try:
+        oldest = conn.execute("SELECT prompt FROM requests ORDER BY id LIMIT 1").fetchone()[0]
+    finally:
+        conn.close()
+    assert int(oldest.split()[0]) > 0
+
+def test_partitioned_storage_rotates_and_prunes(tmp_path, monkeypatch):
+    storage = PartitionedSQLiteStorage(str(tmp_path), period="day", keep=2, write_behind=True)
+    day = 86400
+    start = 1_700_000_000 // day * day
+
+    async def run():
+        for offset in range(3):
+            monkeypatch.setattr("time.time", lambda offset=offset: start + offset * day + 60)
+            await storage.log_request("groq", "m", "p", "r", 0.1, USAGE)
+            await storage.log_request("groq", "m", "p", "r", 0.1, USAGE)
+        await storage.flush()
+        monkeypatch.undo()
+        summary = await storage.summary(group_by=())
+        await storage.close()
+        return summary
+
+    summary = asyncio.run(run())
+    assert storage.rotations == 2
+    assert [name for name, _ in storage.partitions()] == ["20231115", "20231116"]
+    assert summary[0]["requests"] == 4
+
+def test_recent_requests_reads_logs_from_before_dedup(tmp_path):
+    storage = SQLiteStorage(baseline_audit_db(str(tmp_path / "old.db"), 2))
+    rows = asyncio.run(storage.recent_requests())
+    assert [row["prompt"] for row in rows] == ["prompt 0", "prompt 1"]
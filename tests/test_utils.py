@@ -1,3 +1,7 @@
+import random
+import re
+import base64
+from aicog_v2.core.tokenizer import BPETokenizer
 from aicog_v2.core.utils import TokenEstimator
 
 def test_estimate_empty():
@@ -13,3 +17,66 @@ def test_estimate_longer_text():
     estimate = TokenEstimator.estimate(text)
     assert estimate > 5
     assert isinstance(estimate, int)
+
+def test_long_prompts_are_sampled_close_to_a_full_count():
+    text = "Explain how the cache works, step by step (with examples)! " * 5000
+    full = max(int(len(text) / 4), int(len(re.findall(r'\w+', text)) * 1.3))
+    assert abs(TokenEstimator.estimate(text) - full) / full < 0.02
+
+def test_sampled_word_counts_stay_close_on_dense_text():
+    # Short words, where the word-based estimate dominates the character-based one
+    rng = random.Random(3)
+    words = ["a", "to", "of", "x1", "i", "is", "(b)", "c.d", "it's", "ok"]
+    for size in (2500, 6000, 40000):
+        text = " ".join(rng.choice(words) for _ in range(size // 3))[:size]
+        full = max(int(len(text) / 4), int(len(re.findall(r'\w+', text)) * 1.3))
+        assert abs(TokenEstimator.heuristic(text) - full) / full < 0.06
+
+def write_vocab(path, merges):
+    ranks = [bytes([i]) for i in range(256)] + merges
+    path.write_text("\n".join(f"{base64.b64encode(token).decode()} {rank}" for rank, token in enumerate(ranks)))
+
+def test_bpe_tokenizer_from_local_vocab(tmp_path):
+    vocab = tmp_path / "toy.tiktoken"
+    write_vocab(vocab, [b"th", b"the", b" t", b" the", b"at"])
+    tokenizer = BPETokenizer.from_file(str(vocab))
+    assert tokenizer.encode("the") == [257]
+    assert tokenizer.encode("the cat") == [257, 32, 99, 260]
+    assert tokenizer.encode("that the") == [256, 260, 259]
+    assert tokenizer.count("") == 0
+
+def test_pluggable_tokenizer_is_memoized():
+    class CountingTokenizer:
+        calls = 0
+
+        def encode(self, text):
+            self.calls += 1
+            return text.split()
+
+    tokenizer = CountingTokenizer()
+    TokenEstimator.use_tokenizer(tokenizer, cache_size=2)
+    try:
+        assert TokenEstimator.estimate("a b c") == 3
+        assert TokenEstimator.estimate("a b c") == 3
+        assert TokenEstimator.estimate_many(["a b c", "d e", "", "f"]) == [3, 2, 0, 1]
+        assert tokenizer.calls == 3
+    finally:
+        TokenEstimator.use_tokenizer(None)
+    assert TokenEstimator.estimate("a b c") == TokenEstimator.heuristic("a b c")
+
+def test_batches_larger_than_the_memo():
+    class BatchTokenizer:
+        def encode(self, text):
+            return text.split()
+
+        def encode_batch(self, texts):
+            return [text.split() for text in texts]
+
+    TokenEstimator.use_tokenizer(BatchTokenizer(), cache_size=10)
+    try:
+        texts = [" ".join(["w"] * (i + 1)) for i in range(20)]
+        assert TokenEstimator.estimate_many(texts) == list(range(1, 21))
+        assert len(TokenEstimator._memo) == 10
+        assert all(isinstance(key, tuple) for key in TokenEstimator._memo)
+    finally:
+        TokenEstimator.use_tokenizer(None)